@@ -0,0 +1,280 @@
+# benchmarks/bench_load.py
+"""
+Synthetic-load benchmarks for the ingest, validate, mint and fetch paths.
+
+    python -m benchmarks.bench_load --stones 10000
+    python -m benchmarks.bench_load --stones 1000000 --scenarios validate ingest
+    python -m benchmarks.bench_load --compare benchmarks/results/load-abc1234.json
+
+Each scenario runs in a fresh spawned process inside its own temporary
+directory, so module-level singletons, page cache warmth from earlier
+scenarios and peak RSS do not leak between them. Reported per scenario:
+stones/sec, p50/p99 latency of the timed unit (a ledger append for
+ingest/mint, a stone for validate), peak RSS and bytes written. Results
+are saved as JSON, keyed by commit, for comparison across revisions.
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import multiprocessing
+import os
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+RESULTS_DIR = Path(__file__).parent / "results"
+SCENARIOS   = ("validate", "ingest", "mint", "fetch")
+
+
+# ── measurement helpers ───────────────────────────────────────────────────────
+def percentile(samples, p):
+    if not samples:
+        return None
+    ordered = sorted(samples)
+    k = min(len(ordered) - 1, max(0, round(p / 100 * (len(ordered) - 1))))
+    return ordered[k]
+
+def bytes_written():
+    """Bytes this process has passed to write(2) so far (0 where /proc is unavailable)."""
+    try:
+        for line in Path("/proc/self/io").read_text().splitlines():
+            if line.startswith("wchar:"):
+                return int(line.split()[1])
+    except OSError:
+        pass
+    return 0
+
+def peak_rss_kb():
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss // 1024 if sys.platform == "darwin" else rss
+
+def summarize(count, seconds, latencies, written, **extra):
+    result = {
+        "stones": count,
+        "seconds": round(seconds, 4),
+        "stones_per_sec": round(count / seconds, 1) if seconds else None,
+        "p50_ms": round(percentile(latencies, 50) * 1000, 3) if latencies else None,
+        "p99_ms": round(percentile(latencies, 99) * 1000, 3) if latencies else None,
+        "peak_rss_kb": peak_rss_kb(),
+        "bytes_written": written,
+    }
+    result.update(extra)
+    return result
+
+def timed_appends(store, latencies):
+    """Record the duration of every store.append() call in `latencies`."""
+    append = store.append
+
+    def timed(stones):
+        t0 = time.perf_counter()
+        try:
+            return append(stones)
+        finally:
+            latencies.append(time.perf_counter() - t0)
+
+    store.append = timed
+
+
+# ── scenarios (each runs in its own process and cwd) ──────────────────────────
+def scenario_validate(args):
+    from benchmarks.synth import valid_chain
+    from codex_watcher.cli import validate_stone
+    from codex_watcher.ledger import GENESIS_DIGEST
+
+    chain = list(valid_chain(args.stones, seed=args.seed))
+    latencies = []
+    tip = GENESIS_DIGEST
+    t0 = time.perf_counter()
+    for canonical, digest in chain:
+        s0 = time.perf_counter()
+        ok, reason = validate_stone(canonical, digest, tip)
+        latencies.append(time.perf_counter() - s0)
+        if not ok:
+            raise RuntimeError(reason)
+        tip = digest
+    return summarize(len(chain), time.perf_counter() - t0, latencies, 0)
+
+def scenario_ingest(args):
+    from benchmarks.synth import inbox_flood
+    from codex_watcher import cli
+    from codex_watcher.ledger import GENESIS_DIGEST
+
+    cli.ensure_dirs()
+    files, mix = inbox_flood(
+        args.stones, GENESIS_DIGEST, invalid=args.invalid, duplicate=args.duplicate,
+        out_of_order=args.out_of_order, seed=args.seed,
+    )
+    for name, text in files:
+        (cli.INBOX_DIR / name).write_text(text, encoding="utf-8")
+    del files
+    store = cli.ledger_store()
+    latencies = []
+    timed_appends(store, latencies)
+    w0 = bytes_written()
+    t0 = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        added = cli.process_inbox_once(args.batch_size, args.max_latency, args.workers)
+    seconds = time.perf_counter() - t0
+    if cli._executor is not None:
+        # a pool child joins its children before atexit would stop the prepare pool
+        cli._executor.shutdown()
+    rejected = sum(1 for _ in cli.REJECTED_DIR.iterdir())
+    return summarize(
+        args.stones, seconds, latencies, bytes_written() - w0,
+        appended=added, rejected=rejected, batches=len(latencies), mix=mix,
+    )
+
+def scenario_mint(args):
+    import codex_chain
+
+    store = codex_chain.ledger_store()
+    latencies = []
+    timed_appends(store, latencies)
+    count = args.mint_stones
+    w0 = bytes_written()
+    t0 = time.perf_counter()
+    for i in range(count):
+        codex_chain.make_stone(
+            seed=f"mint-{i}", axis="CodexWeb", data=f"payload-{i}",
+            method="python-sha256", metrics="n/a", notes="benchmark",
+        )
+    return summarize(count, time.perf_counter() - t0, latencies, bytes_written() - w0)
+
+def scenario_fetch(args):
+    from benchmarks.stub_server import StubMirror
+    from benchmarks.synth import valid_chain
+    from codex_fetcher import fetcher
+
+    stones = valid_chain(args.stones, seed=args.seed)
+    files = {
+        f"{i:09d}.json": json.dumps({"canonical": c, "digest": d})
+        for i, (c, d) in enumerate(stones)
+    }
+    feed = [(f"entry-{i}", text) for i, text in enumerate(list(files.values())[: args.feed_items])]
+    stub = StubMirror(files, feed).start()
+    mirrors = [
+        {"name": "bench-gh", "type": "github", "repo": "bench/stones", "path": "stones",
+         "api_url": stub.base_url, "concurrency": args.fetch_concurrency},
+        {"name": "bench-rss", "type": "rss", "url": f"{stub.base_url}/feed.xml"},
+    ]
+    fetcher.INBOX_DIR.mkdir(exist_ok=True)
+    state = fetcher.load_state()
+    try:
+        w0 = bytes_written()
+        t0 = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            results = fetcher.fetch_all(mirrors, state)
+        seconds = time.perf_counter() - t0
+        state.flush()
+        fetched = sum(len(v) for v in results.values())
+        written = bytes_written() - w0
+        # second pass: everything should be answered with 304s
+        requests_before = stub.requests
+        t1 = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            fetcher.fetch_all(mirrors, state)
+        conditional = time.perf_counter() - t1
+    finally:
+        stub.stop()
+    return summarize(
+        fetched, seconds, [], written,
+        requests=requests_before, conditional_pass_s=round(conditional, 4),
+        conditional_requests=stub.requests - requests_before, not_modified=stub.not_modified,
+    )
+
+SCENARIO_FUNCS = {
+    "validate": scenario_validate,
+    "ingest": scenario_ingest,
+    "mint": scenario_mint,
+    "fetch": scenario_fetch,
+}
+
+def _run_in_tmp(name, args):
+    with tempfile.TemporaryDirectory(prefix=f"codex-bench-{name}-") as tmp:
+        os.chdir(tmp)
+        return SCENARIO_FUNCS[name](args)
+
+def run_isolated(name, args):
+    # an executor worker is not daemonic, so scenarios may start their own pools (--workers)
+    ctx = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=1, mp_context=ctx) as pool:
+        return pool.submit(_run_in_tmp, name, args).result()
+
+
+# ── reporting ─────────────────────────────────────────────────────────────────
+def git_commit():
+    try:
+        out = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=Path(__file__).parent, capture_output=True, text=True, check=True,
+        )
+        return out.stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+def cell(value, width, digits):
+    return f"{value:>{width}.{digits}f}" if value is not None else f"{'-':>{width}}"
+
+def print_table(results, baseline=None):
+    print(f"{'scenario':<10} {'stones':>9} {'stones/s':>11} {'p50 ms':>9} {'p99 ms':>9} "
+          f"{'peak RSS MB':>12} {'written MB':>11}")
+    for name, r in results.items():
+        line = (
+            f"{name:<10} {r['stones']:>9} {cell(r['stones_per_sec'], 11, 1)} "
+            f"{cell(r['p50_ms'], 9, 3)} {cell(r['p99_ms'], 9, 3)} "
+            f"{r['peak_rss_kb'] / 1024:>12.1f} {r['bytes_written'] / 1e6:>11.2f}"
+        )
+        old = (baseline or {}).get(name)
+        if old and old.get("stones_per_sec") and r["stones_per_sec"]:
+            line += f"   {r['stones_per_sec'] / old['stones_per_sec']:.2f}x vs baseline"
+        print(line)
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--stones", type=int, default=10_000, help="Chain / flood size (10^3 … 10^6)")
+    parser.add_argument("--scenarios", nargs="+", choices=SCENARIOS, default=list(SCENARIOS))
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--invalid", type=float, default=0.05, help="Share of invalid stones (ingest)")
+    parser.add_argument("--duplicate", type=float, default=0.02, help="Share of duplicates (ingest)")
+    parser.add_argument("--out-of-order", type=float, default=0.05, help="Share of swapped pairs (ingest)")
+    parser.add_argument("--batch-size", type=int, default=256)
+    parser.add_argument("--max-latency", type=float, default=1.0)
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--mint-stones", type=int, default=1000, help="Stones minted one append each")
+    parser.add_argument("--feed-items", type=int, default=200, help="Entries in the stub Atom feed")
+    parser.add_argument("--fetch-concurrency", type=int, default=8)
+    parser.add_argument("--out", type=Path, help="Results file (default: benchmarks/results/load-<commit>.json)")
+    parser.add_argument("--compare", type=Path, help="Earlier results file to compare against")
+    args = parser.parse_args()
+
+    results = {}
+    for name in args.scenarios:
+        print(f"▶️ {name} …", flush=True)
+        results[name] = run_isolated(name, args)
+
+    baseline = json.loads(args.compare.read_text())["results"] if args.compare else None
+    print_table(results, baseline)
+
+    commit = git_commit()
+    out = args.out or RESULTS_DIR / f"load-{commit}.json"
+    out.parent.mkdir(parents=True, exist_ok=True)
+    out.write_text(json.dumps({
+        "commit": commit,
+        "recorded_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "params": {k: (str(v) if isinstance(v, Path) else v) for k, v in vars(args).items()},
+        "results": results,
+    }, indent=2))
+    print(f"Saved {out}")
+
+if __name__ == "__main__":
+    main()
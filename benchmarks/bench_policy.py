@@ -0,0 +1,82 @@
+# benchmarks/bench_policy.py
+"""
+Compare the compiled policy scanner against the original
+`for term in BANNED_TERMS: if term in low` loop.
+
+    python -m benchmarks.bench_policy --terms 4 100 1000 5000 --stones 2000
+"""
+
+import argparse
+import hashlib
+import random
+import string
+import time
+
+from codex_watcher.policy import CompiledPolicy, Rule
+
+
+def make_terms(n, rng):
+    base = ["password", "secret", "ssn", "private"]
+    words = set(base[:n])
+    while len(words) < n:
+        words.add("".join(rng.choices(string.ascii_lowercase, k=rng.randint(5, 12))))
+    return sorted(words)
+
+def make_canonicals(n, rng):
+    out = []
+    prev = "0" * 64
+    for i in range(n):
+        notes = " ".join(
+            "".join(rng.choices(string.ascii_lowercase, k=rng.randint(3, 9))) for _ in range(12)
+        )
+        c = (
+            f"seed=bench-{i};prev={prev};axis=CodexWeb;data=payload-{i};"
+            f"method=python-sha256;metrics=n/a;notes={notes};trials=1;author=bench"
+        )
+        prev = hashlib.sha256(c.encode("utf-8")).hexdigest()
+        out.append(c)
+    return out
+
+def loop_scan(canonical, terms):
+    low = canonical.lower()
+    for term in terms:
+        if term in low:
+            return term
+    return None
+
+def bench(fn, canonicals, repeat):
+    best = float("inf")
+    hits = 0
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        hits = sum(1 for c in canonicals if fn(c))
+        best = min(best, time.perf_counter() - t0)
+    return best, hits
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--terms", type=int, nargs="+", default=[4, 100, 1000, 5000])
+    parser.add_argument("--stones", type=int, default=2000)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    canonicals = make_canonicals(args.stones, rng)
+    print(f"{'terms':>6} {'loop µs/stone':>14} {'compiled µs/stone':>18} {'speedup':>8} {'compile ms':>11}")
+    for n in args.terms:
+        terms = make_terms(n, rng)
+        t0 = time.perf_counter()
+        policy = CompiledPolicy(Rule(t) for t in terms)
+        compile_ms = (time.perf_counter() - t0) * 1000
+        loop_s, loop_hits = bench(lambda c: loop_scan(c, terms), canonicals, args.repeat)
+        comp_s, comp_hits = bench(policy.scan, canonicals, args.repeat)
+        assert loop_hits == comp_hits, (loop_hits, comp_hits)
+        per = 1e6 / len(canonicals)
+        print(
+            f"{n:>6} {loop_s * per:>14.2f} {comp_s * per:>18.2f} "
+            f"{loop_s / comp_s:>7.1f}x {compile_ms:>11.1f}"
+        )
+
+if __name__ == "__main__":
+    main()
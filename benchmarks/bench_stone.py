@@ -0,0 +1,88 @@
+# benchmarks/bench_stone.py
+"""
+Memory per stone for the representations a chain can be held in:
+plain dicts from json.loads, Stone objects (fields unparsed and parsed),
+and the StoneColumns column store.
+
+    python -m benchmarks.bench_stone --stones 100000
+"""
+
+import argparse
+import gc
+import hashlib
+import json
+import tracemalloc
+
+from codex_watcher.stone import Stone, StoneColumns
+
+
+def make_records(n, authors=20, axes=5):
+    records = []
+    prev = "0" * 64
+    for i in range(n):
+        c = (
+            f"seed=bench-{i};prev={prev};axis=Axis{i % axes};data=payload-{i};"
+            f"method=python-sha256;metrics=n/a;notes=benchmark stone;trials=1;author=author{i % authors}"
+        )
+        prev = hashlib.sha256(c.encode("utf-8")).hexdigest()
+        # round-trip through JSON so strings are fresh objects, as when read from a segment
+        records.append(json.dumps({"canonical": c, "digest": prev}))
+    return records
+
+def measure(build):
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    obj = build()
+    gc.collect()
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return obj, after - before
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--stones", type=int, default=100_000)
+    args = parser.parse_args()
+
+    lines = make_records(args.stones)
+    n = len(lines)
+
+    def dicts():
+        return [json.loads(l) for l in lines]
+
+    def dicts_parsed():
+        out = []
+        for l in lines:
+            d = json.loads(l)
+            d["fields"] = dict(p.split("=", 1) for p in d["canonical"].split(";") if "=" in p)
+            out.append(d)
+        return out
+
+    def stones():
+        return [Stone.of(json.loads(l)) for l in lines]
+
+    def stones_parsed():
+        out = [Stone.of(json.loads(l)) for l in lines]
+        for s in out:
+            s.fields
+        return out
+
+    def columns():
+        return StoneColumns(Stone.of(json.loads(l)) for l in lines)
+
+    cases = [
+        ("dict", dicts),
+        ("dict + fields dict", dicts_parsed),
+        ("Stone", stones),
+        ("Stone + parsed fields", stones_parsed),
+        ("StoneColumns", columns),
+    ]
+    print(f"{n} stones")
+    print(f"{'representation':<24} {'bytes/stone':>12}")
+    for label, build in cases:
+        obj, used = measure(build)
+        print(f"{label:<24} {used / n:>12.0f}")
+        del obj
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+# benchmarks/stub_server.py
+"""
+Local stand-in for the GitHub contents API and an Atom feed, so the
+fetcher can be driven at full speed without the network.
+
+    GET /repos/<org>/<repo>/contents/<path>[?page=N]   paginated listing (Link: rel="next")
+    GET /raw/<name>                                    file body
+    GET /feed.xml                                      Atom feed of the RSS items
+
+Listings and the feed carry ETags and answer If-None-Match with 304.
+"""
+
+import hashlib
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from xml.sax.saxutils import escape
+
+PAGE_SIZE = 1000
+
+
+class StubMirror:
+    def __init__(self, files=(), feed_items=(), page_size=PAGE_SIZE):
+        self.files = dict(files)            # name -> text
+        self.feed_items = list(feed_items)  # (entry id, text)
+        self.page_size = page_size
+        self.requests = 0
+        self.not_modified = 0
+        self._server = None
+
+    @property
+    def base_url(self):
+        return f"http://127.0.0.1:{self._server.server_port}"
+
+    def start(self):
+        mirror = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args):
+                pass
+
+            def send(self, code, body=b"", headers=()):
+                self.send_response(code)
+                self.send_header("Content-Length", str(len(body)))
+                for key, value in headers:
+                    self.send_header(key, value)
+                self.end_headers()
+                self.wfile.write(body)
+
+            def conditional(self, body, headers=()):
+                etag = '"%s"' % hashlib.sha1(body).hexdigest()
+                headers = list(headers) + [("ETag", etag)]
+                if self.headers.get("If-None-Match") == etag:
+                    mirror.not_modified += 1
+                    return self.send(304, b"", headers)
+                return self.send(200, body, headers)
+
+            def do_GET(self):
+                mirror.requests += 1
+                path, _, query = self.path.partition("?")
+                if path.startswith("/repos/") and "/contents/" in path:
+                    page = int(query.split("page=")[1]) if "page=" in query else 1
+                    names = sorted(mirror.files)
+                    chunk = names[(page - 1) * mirror.page_size: page * mirror.page_size]
+                    items = [{
+                        "type": "file",
+                        "name": name,
+                        "sha": hashlib.sha1(mirror.files[name].encode("utf-8")).hexdigest(),
+                        "download_url": f"{mirror.base_url}/raw/{name}",
+                    } for name in chunk]
+                    headers = []
+                    if page * mirror.page_size < len(names):
+                        headers.append(("Link", f'<{mirror.base_url}{path}?page={page + 1}>; rel="next"'))
+                    return self.conditional(json.dumps(items).encode("utf-8"), headers)
+                if path.startswith("/raw/"):
+                    text = mirror.files.get(path[5:])
+                    if text is None:
+                        return self.send(404)
+                    return self.send(200, text.encode("utf-8"))
+                if path == "/feed.xml":
+                    entries = "".join(
+                        f"<entry><id>{escape(eid)}</id><title>{escape(eid)}</title>"
+                        f"<content type=\"text\">{escape(text)}</content></entry>"
+                        for eid, text in mirror.feed_items
+                    )
+                    body = (
+                        '<?xml version="1.0"?><feed xmlns="http://www.w3.org/2005/Atom">'
+                        f"<title>stub</title>{entries}</feed>"
+                    ).encode("utf-8")
+                    return self.conditional(body, [("Content-Type", "application/atom+xml")])
+                self.send(404)
+
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self):
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
@@ -0,0 +1,72 @@
+# benchmarks/synth.py
+"""
+Deterministic synthetic data for the load benchmarks: valid chains and
+inbox floods with a configurable mix of bad stones.
+"""
+
+import hashlib
+import json
+import random
+
+from codex_watcher.ledger import GENESIS_DIGEST
+
+AUTHORS = [f"author{i}" for i in range(16)]
+AXES    = ["CodexWeb", "Physics", "Ledger", "Mirrors", "Trials"]
+
+
+def canonical_for(i, prev, rng):
+    return (
+        f"seed=synth-{i};prev={prev};axis={rng.choice(AXES)};data=payload-{i}-{rng.getrandbits(32):08x};"
+        f"method=python-sha256;metrics=n/a;notes=synthetic load;trials=1;author={rng.choice(AUTHORS)}"
+    )
+
+def valid_chain(n, tip=GENESIS_DIGEST, seed=1):
+    """Yield n (canonical, digest) pairs, each linked to the previous; starts after `tip`."""
+    rng = random.Random(seed)
+    for i in range(n):
+        canonical = canonical_for(i, tip, rng)
+        tip = hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+        yield canonical, tip
+
+def inbox_flood(n, tip=GENESIS_DIGEST, invalid=0.05, duplicate=0.02, out_of_order=0.05, seed=1):
+    """
+    A list of (file name, file text) for an inbox drop of about n files.
+    Files sort in chain order except where `out_of_order` swaps a child
+    ahead of its parent; `invalid` stones fail validation (bad digest,
+    missing author or a banned term) and `duplicate` stones repeat an
+    earlier stone under a new name. Returns (files, counts).
+    """
+    rng = random.Random(seed)
+    files, counts = [], {"valid": 0, "invalid": 0, "duplicate": 0, "out_of_order": 0}
+    chain = []
+    for i in range(n):
+        roll = rng.random()
+        if roll < invalid:
+            canonical = canonical_for(i, tip, rng)
+            kind = rng.randrange(3)
+            if kind == 0:
+                digest = "0" * 64
+            elif kind == 1:
+                canonical = canonical.rsplit(";author=", 1)[0]
+                digest = hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+            else:
+                canonical = canonical.replace("notes=synthetic load", "notes=leaked password")
+                digest = hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+            counts["invalid"] += 1
+        elif roll < invalid + duplicate and chain:
+            canonical, digest = rng.choice(chain)
+            counts["duplicate"] += 1
+        else:
+            canonical = canonical_for(i, tip, rng)
+            digest = hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+            tip = digest
+            chain.append((canonical, digest))
+            counts["valid"] += 1
+        files.append([f"{i:09d}.json", json.dumps({"canonical": canonical, "digest": digest})])
+    swaps = int(n * out_of_order)
+    for _ in range(swaps):
+        i = rng.randrange(max(n - 1, 1))
+        if i + 1 < n:
+            files[i][0], files[i + 1][0] = files[i + 1][0], files[i][0]
+    counts["out_of_order"] = swaps
+    return [tuple(f) for f in files], counts
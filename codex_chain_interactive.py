@@ -1,7 +1,10 @@
 import hashlib
-import json
 from pathlib import Path
 
+from codex_watcher.ledger import LEDGER_DIR, get_store
+from codex_watcher.mint import MINT_BATCH, mint_stones
+from codex_watcher.stone import Stone, StoneColumns
+
 LEDGER_FILE = Path("codex_ledger.json")
 
 # Genesis anchor
@@ -17,18 +20,24 @@ GENESIS_STRING = (
     "trials=1"
 )
 
+def ledger_store():
+    store = get_store(
+        LEDGER_DIR,
+        legacy_file=LEDGER_FILE,
+        genesis={"canonical": GENESIS_STRING, "digest": GENESIS_DIGEST},
+    )
+    store.aggregates  # keep the dashboard aggregates current as stones are minted
+    return store
+
 def load_ledger():
-    if LEDGER_FILE.exists():
-        return json.loads(LEDGER_FILE.read_text(encoding="utf-8"))
-    else:
-        return [{"canonical": GENESIS_STRING, "digest": GENESIS_DIGEST}]
+    return StoneColumns(ledger_store().iter_stones())
 
-def save_ledger(ledger):
-    LEDGER_FILE.write_text(json.dumps(ledger, indent=2), encoding="utf-8")
+def export_ledger(path=LEDGER_FILE):
+    return ledger_store().export_legacy(path)
 
 def make_stone(seed, axis, data, method, metrics, notes, trials=1):
-    ledger = load_ledger()
-    prev_digest = ledger[-1]["digest"]
+    store = ledger_store()
+    prev_digest = store.tip_digest()
     canonical = (
         f"seed={seed};"
         f"prev={prev_digest};"
@@ -40,10 +49,18 @@ def make_stone(seed, axis, data, method, metrics, notes, trials=1):
         f"trials={trials}"
     )
     digest = hashlib.sha256(canonical.encode("utf-8")).hexdigest()
-    ledger.append({"canonical": canonical, "digest": digest})
-    save_ledger(ledger)
+    store.append([Stone(canonical, digest)])
     return canonical, digest
 
+def make_stones(records, batch_size=MINT_BATCH):
+    """
+    Mint an iterable of dicts with make_stone()'s fields (seed, axis, data,
+    method, metrics, notes, trials; optionally author). Stones are chained
+    from one tip read per batch and written with one append per batch.
+    Returns the (canonical, digest) pairs.
+    """
+    return [(s.canonical, s.digest) for s in mint_stones(ledger_store(), records, batch_size)]
+
 if __name__ == "__main__":
     print("🔹 Mint a new Codex stone 🔹")
     seed = input("Seed (short unique name): ")
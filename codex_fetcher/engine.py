@@ -0,0 +1,103 @@
+# codex_fetcher/engine.py
+"""
+HTTP plumbing for the fetcher: one pooled keep-alive session per host,
+per-host connection caps, timeouts, and retry with exponential backoff.
+"""
+
+import random
+import threading
+import time
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+DEFAULT_TIMEOUT     = (5, 30)   # (connect, read) seconds
+DEFAULT_RETRIES     = 3
+DEFAULT_BACKOFF     = 0.5       # seconds, doubled per attempt
+MAX_BACKOFF         = 30
+HOST_CONNECTIONS    = 8
+RETRY_STATUS        = {429, 500, 502, 503, 504}
+USER_AGENT          = "codex-fetcher/0.1"
+
+
+class FetchError(Exception):
+    pass
+
+
+class SessionPool:
+    """Thread-safe registry of one requests.Session per scheme://host."""
+
+    def __init__(self, host_connections=HOST_CONNECTIONS):
+        self.host_connections = host_connections
+        self._sessions = {}
+        self._limits = {}
+        self._lock = threading.Lock()
+
+    def _key(self, url):
+        parts = urlsplit(url)
+        return f"{parts.scheme}://{parts.netloc}"
+
+    def session(self, url) -> requests.Session:
+        key = self._key(url)
+        with self._lock:
+            session = self._sessions.get(key)
+            if session is None:
+                session = requests.Session()
+                adapter = HTTPAdapter(
+                    pool_connections=1,
+                    pool_maxsize=self.host_connections,
+                    max_retries=0,
+                )
+                session.mount(key + "/", adapter)
+                session.headers["User-Agent"] = USER_AGENT
+                self._sessions[key] = session
+                self._limits[key] = threading.BoundedSemaphore(self.host_connections)
+            return session
+
+    def limit(self, url) -> threading.BoundedSemaphore:
+        self.session(url)
+        return self._limits[self._key(url)]
+
+    def close(self):
+        with self._lock:
+            for session in self._sessions.values():
+                session.close()
+            self._sessions.clear()
+            self._limits.clear()
+
+
+def _retry_after(resp):
+    value = resp.headers.get("Retry-After")
+    if value and value.isdigit():
+        return min(int(value), MAX_BACKOFF)
+    return None
+
+def fetch(pool: SessionPool, url, timeout=DEFAULT_TIMEOUT, retries=DEFAULT_RETRIES,
+          backoff=DEFAULT_BACKOFF, headers=None):
+    """
+    GET `url` through the pooled session for its host. Connection errors,
+    timeouts and 429/5xx responses are retried up to `retries` times with
+    jittered exponential backoff (or the server's Retry-After). Returns the
+    final response; raises FetchError once retries are exhausted.
+    """
+    session = pool.session(url)
+    limit = pool.limit(url)
+    attempt = 0
+    while True:
+        try:
+            with limit:
+                resp = session.get(url, timeout=timeout, headers=headers)
+            if resp.status_code not in RETRY_STATUS:
+                return resp
+            error = f"HTTP {resp.status_code}"
+            wait = _retry_after(resp)
+        except (requests.ConnectionError, requests.Timeout) as e:
+            error = f"{type(e).__name__}: {e}"
+            wait = None
+        if attempt >= retries:
+            raise FetchError(f"{url}: {error} after {attempt + 1} attempts")
+        if wait is None:
+            wait = min(backoff * (2 ** attempt), MAX_BACKOFF) * (0.5 + random.random() / 2)
+        time.sleep(wait)
+        attempt += 1
@@ -1,96 +1,242 @@
 # codex_fetcher/fetcher.py
 
-import json
+import argparse
+import hashlib
+import os
 import yaml
-import requests
 import feedparser
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
+from codex_fetcher.engine import (
+    DEFAULT_RETRIES, DEFAULT_TIMEOUT, FetchError, SessionPool, fetch,
+)
+from codex_fetcher.state import STATE_LOG, FetcherState, MirrorState
+
 CONFIG_PATH = Path("mirrors.yml")
 INBOX_DIR   = Path("inbox")
-STATE_FILE  = Path(".fetcher_state.json")
+GITHUB_API  = "https://api.github.com"
+
+# ── Concurrency settings ──────────────────────────────────────────────────────
+MIRROR_CONCURRENCY = 4   # downloads in flight per mirror (override per mirror)
+MAX_MIRRORS        = 8   # mirrors fetched at the same time
+
+def load_state(path=STATE_LOG):
+    return FetcherState(path).open()
 
-def load_state():
-    if STATE_FILE.exists():
-        text = STATE_FILE.read_text(encoding="utf-8").strip()
-        return json.loads(text) if text else {}
-    return {}
+def _ok(resp):
+    if resp.status_code >= 400:
+        raise FetchError(f"{resp.url}: HTTP {resp.status_code}")
+    return resp
+
+def write_inbox(name, text):
+    """
+    Default sink: drop the payload into the inbox for the watcher. It is
+    written under a dotted temp name and renamed, so a watcher running
+    concurrently never picks up a half-written file.
+    """
+    tmp = INBOX_DIR / f".{name}.part"
+    tmp.write_text(text, encoding="utf-8")
+    os.replace(tmp, INBOX_DIR / name)
 
-def save_state(state):
-    STATE_FILE.write_text(json.dumps(state, indent=2), encoding="utf-8")
+def content_sha(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
 
-def fetch_github(repo, path, seen_files):
+def conditional_fetch(pool, url, seen: MirrorState, **kwargs):
+    """
+    GET `url` with If-None-Match / If-Modified-Since from the mirror's
+    stored validator. Returns (response, new validator record); response
+    is None on 304. The caller stores the record only once the response
+    has been consumed.
+    """
+    cached = seen.validator(url)
+    headers = {}
+    if cached.get("etag"):
+        headers["If-None-Match"] = cached["etag"]
+    if cached.get("last_modified"):
+        headers["If-Modified-Since"] = cached["last_modified"]
+    resp = fetch(pool, url, headers=headers or None, **kwargs)
+    if resp.status_code == 304 and cached:
+        return None, cached
+    _ok(resp)
+    record = {
+        "etag": resp.headers.get("ETag"),
+        "last_modified": resp.headers.get("Last-Modified"),
+        "next": resp.links.get("next", {}).get("url"),
+    }
+    return resp, record
+
+def fetch_github(repo, path, seen: MirrorState, pool=None, api_url=GITHUB_API,
+                 concurrency=MIRROR_CONCURRENCY, timeout=DEFAULT_TIMEOUT, retries=DEFAULT_RETRIES,
+                 sink=write_inbox):
     """
     repo: "org/repo"
     path: subfolder in that repo
-    seen_files: list of filenames already fetched
+    seen: the mirror's state (filenames fetched, blob shas, validators)
+    sink: callable(name, text) receiving each downloaded file
+    Listing pages are requested conditionally and skipped on 304. A file is
+    downloaded only if its name is new or its blob sha changed. Files are
+    downloaded `concurrency` at a time over pooled sessions; a file that
+    fails is skipped (and retried next run) without failing the mirror.
     """
-    url = f"https://api.github.com/repos/{repo}/contents/{path}"
-    resp = requests.get(url)
-    resp.raise_for_status()
-    items = resp.json()
+    own_pool = pool is None
+    pool = pool or SessionPool()
     new_files = []
 
-    for item in items:
-        if item.get("type") != "file":
-            continue
-        name = item["name"]
-        if name in seen_files:
-            continue
-        raw = requests.get(item["download_url"]).text
-        file_path = INBOX_DIR / name
-        file_path.write_text(raw, encoding="utf-8")
-        new_files.append(name)
-
-    return new_files
-
-def fetch_rss(mirror_name, feed_url, seen_ids):
+    def download(item):
+        try:
+            raw = _ok(fetch(pool, item["download_url"], timeout=timeout, retries=retries)).text
+        except FetchError as e:
+            print(f"⚠️  {repo}: skipped {item['name']} ({e})")
+            return None
+        return item["name"], item.get("sha") or content_sha(raw), raw
+
+    try:
+        url = f"{api_url.rstrip('/')}/repos/{repo}/contents/{path}"
+        with ThreadPoolExecutor(max_workers=max(1, concurrency)) as ex:
+            while url:
+                resp, record = conditional_fetch(pool, url, seen, timeout=timeout, retries=retries)
+                if resp is None:
+                    url = record.get("next")
+                    continue
+                todo = []
+                for item in resp.json():
+                    if item.get("type") != "file":
+                        continue
+                    name, sha = item["name"], item.get("sha")
+                    if name not in seen or (sha and seen.sha(name) not in (None, sha)):
+                        todo.append(item)
+                    elif sha and seen.sha(name) is None:
+                        seen.add(name, sha)
+                # downloads overlap, but the sink sees files in listing order
+                landed = 0
+                for result in ex.map(download, todo):
+                    if result is None:
+                        continue
+                    name, sha, raw = result
+                    sink(name, raw)
+                    if name not in seen:
+                        new_files.append(name)
+                    seen.add(name, sha)
+                    landed += 1
+                # only trust a 304 next time if every item on this page landed
+                if landed == len(todo):
+                    seen.set_validator(url, record)
+                url = record.get("next")
+        return new_files
+    finally:
+        if own_pool:
+            pool.close()
+
+def fetch_rss(mirror_name, feed_url, seen: MirrorState, pool=None,
+              timeout=DEFAULT_TIMEOUT, retries=DEFAULT_RETRIES, sink=write_inbox):
     """
     mirror_name: used to prefix filenames
     feed_url: RSS/Atom feed URL
-    seen_ids: list of entry.id values already fetched
+    seen: the mirror's state (entry ids fetched, content shas, validators)
+    sink: callable(name, text) receiving each new entry
+    The feed is requested conditionally; a 304 skips parsing entirely.
     """
-    feed = feedparser.parse(feed_url)
+    own_pool = pool is None
+    pool = pool or SessionPool()
+    try:
+        resp, record = conditional_fetch(pool, feed_url, seen, timeout=timeout, retries=retries)
+    finally:
+        if own_pool:
+            pool.close()
+    if resp is None:
+        return []
+    feed = feedparser.parse(resp.content)
     new_ids = []
 
     for entry in feed.entries:
         eid = entry.id
-        if eid in seen_ids:
-            continue
         # assume the full canonical JSON is in entry.content[0].value
         content = entry.content[0].value
-        filename = f"{mirror_name}_{eid}.json"
-        (INBOX_DIR / filename).write_text(content, encoding="utf-8")
-        new_ids.append(eid)
+        sha = content_sha(content)
+        known = seen.sha(eid)
+        if eid in seen and known in (None, sha):
+            if known is None:
+                seen.add(eid, sha)
+            continue
+        sink(f"{mirror_name}_{eid}.json", content)
+        if eid not in seen:
+            new_ids.append(eid)
+        seen.add(eid, sha)
 
+    seen.set_validator(feed_url, record)
     return new_ids
 
+def fetch_mirror(mirror, seen: MirrorState, pool, sink=write_inbox):
+    """Fetch one mirror entry from mirrors.yml; returns the list of new item ids."""
+    mtype = mirror["type"]
+    timeout = mirror.get("timeout", DEFAULT_TIMEOUT)
+    if isinstance(timeout, list):
+        timeout = tuple(timeout)  # YAML has no tuples: [connect, read]
+    retries = mirror.get("retries", DEFAULT_RETRIES)
+    if mtype == "github":
+        return fetch_github(
+            mirror["repo"], mirror["path"], seen, pool=pool,
+            api_url=mirror.get("api_url", GITHUB_API),
+            concurrency=mirror.get("concurrency", MIRROR_CONCURRENCY),
+            timeout=timeout, retries=retries, sink=sink,
+        )
+    if mtype == "rss":
+        return fetch_rss(mirror["name"], mirror["url"], seen, pool=pool,
+                         timeout=timeout, retries=retries, sink=sink)
+    raise ValueError(f"Unknown mirror type: {mtype}")
+
+def fetch_all(mirrors, state: FetcherState, pool=None, max_mirrors=MAX_MIRRORS, sink=write_inbox):
+    """
+    Fetch every mirror concurrently. A mirror that raises is reported and
+    left out of this run's results; the others are unaffected. Returns
+    {mirror name: new ids} for the mirrors that succeeded. Items are
+    recorded in `state` as they land; the caller flushes it. Payloads go
+    to `sink` (the inbox by default); it may block to apply backpressure.
+    """
+    own_pool = pool is None
+    pool = pool or SessionPool()
+    results = {}
+    try:
+        with ThreadPoolExecutor(max_workers=max(1, min(max_mirrors, len(mirrors) or 1))) as ex:
+            futures = {
+                mirror["name"]: ex.submit(fetch_mirror, mirror, state.mirror(mirror["name"]), pool, sink)
+                for mirror in mirrors
+            }
+            for name, future in futures.items():
+                try:
+                    results[name] = future.result()
+                except Exception as e:
+                    print(f"⚠️  Mirror {name} failed: {e}")
+    finally:
+        if own_pool:
+            pool.close()
+    return results
+
 def main():
+    parser = argparse.ArgumentParser(description="Fetch stones from the configured mirrors")
+    parser.add_argument("--compact", action="store_true",
+                        help="Rewrite the state log, dropping mirrors no longer in mirrors.yml")
+    parser.add_argument("--expire-days", type=float, default=None,
+                        help="With --compact: forget items first fetched more than N days ago")
+    args = parser.parse_args()
+
     INBOX_DIR.mkdir(exist_ok=True)
     cfg = yaml.safe_load(CONFIG_PATH.read_text(encoding="utf-8"))
+    mirrors = cfg.get("mirrors", [])
     state = load_state()
 
-    for mirror in cfg.get("mirrors", []):
-        name = mirror["name"]
-        mtype = mirror["type"]
-        seen = state.get(name, [])
-
-        if mtype == "github":
-            repo = mirror["repo"]
-            path = mirror["path"]
-            added = fetch_github(repo, path, seen)
-        elif mtype == "rss":
-            added = fetch_rss(name, mirror["url"], seen)
-        else:
-            print(f"⚠️  Unknown mirror type: {mtype}")
-            continue
-
-        # update state only if there are new items
-        if added:
-            state[name] = seen + added
-
-    save_state(state)
-    print("Fetched mirrors. New stones per mirror:", {k: len(v) for k, v in state.items()})
+    if args.compact:
+        expire = args.expire_days * 86400 if args.expire_days is not None else None
+        before, after = state.compact(expire_after=expire, keep_mirrors=[m["name"] for m in mirrors])
+        print(f"✅ Compacted fetcher state: {before} → {after} records")
+        return
+
+    try:
+        results = fetch_all(mirrors, state)
+    finally:
+        state.flush()
+    print("Fetched mirrors. New stones per mirror:", {k: len(v) for k, v in results.items()})
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,208 @@
+# codex_fetcher/state.py
+"""
+Fetcher state: which items each mirror has already delivered, plus the
+HTTP validators (ETag / Last-Modified) used for conditional requests.
+
+State lives in an append-only NDJSON log replayed into per-mirror dicts
+on open, so membership checks are a hash lookup and a run only appends
+the lines it changed. Two record shapes:
+
+    {"m": mirror, "id": item id, "sha": content sha, "t": unix time}
+    {"m": mirror, "url": url, "v": {"etag": ..., "last_modified": ..., "next": ...}}
+
+Later lines win. The log is compacted (rewritten from memory) once it
+holds COMPACT_RATIO times more lines than live entries; compaction can
+also expire old items and drop mirrors no longer configured. The old
+`.fetcher_state.json` is imported on first open.
+"""
+
+import json
+import os
+import threading
+import time
+from pathlib import Path
+
+STATE_LOG      = Path(".fetcher_state.log")
+LEGACY_STATE   = Path(".fetcher_state.json")
+LEGACY_CACHE   = "_http_cache"
+COMPACT_RATIO  = 2
+COMPACT_MIN    = 10_000   # never compact a log shorter than this
+
+
+def _fsync_dir(path: Path):
+    try:
+        fd = os.open(str(path.parent.resolve()), os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+class MirrorState:
+    """One mirror's view of the state: `item in view`, shas and validators."""
+
+    def __init__(self, store, name):
+        self.store = store
+        self.name = name
+        self.items = store.items.setdefault(name, {})
+        self.validators = store.validators.setdefault(name, {})
+
+    def __contains__(self, item_id):
+        return item_id in self.items
+
+    def __len__(self):
+        return len(self.items)
+
+    def sha(self, item_id):
+        entry = self.items.get(item_id)
+        return entry[0] if entry else None
+
+    def add(self, item_id, sha=None):
+        self.store._record({"m": self.name, "id": item_id, "sha": sha, "t": int(time.time())})
+
+    def validator(self, url):
+        return self.validators.get(url, {})
+
+    def set_validator(self, url, record):
+        if self.validators.get(url) != record:
+            self.store._record({"m": self.name, "url": url, "v": record})
+
+
+class FetcherState:
+    """Append-only seen-state log with an in-memory index; safe across threads."""
+
+    def __init__(self, path=STATE_LOG, legacy=LEGACY_STATE):
+        self.path = Path(path)
+        self.legacy = Path(legacy)
+        self.items = {}        # mirror -> {item id: (sha, time)}
+        self.validators = {}   # mirror -> {url: validator record}
+        self.lines = 0
+        self._pending = []
+        self._lock = threading.Lock()
+
+    # ── open / replay ────────────────────────────────────────────────────────
+    def open(self):
+        if not self.path.exists() and self.legacy.exists():
+            self._migrate()
+        self._replay()
+        return self
+
+    def _apply(self, rec):
+        if "id" in rec:
+            self.items.setdefault(rec["m"], {})[rec["id"]] = (rec.get("sha"), rec.get("t", 0))
+        elif "url" in rec:
+            self.validators.setdefault(rec["m"], {})[rec["url"]] = rec["v"]
+
+    def _replay(self):
+        if not self.path.exists():
+            return
+        good = 0
+        with open(self.path, "rb") as fh:
+            for line in fh:
+                if not line.endswith(b"\n"):
+                    break
+                try:
+                    self._apply(json.loads(line))
+                except (ValueError, KeyError, TypeError):
+                    break
+                good += len(line)
+                self.lines += 1
+        if good != self.path.stat().st_size:
+            # torn write from a crashed run: keep everything before it
+            print(f"⚠️  Fetcher state: dropping torn tail after {self.lines} records")
+            with open(self.path, "r+b") as fh:
+                fh.truncate(good)
+
+    def _migrate(self):
+        """Import the old per-mirror JSON lists (and HTTP cache) into the log."""
+        text = self.legacy.read_text(encoding="utf-8").strip()
+        old = json.loads(text) if text else {}
+        now = int(time.time())
+        cache = old.pop(LEGACY_CACHE, {})
+        for name, seen in old.items():
+            shas = cache.get(name, {}).get("shas", {})
+            items = self.items.setdefault(name, {})
+            for item_id in seen:
+                items[item_id] = (shas.get(item_id), now)
+        for name, entry in cache.items():
+            self.validators.setdefault(name, {}).update(entry.get("validators", {}))
+        self._rewrite()
+        self.items.clear()
+        self.validators.clear()
+        self.lines = 0
+        self.legacy.replace(self.legacy.with_name(self.legacy.name + ".migrated"))
+        print(f"🔁 Migrated {self.legacy} → {self.path}")
+
+    # ── writes ───────────────────────────────────────────────────────────────
+    def mirror(self, name) -> MirrorState:
+        with self._lock:
+            return MirrorState(self, name)
+
+    def _record(self, rec):
+        line = json.dumps(rec, separators=(",", ":"), ensure_ascii=False) + "\n"
+        with self._lock:
+            self._apply(rec)
+            self._pending.append(line)
+
+    def flush(self):
+        """Append pending records with one write + fsync; compact when bloated."""
+        with self._lock:
+            if self._pending:
+                with open(self.path, "a", encoding="utf-8") as fh:
+                    fh.write("".join(self._pending))
+                    fh.flush()
+                    os.fsync(fh.fileno())
+                self.lines += len(self._pending)
+                self._pending.clear()
+            live = self._live()
+        if self.lines > max(COMPACT_MIN, COMPACT_RATIO * live):
+            self.compact()
+
+    def _live(self):
+        return sum(len(v) for v in self.items.values()) + sum(len(v) for v in self.validators.values())
+
+    def _rewrite(self):
+        tmp = self.path.with_name(self.path.name + ".tmp")
+        count = 0
+        with open(tmp, "w", encoding="utf-8") as fh:
+            for name, items in self.items.items():
+                for item_id, (sha, t) in items.items():
+                    fh.write(json.dumps({"m": name, "id": item_id, "sha": sha, "t": t},
+                                        separators=(",", ":"), ensure_ascii=False) + "\n")
+                    count += 1
+            for name, validators in self.validators.items():
+                for url, record in validators.items():
+                    fh.write(json.dumps({"m": name, "url": url, "v": record},
+                                        separators=(",", ":"), ensure_ascii=False) + "\n")
+                    count += 1
+            fh.flush()
+            os.fsync(fh.fileno())
+        os.replace(tmp, self.path)
+        _fsync_dir(self.path)
+        self.lines = count
+
+    def compact(self, expire_after=None, keep_mirrors=None):
+        """
+        Rewrite the log from memory. `expire_after` (seconds) forgets items
+        first seen longer ago than that -- meant for feeds that rotate old
+        entries out; an expired item still listed upstream is fetched again
+        once its listing changes. `keep_mirrors` drops every other mirror.
+        Returns (lines before, lines after).
+        """
+        with self._lock:
+            before = self.lines + len(self._pending)
+            self._pending.clear()
+            if keep_mirrors is not None:
+                keep = set(keep_mirrors)
+                for table in (self.items, self.validators):
+                    for name in [n for n in table if n not in keep]:
+                        del table[name]
+            if expire_after is not None:
+                cutoff = time.time() - expire_after
+                for items in self.items.values():
+                    for item_id in [i for i, (_, t) in items.items() if t < cutoff]:
+                        del items[item_id]
+            self._rewrite()
+            return before, self.lines
@@ -5,27 +5,16 @@ import logging
 import argparse
 from pathlib import Path
 
+from codex_watcher.ledger import (
+    LEDGER_FILE, LEDGER_DIR, GENESIS_DIGEST, GENESIS_STRING, get_store,
+)
+
 # ── Paths ─────────────────────────────────────────────────────────────────────
-LEDGER_FILE    = Path("codex_ledger.json")
 INBOX_DIR      = Path("inbox")
 PROCESSED_DIR  = INBOX_DIR / "_processed"
 REJECTED_DIR   = INBOX_DIR / "_rejected"
 LOG_FILE       = Path("codex_watcher.log")
 
-# ── Genesis constants ─────────────────────────────────────────────────────────
-GENESIS_DIGEST = "716ca6878eed87c3d4edc5a83a2e4161a109786b7be0f9093745139a6150710b"
-GENESIS_STRING = (
-    "seed=codex-web-launch-span4-header;"
-    "prev=e024d55b2591e147eaacbee48e21dee95b92f151a742279c90f4245957039435;"
-    "axis=CodexWebGenesis;charter=v1;"
-    "scope=interlinked-digests-for-auditable-knowledge;"
-    "invites=humans,AIs,communities;"
-    "routes=hash-addresses;"
-    "mirrors=x,github,substack;"
-    "trials=1;"
-    "author=system"
-)
-
 # ── Policy settings ────────────────────────────────────────────────────────────
 BANNED_TERMS = {"password", "secret", "ssn", "private"}
 
@@ -45,15 +34,14 @@ def ensure_dirs():
     REJECTED_DIR.mkdir(exist_ok=True)
 
 # ── Ledger I/O ────────────────────────────────────────────────────────────────
+def ledger_store():
+    return get_store(LEDGER_DIR, legacy_file=LEDGER_FILE)
+
 def load_ledger():
-    if LEDGER_FILE.exists():
-        return json.loads(LEDGER_FILE.read_text(encoding="utf-8"))
-    ledger = [{"canonical": GENESIS_STRING, "digest": GENESIS_DIGEST}]
-    LEDGER_FILE.write_text(json.dumps(ledger, indent=2), encoding="utf-8")
-    return ledger
+    return ledger_store().read_all()
 
-def save_ledger(ledger):
-    LEDGER_FILE.write_text(json.dumps(ledger, indent=2), encoding="utf-8")
+def append_stones(stones):
+    return ledger_store().append(stones)
 
 # ── Stone parsing & validation ────────────────────────────────────────────────
 def parse_inbox_file(path: Path):
@@ -87,11 +75,11 @@ def validate_stone(canonical: str, digest: str, tip_digest: str):
 # ── Core processing ───────────────────────────────────────────────────────────
 def process_inbox_once():
     ensure_dirs()
-    ledger = load_ledger()
-    tip = ledger[-1]["digest"]
+    store = ledger_store()
+    tip = store.tip_digest()
     files = sorted(
         p for p in INBOX_DIR.glob("*")
-        if p.is_file() and p.suffix.lower() in {".json", ".txt"}
+        if p.is_file() and not p.name.startswith(".") and p.suffix.lower() in {".json", ".txt"}
     )
     added = 0
     for f in files:
@@ -99,8 +87,7 @@ def process_inbox_once():
             canonical, digest = parse_inbox_file(f)
             valid, reason = validate_stone(canonical, digest, tip)
             if valid:
-                ledger.append({"canonical": canonical, "digest": digest})
-                save_ledger(ledger)
+                append_stones([{"canonical": canonical, "digest": digest}])
                 tip = digest
                 f.rename(PROCESSED_DIR / f.name)
                 msg = f"✅ appended: {f.name} | new tip={tip}"
@@ -114,7 +101,7 @@ def process_inbox_once():
             f.rename(REJECTED_DIR / f.name)
             msg = f"❌ error: {f.name} | {e}"
             print(msg); logger.error(msg)
-    status = f"Ledger length: {len(ledger)} | current tip: {tip} | added: {added}"
+    status = f"Ledger length: {len(store)} | current tip: {tip} | added: {added}"
     print(status); logger.info(status)
     return added
 
@@ -0,0 +1,181 @@
+# codex_watcher/aggregates.py
+"""
+Rolling dashboard aggregates, maintained as stones are appended.
+
+Aggregates is a plain accumulator: stone counts per hour bucket, per
+author and per axis, the running Δ sum, and a ring buffer of the most
+recent rows. Its size depends on the number of distinct hours, authors
+and axes, not on the length of the chain.
+
+AggregateLog keeps one in step with a LedgerStore as a sidecar and
+persists it to LEDGER_DIR/AGGREGATES.json after every append, so the
+dashboard reads one small file per refresh. The snapshot records where
+its tip stone sits (segment and offset), so reopening it is checked with
+a single read_at, like TIP.json. A stone's hour is taken from
+its `timestamp` field. Stones without one are counted as `undated` and
+left out of the hourly series, so rebuilding never moves them.
+"""
+
+import json
+import time
+from collections import Counter, deque
+from datetime import datetime, timezone
+from pathlib import Path
+
+from codex_watcher.ledger import LEDGER_DIR, LedgerError, atomic_write_json
+from codex_watcher.tail import stone_row
+
+AGGREGATES_NAME = "AGGREGATES.json"
+LATEST_STONES   = 10
+HOUR_FORMAT     = "%Y-%m-%dT%H:00"
+
+
+def hour_bucket(row):
+    """The UTC hour of the stone's timestamp, or None if it has no usable one."""
+    ts = row.get("timestamp")
+    if ts:
+        try:
+            when = datetime.fromisoformat(str(ts).replace("Z", "+00:00"))
+            if when.tzinfo is not None:
+                when = when.astimezone(timezone.utc)
+            return when.strftime(HOUR_FORMAT)
+        except ValueError:
+            pass
+    return None
+
+
+class Aggregates:
+    """Counts and recent rows over a prefix of the chain."""
+
+    def __init__(self, latest=LATEST_STONES):
+        self.height = 0
+        self.tip = None
+        self.tip_pos = None
+        self.per_hour = Counter()
+        self.undated = 0
+        self.per_author = Counter()
+        self.per_axis = Counter()
+        self.delta_sum = 0.0
+        self.delta_count = 0
+        self.last_at = None
+        self.latest = deque(maxlen=latest)
+
+    def add(self, row, now=None, pos=None):
+        hour = hour_bucket(row)
+        if hour is None:
+            self.undated += 1
+        else:
+            self.per_hour[hour] += 1
+        self.per_author[row.get("author") or "unknown"] += 1
+        self.per_axis[row.get("axis") or "unknown"] += 1
+        try:
+            self.delta_sum += float(row["delta"])
+            self.delta_count += 1
+        except (KeyError, TypeError, ValueError):
+            pass
+        self.last_at = row.get("timestamp") or time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime(now))
+        self.latest.append(row)
+        self.height = row["height"] + 1
+        self.tip = row["digest"]
+        self.tip_pos = pos
+
+    def snapshot(self):
+        return {
+            "height": self.height,
+            "tip": self.tip,
+            "tip_segment": self.tip_pos[0] if self.tip_pos else None,
+            "tip_offset": self.tip_pos[1] if self.tip_pos else None,
+            "per_hour": dict(sorted(self.per_hour.items())),
+            "undated": self.undated,
+            "per_author": dict(self.per_author),
+            "per_axis": dict(self.per_axis),
+            "delta_sum": self.delta_sum,
+            "delta_count": self.delta_count,
+            "last_at": self.last_at,
+            "latest": list(self.latest),
+        }
+
+    @classmethod
+    def from_snapshot(cls, snap, latest=LATEST_STONES):
+        agg = cls(latest)
+        agg.height = snap["height"]
+        agg.tip = snap["tip"]
+        if snap["tip_segment"] is not None:
+            agg.tip_pos = (snap["tip_segment"], snap["tip_offset"])
+        agg.per_hour.update(snap["per_hour"])
+        agg.undated = snap["undated"]
+        agg.per_author.update(snap["per_author"])
+        agg.per_axis.update(snap["per_axis"])
+        agg.delta_sum = snap["delta_sum"]
+        agg.delta_count = snap["delta_count"]
+        agg.last_at = snap["last_at"]
+        agg.latest.extend(snap["latest"])
+        return agg
+
+
+class AggregateLog:
+    """Aggregates sidecar kept in step with a LedgerStore."""
+
+    def __init__(self, store, latest=LATEST_STONES):
+        self.store = store
+        self.path = store.root / AGGREGATES_NAME
+        self.latest = latest
+        self.agg = Aggregates(latest)
+        self._loaded = False
+
+    def _load(self):
+        try:
+            agg = Aggregates.from_snapshot(json.loads(self.path.read_text(encoding="utf-8")), self.latest)
+        except (OSError, ValueError, KeyError, TypeError):
+            return self.rebuild()
+        # trust the file only if its tip is still the stone it recorded
+        if agg.height > self.store.height or (agg.height and not self._tip_holds(agg)):
+            return self.rebuild()
+        self.agg = agg
+        self._loaded = True
+        return self
+
+    def _tip_holds(self, agg):
+        try:
+            return self.store.read_at(*agg.tip_pos)["digest"] == agg.tip
+        except (OSError, ValueError, KeyError, TypeError, LedgerError):
+            return False
+
+    def sync(self):
+        if not self._loaded:
+            self._load()
+        if self.agg.height < self.store.height:
+            with self.store._locked():
+                self._add(self.store.iter_positions(self.agg.height))
+        return self
+
+    def rebuild(self):
+        self.agg = Aggregates(self.latest)
+        self._loaded = True
+        self._add(self.store.iter_positions(0))
+        return self
+
+    def _add(self, entries):
+        """Count (height, segment start, offset, stone) entries and persist the snapshot."""
+        now = time.time()
+        for height, seg_start, offset, stone in entries:
+            self.agg.add(stone_row(height, stone), now, (seg_start, offset))
+        atomic_write_json(self.path, self.agg.snapshot())
+
+    def on_append(self, entries):
+        """Called by the store, under its lock, after new records are fsync'd."""
+        if not self._loaded or not entries:
+            return
+        if entries[0][0] == self.agg.height:
+            self._add(entries)
+        elif entries[0][0] > self.agg.height:
+            # another process appended since we last looked: catch up from the segments
+            self._add(self.store.iter_positions(self.agg.height))
+
+
+def read_aggregates(root=LEDGER_DIR):
+    """The last persisted snapshot, or None if the sidecar has not been written yet."""
+    try:
+        return json.loads((Path(root) / AGGREGATES_NAME).read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return None
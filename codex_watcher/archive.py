@@ -0,0 +1,207 @@
+# codex_watcher/archive.py
+"""
+Packed archives for inbox/_processed and inbox/_rejected.
+
+Filed-away inbox files are rolled into zip bundles under inbox/_archive
+(processed-000001.zip, rejected-000001.zip, …). Each bundle holds at most
+BUNDLE_BYTES of input. Every bundle carries an INDEX.jsonl member listing
+each file's name, digest and size, plus the reason for rejects (taken
+from the watcher's reject log). The same entries are appended to
+inbox/_archive/index.jsonl, so a file can be found by name or digest
+without opening any bundle.
+
+A bundle is written under a temporary name, fsync'd and renamed into
+place. Only then are the originals deleted and the bundle's entries
+indexed. STATE.json records the last indexed bundle of each kind and the
+index length at that point. If a run dies part-way, recover() trims the
+index back to that length and re-indexes any newer bundle from its own
+INDEX.jsonl. It also deletes the originals such a bundle already holds.
+"""
+
+import json
+import os
+import zipfile
+
+from codex_watcher.cli import (
+    INBOX_DIR, PROCESSED_DIR, REJECTED_DIR, REJECT_LOG, logger, parse_inbox_file,
+)
+from codex_watcher.ledger import atomic_write_bytes, atomic_write_json, fsync_dir
+
+ARCHIVE_DIR   = INBOX_DIR / "_archive"
+INDEX_FILE    = ARCHIVE_DIR / "index.jsonl"
+STATE_FILE    = ARCHIVE_DIR / "STATE.json"
+BUNDLE_INDEX  = "INDEX.jsonl"
+BUNDLE_BYTES  = 64 * 1024 * 1024
+COMPRESS_LEVEL = 6
+KINDS = {"processed": PROCESSED_DIR, "rejected": REJECTED_DIR}
+
+
+# ── State ─────────────────────────────────────────────────────────────────────
+def load_state():
+    try:
+        return json.loads(STATE_FILE.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {"index_bytes": 0, "last": {}}
+
+def bundles(kind):
+    return sorted(ARCHIVE_DIR.glob(f"{kind}-*.zip"))
+
+def _next_bundle(kind):
+    existing = bundles(kind)
+    seq = int(existing[-1].stem.rsplit("-", 1)[1]) + 1 if existing else 1
+    return ARCHIVE_DIR / f"{kind}-{seq:06d}.zip"
+
+def _index(entries, state, kind, bundle):
+    """Append `entries` to index.jsonl and record `bundle` as indexed."""
+    data = "".join(json.dumps(e, ensure_ascii=False) + "\n" for e in entries).encode("utf-8")
+    with open(INDEX_FILE, "ab") as fh:
+        fh.write(data)
+        fh.flush()
+        os.fsync(fh.fileno())
+    state["index_bytes"] += len(data)
+    state["last"][kind] = bundle.name
+    atomic_write_json(STATE_FILE, state, indent=2)
+
+def _remove_originals(src_dir, entries):
+    for e in entries:
+        path = src_dir / e["name"]
+        try:
+            if path.stat().st_size == e["size"]:
+                path.unlink()
+        except FileNotFoundError:
+            pass
+    fsync_dir(src_dir)
+
+def recover():
+    """Finish whatever an interrupted archive run left half done."""
+    ARCHIVE_DIR.mkdir(parents=True, exist_ok=True)
+    for tmp in ARCHIVE_DIR.glob(".*.tmp"):
+        tmp.unlink()
+    state = load_state()
+    if INDEX_FILE.exists() and INDEX_FILE.stat().st_size != state["index_bytes"]:
+        with open(INDEX_FILE, "r+b") as fh:
+            fh.truncate(state["index_bytes"])
+    for kind, src_dir in KINDS.items():
+        last = state["last"].get(kind, "")
+        for bundle in bundles(kind):
+            if bundle.name <= last:
+                continue
+            with zipfile.ZipFile(bundle) as zf:
+                entries = [json.loads(l) for l in zf.read(BUNDLE_INDEX).decode("utf-8").splitlines()]
+            _remove_originals(src_dir, entries)
+            _index(entries, state, kind, bundle)
+            msg = f"🔁 archive: re-indexed {bundle.name} ({len(entries)} files)"
+            print(msg); logger.warning(msg)
+    return state
+
+
+# ── Reject reasons ────────────────────────────────────────────────────────────
+def load_reasons():
+    """name -> {"reason", "at"} from the watcher's reject log (latest wins)."""
+    reasons = {}
+    try:
+        with open(REJECT_LOG, encoding="utf-8") as fh:
+            for line in fh:
+                try:
+                    rec = json.loads(line)
+                except ValueError:
+                    continue
+                reasons[rec["name"]] = rec
+    except FileNotFoundError:
+        pass
+    return reasons
+
+def _forget_reasons(names):
+    kept = [r for name, r in load_reasons().items() if name not in names]
+    atomic_write_bytes(
+        REJECT_LOG, "".join(json.dumps(r, ensure_ascii=False) + "\n" for r in kept).encode("utf-8")
+    )
+
+
+# ── Archiving ─────────────────────────────────────────────────────────────────
+def _digest_of(path):
+    try:
+        return parse_inbox_file(path)[1]
+    except (OSError, ValueError, AttributeError):
+        return None
+
+def write_bundle(bundle, kind, files, reasons=None):
+    """Pack `files` into `bundle` (temp file + fsync + rename); returns their index entries."""
+    tmp = bundle.with_name(f".{bundle.name}.tmp")
+    entries = []
+    with zipfile.ZipFile(tmp, "w", zipfile.ZIP_DEFLATED, compresslevel=COMPRESS_LEVEL) as zf:
+        for path in files:
+            data = path.read_bytes()
+            info = zipfile.ZipInfo.from_file(path, path.name)
+            info.compress_type = zipfile.ZIP_DEFLATED
+            zf.writestr(info, data)
+            entry = {"name": path.name, "digest": _digest_of(path), "size": len(data),
+                     "kind": kind, "bundle": bundle.name}
+            if reasons is not None:
+                rec = reasons.get(path.name, {})
+                entry["reason"] = rec.get("reason")
+                entry["rejected_at"] = rec.get("at")
+            entries.append(entry)
+        zf.writestr(BUNDLE_INDEX, "".join(json.dumps(e, ensure_ascii=False) + "\n" for e in entries))
+    with open(tmp, "rb") as fh:
+        os.fsync(fh.fileno())
+    os.replace(tmp, bundle)
+    fsync_dir(ARCHIVE_DIR)
+    return entries
+
+def archive_kind(kind, bundle_bytes=BUNDLE_BYTES, state=None):
+    """Roll every file in the `kind` directory into new bundles; returns the number archived."""
+    src_dir = KINDS[kind]
+    state = state or recover()
+    files = sorted(p for p in src_dir.iterdir() if p.is_file() and not p.name.startswith("."))
+    reasons = load_reasons() if kind == "rejected" else None
+    archived = 0
+    group, size = [], 0
+
+    def roll():
+        nonlocal archived, group, size
+        bundle = _next_bundle(kind)
+        entries = write_bundle(bundle, kind, group, reasons)
+        _remove_originals(src_dir, entries)
+        _index(entries, state, kind, bundle)
+        archived += len(entries)
+        msg = f"📦 archived {len(entries)} {kind} files ({size / 1e6:.1f} MB) into {bundle.name}"
+        print(msg); logger.info(msg)
+        group, size = [], 0
+
+    for path in files:
+        n = path.stat().st_size
+        if group and size + n > bundle_bytes:
+            roll()
+        group.append(path)
+        size += n
+    if group:
+        roll()
+    if reasons is not None and archived:
+        _forget_reasons({p.name for p in files})
+    return archived
+
+def archive_all(bundle_bytes=BUNDLE_BYTES):
+    state = recover()
+    return {kind: archive_kind(kind, bundle_bytes, state) for kind in KINDS}
+
+
+# ── Lookup ────────────────────────────────────────────────────────────────────
+def find(key):
+    """Index entries whose file name or digest is `key`."""
+    found = []
+    try:
+        with open(INDEX_FILE, encoding="utf-8") as fh:
+            for line in fh:
+                if key in line:
+                    entry = json.loads(line)
+                    if key in (entry["name"], entry["digest"]):
+                        found.append(entry)
+    except FileNotFoundError:
+        pass
+    return found
+
+def read_archived(entry):
+    """The original bytes of an archived file."""
+    with zipfile.ZipFile(ARCHIVE_DIR / entry["bundle"]) as zf:
+        return zf.read(entry["name"])
@@ -2,42 +2,68 @@
 
 import hashlib
 import json
+import os
 import time
+import atexit
 import logging
+import logging.handlers
 import argparse
+import queue
+import sys
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
 from pathlib import Path
 
+from codex_watcher import metrics
+from codex_watcher.ledger import (
+    LEDGER_FILE, LEDGER_DIR, GENESIS_DIGEST, GENESIS_STRING,
+    atomic_write_json, fsync_dir, get_store,
+)
+from codex_watcher.policy import PolicyEngine, PolicyError
+from codex_watcher.query import QUERY_DB_NAME
+from codex_watcher.pool import PendingPool
+from codex_watcher.stone import Stone, StoneColumns, parse_fields
+
 # ── Paths ─────────────────────────────────────────────────────────────────────
-LEDGER_FILE   = Path("codex_ledger.json")
 INBOX_DIR     = Path("inbox")
 PROCESSED_DIR = INBOX_DIR / "_processed"
 REJECTED_DIR  = INBOX_DIR / "_rejected"
 LOG_FILE      = Path("codex_watcher.log")
+PENDING_DIR   = INBOX_DIR / "_pending"
+COMMIT_JOURNAL = INBOX_DIR / ".pending_commit.journal"
+POOL_FILE     = PENDING_DIR / ".pool.json"   # out of the inbox, where *.json is collected
+REJECT_LOG    = INBOX_DIR / ".rejected_reasons.jsonl"
 
-# ── Genesis constants ─────────────────────────────────────────────────────────
-GENESIS_DIGEST = "716ca6878eed87c3d4edc5a83a2e4161a109786b7be0f9093745139a6150710b"
-GENESIS_STRING = (
-    "seed=codex-web-launch-span4-header;"
-    "prev=e024d55b2591e147eaacbee48e21dee95b92f151a742279c90f4245957039435;"
-    "axis=CodexWebGenesis;charter=v1;"
-    "scope=interlinked-digests-for-auditable-knowledge;"
-    "invites=humans,AIs,communities;"
-    "routes=hash-addresses;"
-    "mirrors=x,github,substack;"
-    "trials=1;"
-    "author=system"
-)
+# ── Batch commit settings ─────────────────────────────────────────────────────
+BATCH_SIZE         = 256
+MAX_COMMIT_LATENCY = 1.0
+WORKERS            = 1
+
+# ── Pending pool settings ─────────────────────────────────────────────────────
+PENDING_TTL = 3600
+
+# ── Archive settings ──────────────────────────────────────────────────────────
+ARCHIVE_THRESHOLD = 10000   # files in _processed + _rejected that trigger a rollover (0 = off)
 
 # ── Policy settings ────────────────────────────────────────────────────────────
 BANNED_TERMS = {"password", "secret", "ssn", "private"}
+POLICY_FILE  = Path("policy.txt")
 
 # ── Logging setup ─────────────────────────────────────────────────────────────
-logging.basicConfig(
-    filename=str(LOG_FILE),
-    level=logging.INFO,
-    format="%(asctime)s %(levelname)s: %(message)s",
-    datefmt="%Y-%m-%d %H:%M:%S"
-)
+# records are handed to a queue and written by a listener thread, so the
+# scan loop never waits on the log file
+_log_queue = queue.SimpleQueue()
+_log_file = logging.FileHandler(str(LOG_FILE))
+_log_file.setFormatter(logging.Formatter(
+    "%(asctime)s %(levelname)s: %(message)s", datefmt="%Y-%m-%d %H:%M:%S"
+))
+_log_handler = logging.handlers.QueueHandler(_log_queue)
+_log_handler.setFormatter(logging.Formatter("%(message)s"))
+_log_listener = logging.handlers.QueueListener(_log_queue, _log_file)
+logging.basicConfig(level=logging.INFO, handlers=[_log_handler])
+_log_listener.start()
+atexit.register(_log_listener.stop)
 logger = logging.getLogger(__name__)
 
 # ── Core functions ────────────────────────────────────────────────────────────
@@ -45,20 +71,51 @@ def ensure_dirs():
     INBOX_DIR.mkdir(exist_ok=True)
     PROCESSED_DIR.mkdir(exist_ok=True)
     REJECTED_DIR.mkdir(exist_ok=True)
+    PENDING_DIR.mkdir(exist_ok=True)
+
+_store = None
+
+def open_ledger():
+    """The shared store without sidecars, for commands that only read the ledger."""
+    return get_store(LEDGER_DIR, legacy_file=LEDGER_FILE)
+
+def ledger_store():
+    global _store
+    if _store is None:
+        _store = open_ledger()
+        _store.merkle  # attach the MMR sidecar so every append extends it
+        _store.aggregates  # and the dashboard aggregates
+        if (LEDGER_DIR / QUERY_DB_NAME).exists():
+            _store.query_index  # opted in with `codex-query --build`
+    return _store
+
+_pool = None
+
+def pending_pool():
+    global _pool
+    if _pool is None:
+        legacy = INBOX_DIR / ".pending_pool.json"
+        if legacy.exists() and not POOL_FILE.exists():
+            PENDING_DIR.mkdir(parents=True, exist_ok=True)
+            legacy.rename(POOL_FILE)
+        _pool = PendingPool(POOL_FILE, PENDING_DIR, INBOX_DIR, ttl=PENDING_TTL)
+    return _pool
 
 def load_ledger():
-    if LEDGER_FILE.exists():
-        return json.loads(LEDGER_FILE.read_text(encoding="utf-8"))
-    ledger = [{"canonical": GENESIS_STRING, "digest": GENESIS_DIGEST}]
-    LEDGER_FILE.write_text(json.dumps(ledger, indent=2), encoding="utf-8")
-    return ledger
+    return StoneColumns(ledger_store().iter_stones())
+
+def append_stones(stones):
+    return ledger_store().append(stones)
 
-def save_ledger(ledger):
-    LEDGER_FILE.write_text(json.dumps(ledger, indent=2), encoding="utf-8")
+def export_ledger(path=LEDGER_FILE):
+    return open_ledger().export_legacy(path)
 
 def parse_inbox_file(path: Path):
-    text = path.read_text(encoding="utf-8").strip()
-    if path.suffix.lower() == ".json":
+    return parse_inbox_text(path.read_text(encoding="utf-8"), path.suffix)
+
+def parse_inbox_text(text: str, suffix: str):
+    text = text.strip()
+    if suffix.lower() == ".json":
         obj = json.loads(text)
         return obj.get("canonical"), obj.get("digest")
     lines = [l.strip() for l in text.splitlines() if l.strip()]
@@ -66,65 +123,379 @@ def parse_inbox_file(path: Path):
     digest = next((l.split("=",1)[1] for l in lines if l.lower().startswith("digest=")), None)
     return canon, digest
 
-def validate_stone(canonical: str, digest: str, tip_digest: str):
+def stone_fields(canonical: str):
+    return parse_fields(canonical)
+
+_policies = {}
+
+def policy_engine(path=None):
+    """Hot-reloading policy for `path` (default POLICY_FILE); BANNED_TERMS if it is absent."""
+    path = Path(path) if path else POLICY_FILE
+    engine = _policies.get(path)
+    if engine is None:
+        engine = _policies[path] = PolicyEngine(path, BANNED_TERMS)
+    return engine
+
+def inspect_stone(canonical: str, digest: str, policy_path=None, timings=None):
+    """
+    Stateless half of validation: split fields, check author, scan for
+    banned terms and recompute the digest. Returns (fields, reason) where
+    reason is the first failure or None; fields is None if there is
+    nothing to inspect. If `timings` is a list, (stage, seconds) pairs
+    for the policy scan and the hash are appended to it.
+    """
     if not canonical or not digest:
-        return False, "missing canonical or digest"
-    fields = dict(part.split("=",1) for part in canonical.split(";") if "=" in part)
-    if fields.get("prev") != tip_digest:
-        return False, f"prev mismatch: expected {tip_digest}, got {fields.get('prev')}"
+        return None, "missing canonical or digest"
+    fields = stone_fields(canonical)
     author = fields.get("author", "").strip()
     if not author:
-        return False, "missing author field"
-    low = canonical.lower()
-    for term in BANNED_TERMS:
-        if term in low:
-            return False, f"contains banned term: {term}"
+        return fields, "missing author field"
+    t0 = time.perf_counter()
+    term = policy_engine(policy_path).scan(canonical, fields)
+    t1 = time.perf_counter()
+    if timings is not None:
+        timings.append(("policy", t1 - t0))
+    if term:
+        return fields, f"contains banned term: {term}"
     computed = hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+    if timings is not None:
+        timings.append(("hash", time.perf_counter() - t1))
     if computed != digest:
-        return False, f"digest mismatch: expected {computed}, got {digest}"
+        return fields, f"digest mismatch: expected {computed}, got {digest}"
+    return fields, None
+
+def link_stone(digest: str, fields, reason, tip_digest: str, store=None):
+    """Serial half of validation: duplicate and prev-vs-tip checks, then the inspection result."""
+    if fields is None:
+        return False, reason
+    if store is not None and store.contains(digest):
+        return False, f"duplicate: already in ledger at height {store.position(digest)}"
+    if fields.get("prev") != tip_digest:
+        prev = fields.get("prev")
+        if store is not None and store.contains(prev):
+            return False, (
+                f"prev mismatch: {prev} is a known ancestor at height "
+                f"{store.position(prev)}, not the tip {tip_digest}"
+            )
+        return False, f"prev mismatch: expected {tip_digest}, got {prev}"
+    if reason:
+        return False, reason
     return True, "ok"
 
-def process_inbox_once():
-    ensure_dirs()
-    ledger = load_ledger()
-    tip = ledger[-1]["digest"]
-    files = sorted(
-        p for p in INBOX_DIR.glob("*")
-        if p.is_file() and p.suffix.lower() in {".json", ".txt"}
+def validate_stone(canonical: str, digest: str, tip_digest: str, store=None):
+    fields, reason = inspect_stone(canonical, digest)
+    return link_stone(digest, fields, reason, tip_digest, store)
+
+# ── Parallel prepare stage ────────────────────────────────────────────────────
+def prepare_file(path: Path, policy_path=None):
+    """
+    Read, parse and inspect one inbox file; returns (path, canonical,
+    digest, fields, reason, error, timings) where timings are the
+    (stage, seconds) pairs measured along the way.
+    """
+    timings = []
+    try:
+        t0 = time.perf_counter()
+        text = path.read_text(encoding="utf-8")
+        t1 = time.perf_counter()
+        canonical, digest = parse_inbox_text(text, path.suffix)
+        timings += [("read", t1 - t0), ("parse", time.perf_counter() - t1)]
+        fields, reason = inspect_stone(canonical, digest, policy_path, timings)
+        return path, canonical, digest, fields, reason, None, timings
+    except PolicyError:
+        raise   # not the stone's fault: the scan stops and the file stays in the inbox
+    except Exception as e:
+        return path, None, None, None, None, str(e), timings
+
+_executor = None
+_executor_workers = 0
+
+def prepare_files(files, workers=1):
+    """
+    Yield prepare_file() results in input order. With workers > 1 the files
+    are prepared in a process pool with at most 4 × workers in flight.
+    """
+    global _executor, _executor_workers
+    if workers <= 1 or len(files) < 2 * workers:
+        for f in files:
+            yield prepare_file(f, POLICY_FILE)
+        return
+    if _executor is None or _executor_workers != workers:
+        if _executor is not None:
+            _executor.shutdown()
+        _executor = ProcessPoolExecutor(max_workers=workers)
+        _executor_workers = workers
+    in_flight = deque()
+    it = iter(files)
+    for f in islice(it, 4 * workers):
+        in_flight.append(_executor.submit(prepare_file, f, POLICY_FILE))
+    while in_flight:
+        result = in_flight.popleft().result()
+        for f in islice(it, 1):
+            in_flight.append(_executor.submit(prepare_file, f, POLICY_FILE))
+        yield result
+
+# ── Batch commit ──────────────────────────────────────────────────────────────
+def commit_batch(batch):
+    """
+    Append a batch of (path, stone, ...) tuples in one write, then move the files
+    to _processed. A journal written beforehand lets recover_pending_commit()
+    reconcile the inbox if we crash (or raise) between the append and the moves,
+    so on any error the journal is left in place.
+    """
+    if not batch:
+        return
+    store = ledger_store()
+    # the base height must not move between the journal write and the append
+    with store._locked():
+        atomic_write_json(COMMIT_JOURNAL, {
+            "base_height": len(store),
+            "entries": [{"path": str(f), "digest": s["digest"]} for f, s, *_ in batch],
+        })
+        with metrics.METRICS.timer("ledger_write"):
+            height = append_stones([s for _, s, *_ in batch])
+    with metrics.METRICS.timer("rename"):
+        for f, *_ in batch:
+            f.rename(PROCESSED_DIR / f.name)
+        fsync_dir(PROCESSED_DIR)
+        fsync_dir(INBOX_DIR)
+    COMMIT_JOURNAL.unlink()
+    note_filed(len(batch))
+    metrics.METRICS.inc("stones_appended", len(batch))
+    metrics.METRICS.set_gauge("ledger_height", height)
+
+def recover_pending_commit():
+    """Finish or roll back the file moves of a batch interrupted by a crash."""
+    if not COMMIT_JOURNAL.exists():
+        return 0
+    try:
+        journal = json.loads(COMMIT_JOURNAL.read_text(encoding="utf-8"))
+    except ValueError:
+        # torn journal: the append never started, files are still in the inbox
+        COMMIT_JOURNAL.unlink()
+        return 0
+    base = journal["base_height"]
+    entries = journal["entries"]
+    committed = [
+        s["digest"] for s in islice(ledger_store().iter_stones(base), len(entries))
+    ]
+    moved = 0
+    for i, entry in enumerate(entries):
+        src = Path(entry["path"])
+        if not src.exists():
+            continue
+        if i < len(committed) and committed[i] == entry["digest"]:
+            src.rename(PROCESSED_DIR / src.name)
+            moved += 1
+    fsync_dir(PROCESSED_DIR)
+    COMMIT_JOURNAL.unlink()
+    msg = (
+        f"🔁 recovered batch: {len(committed)}/{len(entries)} stones committed, "
+        f"{moved} files moved to _processed"
+    )
+    print(msg); logger.warning(msg)
+    return moved
+
+# ── Filing and archive rollover ───────────────────────────────────────────────
+def record_reject(f, reason):
+    """Move `f` to _rejected and log why, for the archive index."""
+    with metrics.METRICS.timer("rename"):
+        f.rename(REJECTED_DIR / f.name)
+    metrics.METRICS.reject(reason)
+    with open(REJECT_LOG, "a", encoding="utf-8") as fh:
+        fh.write(json.dumps({
+            "name": f.name, "reason": reason, "at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        }, ensure_ascii=False) + "\n")
+    note_filed(1)
+
+_filed = None   # files waiting in _processed + _rejected, counted lazily
+
+def note_filed(n):
+    global _filed
+    if _filed is not None:
+        _filed += n
+
+def maybe_archive():
+    """Roll _processed and _rejected into bundles once ARCHIVE_THRESHOLD files have piled up."""
+    global _filed
+    if not ARCHIVE_THRESHOLD:
+        return
+    if _filed is None:
+        _filed = sum(1 for d in (PROCESSED_DIR, REJECTED_DIR) for _ in os.scandir(d))
+    if _filed >= ARCHIVE_THRESHOLD:
+        from codex_watcher.archive import archive_all
+        archive_all()
+        _filed = 0
+
+# ── Core processing ───────────────────────────────────────────────────────────
+def is_inbox_file(p: Path):
+    return (
+        not p.name.startswith(".")
+        and p.suffix.lower() in {".json", ".txt"}
+        and p.is_file()
     )
+
+def process_inbox_once(batch_size=BATCH_SIZE, max_latency=MAX_COMMIT_LATENCY, workers=WORKERS):
+    ensure_dirs()
+    recover_pending_commit()
+    with metrics.METRICS.timer("glob"):
+        files = sorted(p for p in INBOX_DIR.glob("*") if is_inbox_file(p))
+    metrics.METRICS.set_gauge("inbox_backlog", len(files))
+    return process_files(files, batch_size, max_latency, workers=workers)
+
+def process_files(files, batch_size=BATCH_SIZE, max_latency=MAX_COMMIT_LATENCY, arrivals=None,
+                  workers=WORKERS):
+    """
+    Validate and append `files` in order. `arrivals` optionally maps file
+    names to the time.monotonic() they were seen, for latency reporting.
+    With workers > 1, parsing and hashing run in a process pool while
+    linking against the tip stays serial.
+    Stones whose parent has not arrived yet are parked in the pending pool
+    and cascade in as soon as that parent is appended.
+    """
+    with metrics.scan(active=bool(files)):
+        return _process_files(files, batch_size, max_latency, arrivals, workers)
+
+def _process_files(files, batch_size, max_latency, arrivals, workers):
+    try:
+        policy_engine().reload_if_changed()
+    except PolicyError as e:
+        msg = f"❌ {e} | scan skipped, {len(files)} files left in the inbox"
+        print(msg); logger.error(msg)
+        return 0
+    store = ledger_store()
+    pool = pending_pool()
+    tip = store.tip_digest()
     added = 0
-    for f in files:
+    batch = []
+    batch_digests = set()
+    batch_started = None
+
+    def flush():
+        nonlocal batch, batch_started, added
+        try:
+            commit_batch(batch)
+        except Exception as e:
+            # the stones may already be in the ledger: stop here and let the
+            # journal be reconciled by recover_pending_commit() on the next scan
+            msg = f"💥 batch commit failed ({len(batch)} stones): {e} | scan aborted, journal kept"
+            print(msg); logger.error(msg)
+            raise
+        now = time.monotonic()
+        for f, stone, note in batch:
+            msg = f"✅ appended: {f.name} | new tip={stone['digest']}{note}"
+            if arrivals and f.name in arrivals:
+                msg += f" | latency={(now - arrivals[f.name]) * 1000:.1f}ms"
+            print(msg); logger.info(msg)
+        added += len(batch)
+        batch, batch_started = [], None
+        batch_digests.clear()
+
+    def accept(f, stone, note=""):
+        nonlocal tip, batch_started
+        batch.append((f, stone, note))
+        batch_digests.add(stone["digest"])
+        tip = stone["digest"]
+        if batch_started is None:
+            batch_started = time.monotonic()
+
+    def due():
+        return batch and (
+            len(batch) >= batch_size or time.monotonic() - batch_started >= max_latency
+        )
+
+    def prepared():
         try:
-            canonical, digest = parse_inbox_file(f)
-            valid, reason = validate_stone(canonical, digest, tip)
+            yield from prepare_files(files, workers)
+        except PolicyError as e:
+            # a worker could not load the policy: stop, leaving the rest in the inbox
+            msg = f"❌ {e} | scan stopped, remaining files left in the inbox"
+            print(msg); logger.error(msg)
+
+    def reject(f, reason):
+        record_reject(f, reason)
+        msg = f"❌ rejected: {f.name} | {reason}"
+        print(msg); logger.warning(msg)
+
+    def cascade():
+        children = pool.take(tip)
+        while children:
+            entry = children.pop(0)
+            path = pool.path_of(entry)
+            canonical, digest = entry["canonical"], entry["digest"]
+            if digest in batch_digests:
+                valid, reason = False, "duplicate: already in this batch"
+            else:
+                valid, reason = validate_stone(canonical, digest, tip, store)
             if valid:
-                ledger.append({"canonical": canonical, "digest": digest})
-                save_ledger(ledger)
-                tip = digest
-                f.rename(PROCESSED_DIR / f.name)
-                msg = f"✅ appended: {f.name} | new tip={tip}"
-                print(msg); logger.info(msg)
-                added += 1
+                waited = pool.record_resolved(entry)
+                accept(path, Stone(canonical, digest),
+                       f" | resolved after {waited:.1f}s in pending pool")
+                children = pool.take(tip) + children
             else:
-                f.rename(REJECTED_DIR / f.name)
-                msg = f"❌ rejected: {f.name} | {reason}"
-                print(msg); logger.warning(msg)
+                reject(path, reason)
+
+    for entry in pool.expire():
+        reject(pool.path_of(entry), f"orphan: parent {entry['prev']} not seen within {pool.ttl}s")
+    # children of a tip appended elsewhere (e.g. by codex_chain) since the last scan
+    cascade()
+
+    for f, canonical, digest, fields, inspected, error, timings in prepared():
+        metrics.METRICS.observe_many(timings)
+        # outside the per-file try: a failed commit must not be filed as a reject
+        if due():
+            flush()
+        try:
+            if error is not None:
+                raise ValueError(error)
+            if digest in batch_digests:
+                valid, reason = False, "duplicate: already in this batch"
+            elif digest in pool:
+                valid, reason = False, "duplicate: already waiting in pending pool"
+            else:
+                valid, reason = link_stone(digest, fields, inspected, tip, store)
+            if valid:
+                accept(f, Stone(canonical, digest, fields))
+                cascade()
+                continue
+            if reason.startswith("prev mismatch"):
+                prev = fields.get("prev")
+                if prev and prev not in batch_digests and not store.contains(prev):
+                    # unknown parent: hold it if everything except linkage checks out
+                    if inspected is None:
+                        pool.add(f, canonical, digest, prev)
+                        msg = f"⏳ pending: {f.name} | waiting for parent {prev}"
+                        print(msg); logger.info(msg)
+                        continue
+                    reason = inspected
+            reject(f, reason)
         except Exception as e:
-            f.rename(REJECTED_DIR / f.name)
+            record_reject(f, f"error: {e}")
             msg = f"❌ error: {f.name} | {e}"
             print(msg); logger.error(msg)
-    status = f"Ledger length: {len(ledger)} | current tip: {tip} | added: {added}"
+    flush()
+    pool.save()
+    stats = pool.stats()
+    status = (
+        f"Ledger length: {len(store)} | current tip: {tip} | added: {added} | "
+        f"pending: {stats['pending']} | resolved: {stats['resolved']} "
+        f"(avg {stats['resolve_avg_s']}s, max {stats['resolve_max_s']}s)"
+    )
     print(status); logger.info(status)
+    metrics.METRICS.set_gauge("pending_stones", stats["pending"])
+    metrics.METRICS.set_gauge("ledger_height", len(store))
+    maybe_archive()
     return added
 
-def duty_cycle_watch(active_seconds=15, rest_seconds=15, interval=3, max_cycles=None):
+def duty_cycle_watch(active_seconds=15, rest_seconds=15, interval=3, max_cycles=None,
+                     batch_size=BATCH_SIZE, max_latency=MAX_COMMIT_LATENCY, workers=WORKERS):
     cycle = 0
     while True:
         cycle += 1
         print(f"▶️ Active scan ({active_seconds}s) — cycle {cycle}")
         start = time.time()
         while time.time() - start < active_seconds:
-            process_inbox_once()
+            process_inbox_once(batch_size, max_latency, workers)
             time.sleep(interval)
         print(f"⏸ Resting ({rest_seconds}s)")
         time.sleep(rest_seconds)
@@ -134,7 +505,91 @@ def duty_cycle_watch(active_seconds=15, rest_seconds=15, interval=3, max_cycles=
 
 # ── CLI Entrypoint ────────────────────────────────────────────────────────────
 def main():
+    global POLICY_FILE, PENDING_TTL, ARCHIVE_THRESHOLD
     parser = argparse.ArgumentParser()
+    sub = parser.add_subparsers(dest="command")
+    p_export = sub.add_parser("export", help="Write the ledger as a legacy JSON array")
+    p_export.add_argument(
+        "--out",
+        type=Path,
+        default=LEDGER_FILE,
+        help="Destination file"
+    )
+    sub.add_parser("reindex", help="Rebuild the digest index sidecar from the ledger")
+    p_prove = sub.add_parser("prove", help="Print a Merkle inclusion proof for a stone digest")
+    p_prove.add_argument("digest", help="Stone digest to prove")
+    p_prove.add_argument(
+        "--size",
+        type=int,
+        help="Prove against the tree of this many stones (default: current)"
+    )
+    p_consistency = sub.add_parser(
+        "consistency", help="Print a Merkle consistency proof between two ledger sizes"
+    )
+    p_consistency.add_argument("old_size", type=int, help="Stone count of the older tip")
+    p_consistency.add_argument(
+        "--new-size",
+        type=int,
+        help="Stone count of the newer tip (default: current)"
+    )
+    p_check = sub.add_parser(
+        "check-proof", help="Verify an inclusion or consistency proof without the ledger"
+    )
+    p_check.add_argument("proof", type=Path, help="Proof JSON file ('-' for stdin)")
+    p_check.add_argument(
+        "--root", help="Trusted root (the new root for consistency proofs); required for ✅"
+    )
+    p_check.add_argument(
+        "--old-root", help="Trusted old root for consistency proofs; required for ✅"
+    )
+    p_verify = sub.add_parser("verify", help="Re-verify every digest and prev link in the ledger")
+    p_verify.add_argument(
+        "--workers",
+        type=int,
+        dest="verify_workers",
+        help="Processes used to hash segments (default: all cores)"
+    )
+    p_verify.add_argument(
+        "--full",
+        action="store_true",
+        help="Ignore the verified-up-to checkpoint and check from genesis"
+    )
+    p_serve = sub.add_parser("serve", help="Serve the ledger to peers for range sync")
+    p_serve.add_argument("--host", default="127.0.0.1", help="Interface to bind")
+    p_serve.add_argument("--port", type=int, default=8765, help="Port to listen on")
+    p_archive = sub.add_parser(
+        "archive", help="Roll _processed and _rejected into compressed bundles"
+    )
+    p_archive.add_argument(
+        "--bundle-mb",
+        type=float,
+        default=64,
+        help="Max input megabytes per bundle"
+    )
+    p_archive.add_argument("--find", metavar="NAME_OR_DIGEST", help="Look up an archived file")
+    p_archive.add_argument("--show", action="store_true", help="Print the archived file (--find)")
+    p_api = sub.add_parser("api", help="Serve read-only stone lookups over HTTP")
+    p_api.add_argument("--host", default="127.0.0.1", help="Interface to bind")
+    p_api.add_argument("--port", type=int, default=8766, help="Port to listen on")
+    p_api.add_argument(
+        "--cache-size",
+        type=int,
+        default=4096,
+        help="Responses kept in the in-memory LRU"
+    )
+    p_sync = sub.add_parser("sync", help="Pull the stones a peer has after our tip")
+    p_sync.add_argument("peer", help="Peer base URL, e.g. http://10.0.0.2:8765")
+    p_sync.add_argument(
+        "--batch",
+        type=int,
+        default=5000,
+        help="Stones requested per range call"
+    )
+    p_sync.add_argument(
+        "--max-stones",
+        type=int,
+        help="Stop after pulling this many stones (default: the whole suffix)"
+    )
     parser.add_argument(
         "--watch",
         action="store_true",
@@ -161,19 +616,259 @@ def main():
     parser.add_argument(
         "--cycles",
         type=int,
-        help="Stop after this many scan/rest cycles"
+        help="Stop after this many scan/rest cycles (fetch rounds with --pipeline)"
+    )
+    parser.add_argument(
+        "--events",
+        action="store_true",
+        help="Watch the inbox with inotify (or a polling fallback) instead of duty cycles"
+    )
+    parser.add_argument(
+        "--debounce",
+        type=float,
+        default=0.05,
+        help="Seconds to coalesce a burst of arrivals into one batch (--events)"
+    )
+    parser.add_argument(
+        "--rescan",
+        type=float,
+        default=60,
+        help="Seconds between safety rescans of the whole inbox (--events, --pipeline)"
+    )
+    parser.add_argument(
+        "--pipeline",
+        action="store_true",
+        help="Fetch mirrors in-process and stream stones straight into validation"
+    )
+    parser.add_argument(
+        "--fetch-interval",
+        type=float,
+        default=60,
+        help="Seconds between fetch rounds (--pipeline)"
+    )
+    parser.add_argument(
+        "--queue-size",
+        type=int,
+        default=1024,
+        help="Fetched stones buffered before the fetcher blocks (--pipeline)"
+    )
+    parser.add_argument(
+        "--audit",
+        action="store_true",
+        help="Also keep a copy of each accepted stone in _processed/ (--pipeline)"
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=WORKERS,
+        help="Processes used to parse and hash large inbox backlogs"
+    )
+    parser.add_argument(
+        "--policy",
+        type=Path,
+        default=POLICY_FILE,
+        help="Banned-term policy file (.txt or .json), reloaded when it changes"
+    )
+    parser.add_argument(
+        "--pending-ttl",
+        type=float,
+        default=PENDING_TTL,
+        help="Seconds a stone may wait in the pending pool for its parent"
+    )
+    parser.add_argument(
+        "--archive-threshold",
+        type=int,
+        default=ARCHIVE_THRESHOLD,
+        help="Archive _processed/_rejected once this many files pile up (0 = never)"
+    )
+    parser.add_argument(
+        "--metrics-port",
+        type=int,
+        help="Serve Prometheus metrics on this local port"
+    )
+    parser.add_argument(
+        "--metrics-file",
+        type=Path,
+        help="Rewrite Prometheus metrics to this file after every scan"
+    )
+    parser.add_argument(
+        "--profile",
+        type=Path,
+        metavar="DIR",
+        help="Write a profile of every non-empty scan into DIR"
+    )
+    parser.add_argument(
+        "--profile-mode",
+        choices=["cprofile", "sample"],
+        default="cprofile",
+        help="cProfile stats (.prof) or sampled collapsed stacks (.folded)"
+    )
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=BATCH_SIZE,
+        help="Max stones appended per ledger commit"
+    )
+    parser.add_argument(
+        "--max-latency",
+        type=float,
+        default=MAX_COMMIT_LATENCY,
+        help="Max seconds a validated stone waits before its batch is committed"
     )
     args = parser.parse_args()
 
-    if args.watch:
+    # read-only commands open the ledger as it is on disk: no inbox dirs, no
+    # sidecars to catch up; only the ingest modes and sync use ledger_store()
+    PENDING_TTL = args.pending_ttl   # the pool itself is opened by the watcher modes only
+    POLICY_FILE = args.policy
+    ARCHIVE_THRESHOLD = args.archive_threshold
+    metrics.configure(
+        port=args.metrics_port,
+        path=args.metrics_file,
+        profile_dir=args.profile,
+        profile_mode=args.profile_mode
+    )
+
+    if args.command == "export":
+        out = export_ledger(args.out)
+        print(f"Exported {len(open_ledger())} stones to {out}")
+    elif args.command == "verify":
+        from codex_watcher.verify import verify_chain
+        result = verify_chain(open_ledger(), workers=args.verify_workers, full=args.full)
+        for height, reason in result["errors"]:
+            msg = f"❌ height {height}: {reason}"
+            print(msg); logger.error(msg)
+        msg = (
+            f"{'✅' if result['ok'] else '❌'} verified {result['checked']} stones "
+            f"(from height {result['resumed_from']} to {result['height']}) in "
+            f"{result['seconds']}s across {result['chunks']} chunks | errors: {result['error_count']}"
+        )
+        print(msg); logger.info(msg)
+        if not result["ok"]:
+            raise SystemExit(1)
+    elif args.command == "prove":
+        store = open_ledger()
+        height = store.position(args.digest)
+        if height is None or (args.size is not None and height >= args.size):
+            raise SystemExit(f"❌ unknown digest: {args.digest}")
+        proof = store.merkle.inclusion_proof(height, args.size)
+        proof["digest"] = args.digest
+        print(json.dumps(proof, indent=2))
+    elif args.command == "consistency":
+        proof = open_ledger().merkle.consistency_proof(args.old_size, args.new_size)
+        print(json.dumps(proof, indent=2))
+    elif args.command == "check-proof":
+        from codex_watcher.merkle import verify_consistency, verify_inclusion
+        text = sys.stdin.read() if str(args.proof) == "-" else args.proof.read_text(encoding="utf-8")
+        proof = json.loads(text)
+        if "old_size" in proof:
+            ok = verify_consistency(proof, old_root=args.old_root, new_root=args.root)
+            what = f"consistency {proof['old_size']} → {proof['new_size']}"
+            missing = [flag for flag, root in (("--old-root", args.old_root), ("--root", args.root))
+                       if root is None]
+        else:
+            ok = verify_inclusion(proof, digest=proof.get("digest"), root=args.root)
+            what = f"inclusion of leaf {proof['leaf_index']} in tree of {proof['tree_size']}"
+            missing = ["--root"] if args.root is None else []
+        if not ok:
+            print(f"❌ invalid {what}")
+            raise SystemExit(1)
+        if missing:
+            # a proof checked only against the roots it carries proves nothing
+            print(
+                f"⚠️ consistent but unanchored {what}: "
+                f"pass {' and '.join(missing)} from a trusted source"
+            )
+            raise SystemExit(2)
+        print(f"✅ valid {what}")
+    elif args.command == "serve":
+        from codex_watcher.replicate import serve
+        serve(open_ledger(), host=args.host, port=args.port)
+    elif args.command == "archive":
+        from codex_watcher import archive
+        ensure_dirs()
+        if args.find:
+            entries = archive.find(args.find)
+            if not entries:
+                raise SystemExit(f"❌ not in the archive: {args.find}")
+            for entry in entries:
+                print(json.dumps(entry, ensure_ascii=False))
+                if args.show:
+                    print(archive.read_archived(entry).decode("utf-8", "replace"))
+        else:
+            counts = archive.archive_all(int(args.bundle_mb * 1024 * 1024))
+            print(f"Archived {counts['processed']} processed and {counts['rejected']} rejected files")
+    elif args.command == "api":
+        from codex_watcher.lookup import serve_lookup
+        serve_lookup(open_ledger(), host=args.host, port=args.port, cache_size=args.cache_size)
+    elif args.command == "sync":
+        from codex_watcher.replicate import SyncError, sync
+        try:
+            result = sync(ledger_store(), args.peer, batch=args.batch, max_stones=args.max_stones)
+        except SyncError as e:
+            msg = f"❌ sync with {args.peer} failed: {e}"
+            print(msg); logger.error(msg)
+            raise SystemExit(1)
+        status = result["status"]
+        if status == "synced":
+            msg = (
+                f"✅ pulled {result['pulled']} stones from {args.peer} in {result['seconds']}s | "
+                f"height {result['local_height']} → {result['height']} | tip={result['tip']}"
+            )
+            if result["remaining"]:
+                msg += f" | {result['remaining']} more on peer"
+        elif status == "up-to-date":
+            msg = f"✅ in sync with {args.peer} at height {result['local_height']}"
+        elif status == "ahead":
+            msg = (
+                f"✅ ahead of {args.peer}: local height {result['local_height']}, "
+                f"peer height {result['remote_height']}"
+            )
+        else:
+            msg = (
+                f"⚠️ diverged from {args.peer}: common ancestor at height "
+                f"{result['ancestor_height']} ({result['ancestor']}) | "
+                f"{result['local_after']} local and {result['remote_after']} peer stones after it"
+            )
+        print(msg); logger.info(msg)
+        if status == "diverged":
+            raise SystemExit(1)
+    elif args.command == "reindex":
+        index = open_ledger().index.rebuild()
+        print(f"Indexed {len(index)} stones")
+    elif args.pipeline:
+        from codex_watcher.stream import pipeline_run
+        pipeline_run(
+            fetch_interval=args.fetch_interval,
+            rounds=args.cycles,
+            queue_size=args.queue_size,
+            audit=args.audit,
+            sweep_interval=args.rescan,
+            batch_size=args.batch_size,
+            max_latency=args.max_latency,
+            workers=args.workers
+        )
+    elif args.events:
+        from codex_watcher.events import event_watch
+        event_watch(
+            debounce=args.debounce,
+            rescan_interval=args.rescan,
+            batch_size=args.batch_size,
+            max_latency=args.max_latency,
+            workers=args.workers
+        )
+    elif args.watch:
         duty_cycle_watch(
             active_seconds=args.active,
             rest_seconds=args.rest,
             interval=args.interval,
-            max_cycles=args.cycles
+            max_cycles=args.cycles,
+            batch_size=args.batch_size,
+            max_latency=args.max_latency,
+            workers=args.workers
         )
     else:
-        process_inbox_once()
+        process_inbox_once(args.batch_size, args.max_latency, args.workers)
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,179 @@
+# codex_watcher/events.py
+"""
+Event-driven inbox watching.
+
+On Linux the inbox is watched with inotify (through ctypes, no extra
+dependency) for IN_CLOSE_WRITE / IN_MOVED_TO, so a stone is picked up as
+soon as its writer closes it. Elsewhere a polling fallback stats the
+directory and reports files whose size and mtime have held steady for
+one poll. Bursts are coalesced for `debounce` seconds into one batch,
+and the whole inbox is rescanned every `rescan_interval` seconds in case
+an event was missed.
+"""
+
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import sys
+import time
+
+from codex_watcher.cli import (
+    BATCH_SIZE, INBOX_DIR, MAX_COMMIT_LATENCY, WORKERS,
+    ensure_dirs, is_inbox_file, logger, process_files, process_inbox_once,
+    recover_pending_commit,
+)
+from codex_watcher.metrics import METRICS
+
+# ── inotify constants (linux/inotify.h) ───────────────────────────────────────
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO    = 0x00000080
+IN_Q_OVERFLOW  = 0x00004000
+IN_NONBLOCK    = os.O_NONBLOCK
+IN_CLOEXEC     = getattr(os, "O_CLOEXEC", 0o2000000)
+_EVENT_HEADER  = struct.Struct("iIII")
+
+
+class InotifyWatcher:
+    """Reports names of files closed-for-write or moved into `path`."""
+
+    def __init__(self, path):
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        self.fd = libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        wd = libc.inotify_add_watch(self.fd, os.fsencode(str(path)), IN_CLOSE_WRITE | IN_MOVED_TO)
+        if wd < 0:
+            err = ctypes.get_errno()
+            os.close(self.fd)
+            raise OSError(err, f"inotify_add_watch failed for {path}")
+        self.overflowed = False
+
+    def wait(self, timeout):
+        """Block up to `timeout` seconds; return the file names that arrived."""
+        ready, _, _ = select.select([self.fd], [], [], max(timeout, 0))
+        if not ready:
+            return []
+        names = []
+        while True:
+            try:
+                buf = os.read(self.fd, 64 * 1024)
+            except BlockingIOError:
+                break
+            pos = 0
+            while pos < len(buf):
+                _, mask, _, length = _EVENT_HEADER.unpack_from(buf, pos)
+                pos += _EVENT_HEADER.size
+                name = buf[pos:pos + length].rstrip(b"\0")
+                pos += length
+                if mask & IN_Q_OVERFLOW:
+                    self.overflowed = True
+                elif name:
+                    names.append(os.fsdecode(name))
+        return names
+
+    def close(self):
+        os.close(self.fd)
+
+
+class PollingWatcher:
+    """
+    Fallback for platforms without inotify. Checks the directory mtime every
+    `poll_interval` seconds and reports a file once its size and mtime are
+    unchanged between two polls (our stand-in for closed-for-write).
+    """
+
+    overflowed = False
+
+    def __init__(self, path, poll_interval=0.25):
+        self.path = path
+        self.poll_interval = poll_interval
+        self._dir_mtime = None
+        self._pending = {}
+
+    def wait(self, timeout):
+        deadline = time.monotonic() + max(timeout, 0)
+        while True:
+            names = self._poll()
+            if names or time.monotonic() >= deadline:
+                return names
+            time.sleep(min(self.poll_interval, max(deadline - time.monotonic(), 0)))
+
+    def _poll(self):
+        mtime = os.stat(self.path).st_mtime_ns
+        if mtime == self._dir_mtime and not self._pending:
+            return []
+        self._dir_mtime = mtime
+        stable = []
+        seen = {}
+        with os.scandir(self.path) as it:
+            for entry in it:
+                if not entry.is_file():
+                    continue
+                st = entry.stat()
+                sig = (st.st_size, st.st_mtime_ns)
+                if self._pending.get(entry.name) == sig:
+                    stable.append(entry.name)
+                else:
+                    seen[entry.name] = sig
+        self._pending = seen
+        return stable
+
+    def close(self):
+        pass
+
+
+def make_watcher(path):
+    if sys.platform.startswith("linux"):
+        try:
+            return InotifyWatcher(path)
+        except (OSError, AttributeError) as e:
+            logger.warning(f"inotify unavailable ({e}); falling back to polling")
+    return PollingWatcher(path)
+
+
+# ── Event loop ────────────────────────────────────────────────────────────────
+def event_watch(debounce=0.05, rescan_interval=60, batch_size=BATCH_SIZE,
+                max_latency=MAX_COMMIT_LATENCY, workers=WORKERS, stop=None):
+    """
+    Process inbox files as they arrive. `stop` is an optional callable that
+    ends the loop when it returns True (checked between waits).
+    """
+    ensure_dirs()
+    recover_pending_commit()
+    watcher = make_watcher(INBOX_DIR)
+    print(f"👁 Watching {INBOX_DIR}/ ({type(watcher).__name__})")
+    # anything that landed before the watch was set up
+    process_inbox_once(batch_size, max_latency, workers)
+    next_rescan = time.monotonic() + rescan_interval
+    try:
+        while not (stop and stop()):
+            names = watcher.wait(min(next_rescan - time.monotonic(), 1.0))
+            if watcher.overflowed or time.monotonic() >= next_rescan:
+                watcher.overflowed = False
+                process_inbox_once(batch_size, max_latency, workers)
+                next_rescan = time.monotonic() + rescan_interval
+                continue
+            if not names:
+                continue
+            arrivals = {}
+            now = time.monotonic()
+            for name in names:
+                arrivals.setdefault(name, now)
+            burst_end = now + debounce
+            while len(arrivals) < batch_size and time.monotonic() < burst_end:
+                more = watcher.wait(burst_end - time.monotonic())
+                now = time.monotonic()
+                for name in more:
+                    arrivals.setdefault(name, now)
+            files = sorted(
+                p for p in (INBOX_DIR / name for name in arrivals) if is_inbox_file(p)
+            )
+            METRICS.set_gauge("queue_depth", len(files))
+            if files:
+                process_files(files, batch_size, max_latency, arrivals=arrivals, workers=workers)
+    except KeyboardInterrupt:
+        print("⏹ Watcher stopped.")
+    finally:
+        watcher.close()
@@ -0,0 +1,122 @@
+# codex_watcher/index.py
+"""
+Persistent digest → position index for the segmented ledger.
+
+The sidecar (LEDGER_DIR/digests.idx) holds one line per stone:
+
+    <digest>\t<height>\t<segment start>\t<byte offset>
+
+Lines are appended as the ledger grows, so lookups are a dict hit plus
+at most one seek into a segment. The sidecar is derived data: if it is
+missing, truncated or disagrees with the ledger it is rebuilt from the
+segments.
+"""
+
+import os
+
+from codex_watcher.ledger import INDEX_NAME, LedgerError
+
+
+class DigestIndex:
+    def __init__(self, store):
+        self.store = store
+        self.path = store.root / INDEX_NAME
+        self.positions = {}
+        self.count = 0
+        self.tail = None
+        self._read_offset = 0
+
+    # ── lookups ──────────────────────────────────────────────────────────────
+    def lookup(self, digest):
+        """Return (height, segment start, offset) for `digest`, or None."""
+        return self.positions.get(digest)
+
+    def __len__(self):
+        return self.count
+
+    # ── maintenance ──────────────────────────────────────────────────────────
+    def sync(self):
+        """Bring the in-memory index up to the ledger height."""
+        if self.count == self.store.height and self.path.exists():
+            return self
+        with self.store._locked():
+            self.store.refresh()
+            try:
+                self._read_new_lines()
+                self._check_tail()
+            except (ValueError, LedgerError):
+                self.rebuild()
+                return self
+            if self.count < self.store.height:
+                self._catch_up()
+        return self
+
+    def _read_new_lines(self):
+        if not self.path.exists():
+            if self.count:
+                raise ValueError("index sidecar disappeared")
+            return
+        with open(self.path, "rb") as fh:
+            fh.seek(self._read_offset)
+            for line in fh:
+                if not line.endswith(b"\n"):
+                    break
+                digest, height, seg_start, offset = line.decode("utf-8").rstrip("\n").split("\t")
+                height = int(height)
+                if height != self.count:
+                    raise ValueError(f"index gap at height {self.count}")
+                self.positions[digest] = (height, int(seg_start), int(offset))
+                self.tail = (digest, int(seg_start), int(offset))
+                self.count += 1
+                self._read_offset += len(line)
+        if self.count > self.store.height:
+            raise ValueError("index is ahead of the ledger")
+
+    def _check_tail(self):
+        """Spot-check the newest indexed entry against the ledger bytes."""
+        if self.tail is None:
+            return
+        digest, seg_start, offset = self.tail
+        if self.store.read_at(seg_start, offset)["digest"] != digest:
+            raise ValueError(f"index disagrees with ledger at height {self.count - 1}")
+
+    def _catch_up(self):
+        self._append(self.store.iter_positions(self.count))
+
+    def _append(self, entries):
+        # trim any torn line left by a crash before appending after it
+        if self.path.exists() and self.path.stat().st_size != self._read_offset:
+            with open(self.path, "r+b") as fh:
+                fh.truncate(self._read_offset)
+        with open(self.path, "ab") as fh:
+            for height, seg_start, offset, stone in entries:
+                digest = stone["digest"]
+                line = f"{digest}\t{height}\t{seg_start}\t{offset}\n".encode("utf-8")
+                fh.write(line)
+                self.positions[digest] = (height, seg_start, offset)
+                self.tail = (digest, seg_start, offset)
+                self.count += 1
+                self._read_offset += len(line)
+
+    def on_append(self, entries):
+        """Called by the store, under its lock, after new records are fsync'd."""
+        if entries and entries[0][0] == self.count and self.path.exists():
+            self._append(entries)
+
+    def rebuild(self):
+        """Discard the sidecar and re-derive it from the ledger segments."""
+        with self.store._locked():
+            self.positions = {}
+            self.count = 0
+            self.tail = None
+            self._read_offset = 0
+            tmp = self.path.with_name(self.path.name + ".tmp")
+            if tmp.exists():
+                tmp.unlink()
+            self.path, real = tmp, self.path
+            try:
+                self._append(self.store.iter_positions(0))
+            finally:
+                self.path = real
+            os.replace(tmp, real)
+        return self
@@ -0,0 +1,473 @@
+# codex_watcher/ledger.py
+"""
+Append-only ledger storage.
+
+Stones are stored as newline-delimited JSON records in rolling segment
+files under LEDGER_DIR. A small manifest lists the segments in order;
+it is only rewritten when a new segment is opened, so appending a stone
+costs one write + fsync of that stone's bytes instead of a rewrite of
+the whole chain.
+
+The legacy `codex_ledger.json` array is migrated once on first open and
+can be re-exported at any time with `export_legacy()`.
+"""
+
+import hashlib
+import json
+import os
+from pathlib import Path
+
+from codex_watcher.stone import Stone
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - non-POSIX platforms
+    fcntl = None
+
+# ── Paths ─────────────────────────────────────────────────────────────────────
+LEDGER_FILE   = Path("codex_ledger.json")
+LEDGER_DIR    = Path("codex_ledger")
+MANIFEST_NAME = "MANIFEST.json"
+LOCK_NAME     = "LOCK"
+INDEX_NAME    = "digests.idx"
+CHECKPOINT_NAME = "TIP.json"
+
+# ── Storage settings ──────────────────────────────────────────────────────────
+SEGMENT_BYTES  = 64 * 1024 * 1024
+MANIFEST_FORMAT = 1
+
+# ── Genesis constants ─────────────────────────────────────────────────────────
+GENESIS_DIGEST = "716ca6878eed87c3d4edc5a83a2e4161a109786b7be0f9093745139a6150710b"
+GENESIS_STRING = (
+    "seed=codex-web-launch-span4-header;"
+    "prev=e024d55b2591e147eaacbee48e21dee95b92f151a742279c90f4245957039435;"
+    "axis=CodexWebGenesis;charter=v1;"
+    "scope=interlinked-digests-for-auditable-knowledge;"
+    "invites=humans,AIs,communities;"
+    "routes=hash-addresses;"
+    "mirrors=x,github,substack;"
+    "trials=1;"
+    "author=system"
+)
+GENESIS_STONE = {"canonical": GENESIS_STRING, "digest": GENESIS_DIGEST}
+
+
+class LedgerError(Exception):
+    pass
+
+
+# ── File helpers ──────────────────────────────────────────────────────────────
+def fsync_dir(path: Path):
+    if not hasattr(os, "O_DIRECTORY"):
+        return
+    fd = os.open(str(path), os.O_RDONLY | os.O_DIRECTORY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+def atomic_write_bytes(path: Path, data: bytes):
+    """Write `data` to `path` via temp file + fsync + rename."""
+    tmp = path.with_name(path.name + ".tmp")
+    with open(tmp, "wb") as fh:
+        fh.write(data)
+        fh.flush()
+        os.fsync(fh.fileno())
+    os.replace(tmp, path)
+    fsync_dir(path.parent)
+
+def atomic_write_json(path: Path, obj, indent=None):
+    atomic_write_bytes(path, json.dumps(obj, indent=indent).encode("utf-8"))
+
+def encode_record(stone) -> bytes:
+    record = {"canonical": stone["canonical"], "digest": stone["digest"]}
+    return (json.dumps(record, ensure_ascii=False, separators=(",", ":")) + "\n").encode("utf-8")
+
+def decode_record(line: bytes) -> Stone:
+    record = json.loads(line.decode("utf-8"))
+    try:
+        return Stone(record["canonical"], record["digest"])
+    except (KeyError, TypeError) as e:
+        raise ValueError(f"not a stone record: {e}") from e
+
+def segment_name(start: int) -> str:
+    return f"segment_{start:012d}.jsonl"
+
+def _checksum(body) -> str:
+    return hashlib.sha256(json.dumps(body, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+# ── Ledger store ──────────────────────────────────────────────────────────────
+class LedgerStore:
+    """
+    root:          directory holding the manifest and segment files
+    legacy_file:   JSON array ledger migrated on first open
+    genesis:       stone written when neither root nor legacy_file exist
+    segment_bytes: roll to a new segment once the active one reaches this size
+    """
+
+    def __init__(self, root=LEDGER_DIR, legacy_file=LEDGER_FILE,
+                 genesis=None, segment_bytes=SEGMENT_BYTES):
+        self.root = Path(root)
+        self.legacy_file = Path(legacy_file) if legacy_file else None
+        self.genesis = genesis or GENESIS_STONE
+        self.segment_bytes = segment_bytes
+        self.manifest = None
+        self.height = 0
+        self.tip = None
+        self._active_size = 0
+        self._tip_pos = None
+        self._manifest_mtime = None
+        self._opened = False
+        self._lock = _FileLock(self.root / LOCK_NAME)
+        self._index = None
+        self._merkle = None
+        self._aggregates = None
+        self._query_index = None
+        self.sidecars = []
+
+    # ── open / recovery ──────────────────────────────────────────────────────
+    @property
+    def manifest_path(self) -> Path:
+        return self.root / MANIFEST_NAME
+
+    def open(self):
+        if self._opened:
+            return self
+        self.root.mkdir(parents=True, exist_ok=True)
+        with self._locked():
+            if not self.manifest_path.exists():
+                self._initialize()
+            self._load_state(repair=True)
+        self._opened = True
+        return self
+
+    def _initialize(self):
+        if self.legacy_file and self.legacy_file.exists():
+            text = self.legacy_file.read_text(encoding="utf-8-sig").strip()
+            stones = json.loads(text) if text else []
+            source = str(self.legacy_file)
+        else:
+            stones, source = [], None
+        if not stones:
+            stones = [self.genesis]
+        seg = self.root / segment_name(0)
+        atomic_write_bytes(seg, b"".join(encode_record(s) for s in stones))
+        manifest = {
+            "format": MANIFEST_FORMAT,
+            "segment_bytes": self.segment_bytes,
+            "segments": [{"file": seg.name, "start": 0}],
+        }
+        if source:
+            manifest["migrated_from"] = source
+        atomic_write_json(self.manifest_path, manifest, indent=2)
+
+    def _load_state(self, repair=False):
+        self._manifest_mtime = self.manifest_path.stat().st_mtime_ns
+        self.manifest = json.loads(self.manifest_path.read_text(encoding="utf-8"))
+        if self.manifest.get("format") != MANIFEST_FORMAT:
+            raise LedgerError(f"unsupported manifest format: {self.manifest.get('format')}")
+        segments = self.manifest["segments"]
+        last = segments[-1]
+        start = self._read_checkpoint(last["start"]) or (last["start"], None, None, 0)
+        height, tip, tip_pos, size = self._scan_segment(last["start"], *start, repair=repair)
+        if tip is None and len(segments) > 1:
+            prev = segments[-2]
+            for offset, tip in self._iter_segment_positions(self.root / prev["file"]):
+                tip_pos = (prev["start"], offset)
+        self.height = height
+        self.tip = tip
+        self._tip_pos = tip_pos
+        self._active_size = size
+        if repair and start[3] != size:
+            self._write_checkpoint()
+
+    def _scan_segment(self, seg_start, height, tip, tip_pos, offset, repair=False):
+        """
+        Scan the segment starting at `seg_start` from byte `offset`, where the
+        chain is known to have `height` stones ending in `tip`. Returns
+        (height, tip, tip position, size of complete records). With `repair`,
+        a torn trailing record left by a crash is truncated away.
+        """
+        path = self.root / segment_name(seg_start)
+        if not path.exists():
+            path.touch()
+        with open(path, "rb") as fh:
+            fh.seek(offset)
+            data = fh.read()
+        pos = good = 0
+        while pos < len(data):
+            nl = data.find(b"\n", pos)
+            if nl < 0:
+                break
+            try:
+                tip = decode_record(data[pos:nl])
+            except ValueError:
+                break
+            tip_pos = (seg_start, offset + pos)
+            height += 1
+            pos = good = nl + 1
+        if repair and good != len(data):
+            with open(path, "r+b") as fh:
+                fh.truncate(offset + good)
+                fh.flush()
+                os.fsync(fh.fileno())
+        return height, tip, tip_pos, offset + good
+
+    # ── tip checkpoint ───────────────────────────────────────────────────────
+    @property
+    def checkpoint_path(self) -> Path:
+        return self.root / CHECKPOINT_NAME
+
+    def _write_checkpoint(self):
+        """Record tip digest, height and end offset so the next open skips the scan."""
+        body = {
+            "digest": self.tip["digest"] if self.tip else None,
+            "height": self.height,
+            "segment": self.manifest["segments"][-1]["start"],
+            "offset": self._active_size,
+            "tip_segment": self._tip_pos[0] if self._tip_pos else None,
+            "tip_offset": self._tip_pos[1] if self._tip_pos else None,
+        }
+        body["checksum"] = _checksum(body)
+        atomic_write_json(self.checkpoint_path, body)
+
+    def _read_checkpoint(self, seg_start):
+        """
+        Return (height, tip, tip position, offset) from the checkpoint, or None
+        when it is missing, damaged or no longer matches the ledger files.
+        """
+        try:
+            body = json.loads(self.checkpoint_path.read_text(encoding="utf-8"))
+            checksum = body.pop("checksum")
+            if checksum != _checksum(body) or body["segment"] != seg_start:
+                return None
+            size = (self.root / segment_name(seg_start)).stat().st_size
+            if size < body["offset"]:
+                return None
+            tip_pos = (body["tip_segment"], body["tip_offset"])
+            tip = self.read_at(*tip_pos)
+            if tip["digest"] != body["digest"]:
+                return None
+        except (OSError, ValueError, KeyError, TypeError, LedgerError):
+            return None
+        return body["height"], tip, tip_pos, body["offset"]
+
+    def refresh(self):
+        """Pick up stones appended by another process since the last open."""
+        if not self._opened:
+            return self.open()
+        segments = self.manifest["segments"]
+        active = self.root / segments[-1]["file"]
+        if self.manifest_path.stat().st_mtime_ns != self._manifest_mtime or not active.exists():
+            self._load_state()
+        elif active.stat().st_size != self._active_size:
+            # same segment grew: scan only the new bytes
+            self.height, self.tip, self._tip_pos, self._active_size = self._scan_segment(
+                segments[-1]["start"], self.height, self.tip, self._tip_pos, self._active_size
+            )
+        return self
+
+    # ── locking ──────────────────────────────────────────────────────────────
+    def _locked(self):
+        return self._lock
+
+    # ── append ───────────────────────────────────────────────────────────────
+    def append(self, stones):
+        """Append stones in order with a single fsync; returns the new height."""
+        stones = list(stones)
+        if not stones:
+            return self.height
+        self.open()
+        with self._locked():
+            self.refresh()
+            active = self.root / self.manifest["segments"][-1]["file"]
+            if active.stat().st_size != self._active_size:
+                self._load_state(repair=True)
+            payload = [encode_record(s) for s in stones]
+            size = sum(len(p) for p in payload)
+            if self._active_size and self._active_size + size > self.segment_bytes:
+                self._roll()
+            seg_start = self.manifest["segments"][-1]["start"]
+            active = self.root / self.manifest["segments"][-1]["file"]
+            with open(active, "ab") as fh:
+                fh.write(b"".join(payload))
+                fh.flush()
+                os.fsync(fh.fileno())
+            entries = []
+            offset, height = self._active_size, self.height
+            for stone, record in zip(stones, payload):
+                entries.append((height, seg_start, offset, stone))
+                offset += len(record)
+                height += 1
+            self._active_size += size
+            self.height += len(stones)
+            self.tip = {"canonical": stones[-1]["canonical"], "digest": stones[-1]["digest"]}
+            self._tip_pos = (seg_start, entries[-1][2])
+            self._write_checkpoint()
+            for sidecar in self.sidecars:
+                sidecar.on_append(entries)
+        return self.height
+
+    def _roll(self):
+        seg = self.root / segment_name(self.height)
+        seg.touch()
+        fsync_dir(self.root)
+        self.manifest["segments"].append({"file": seg.name, "start": self.height})
+        atomic_write_json(self.manifest_path, self.manifest, indent=2)
+        self._manifest_mtime = self.manifest_path.stat().st_mtime_ns
+        self._active_size = 0
+
+    # ── reads ────────────────────────────────────────────────────────────────
+    def _iter_segment_positions(self, path: Path):
+        offset = 0
+        with open(path, "rb") as fh:
+            for line in fh:
+                if not line.endswith(b"\n"):
+                    break
+                yield offset, decode_record(line)
+                offset += len(line)
+
+    def iter_positions(self, start=0):
+        """Yield (height, segment start, byte offset, stone) from height `start` onwards."""
+        self.refresh()
+        segments = self.manifest["segments"]
+        for i, seg in enumerate(segments):
+            end = segments[i + 1]["start"] if i + 1 < len(segments) else self.height
+            if end <= start:
+                continue
+            height = seg["start"]
+            for offset, stone in self._iter_segment_positions(self.root / seg["file"]):
+                if height >= end:
+                    break
+                if height >= start:
+                    yield height, seg["start"], offset, stone
+                height += 1
+
+    def iter_stones(self, start=0):
+        """Yield stones from height `start` onwards."""
+        for _, _, _, stone in self.iter_positions(start):
+            yield stone
+
+    def read_at(self, seg_start: int, offset: int):
+        """Read the single record stored at `offset` in the segment starting at `seg_start`."""
+        with open(self.root / segment_name(seg_start), "rb") as fh:
+            fh.seek(offset)
+            line = fh.readline()
+        if not line.endswith(b"\n"):
+            raise LedgerError(f"no complete record at {segment_name(seg_start)}:{offset}")
+        return decode_record(line)
+
+    def read_all(self):
+        return list(self.iter_stones())
+
+    def __len__(self):
+        self.refresh()
+        return self.height
+
+    def tip_digest(self):
+        self.refresh()
+        return self.tip["digest"]
+
+    # ── digest index ─────────────────────────────────────────────────────────
+    @property
+    def index(self):
+        """Digest → position index, loaded from its sidecar on first use."""
+        if self._index is None:
+            from codex_watcher.index import DigestIndex
+            self._index = DigestIndex(self)
+            self.sidecars.append(self._index)
+        self._index.sync()
+        return self._index
+
+    @property
+    def merkle(self):
+        """Merkle mountain range over stone digests, loaded from its sidecar on first use."""
+        if self._merkle is None:
+            from codex_watcher.merkle import MerkleLog
+            self._merkle = MerkleLog(self)
+            self.sidecars.append(self._merkle)
+        self.refresh()
+        self._merkle.sync()
+        return self._merkle
+
+    @property
+    def aggregates(self):
+        """Rolling dashboard aggregates, loaded from their sidecar on first use."""
+        if self._aggregates is None:
+            from codex_watcher.aggregates import AggregateLog
+            self._aggregates = AggregateLog(self)
+            self.sidecars.append(self._aggregates)
+        self.refresh()
+        self._aggregates.sync()
+        return self._aggregates
+
+    @property
+    def query_index(self):
+        """SQLite query index over canonical fields, loaded from its sidecar on first use."""
+        if self._query_index is None:
+            from codex_watcher.query import QueryIndex
+            self._query_index = QueryIndex(self)
+            self.sidecars.append(self._query_index)
+        self.refresh()
+        self._query_index.sync()
+        return self._query_index
+
+    def position(self, digest):
+        """Height of `digest` in the chain, or None if it is unknown."""
+        pos = self.index.lookup(digest)
+        return pos[0] if pos else None
+
+    def contains(self, digest) -> bool:
+        return self.index.lookup(digest) is not None
+
+    def get_stone(self, digest):
+        pos = self.index.lookup(digest)
+        if pos is None:
+            return None
+        return self.read_at(pos[1], pos[2])
+
+    # ── legacy export ────────────────────────────────────────────────────────
+    def export_legacy(self, path=None):
+        """Write the whole chain as the legacy indented JSON array."""
+        path = Path(path) if path else (self.legacy_file or LEDGER_FILE)
+        atomic_write_json(path, [s.to_dict() for s in self.iter_stones()], indent=2)
+        return path
+
+
+class _FileLock:
+    """Exclusive advisory lock on `path` (no-op where fcntl is unavailable)."""
+
+    def __init__(self, path: Path):
+        self.path = path
+        self.fh = None
+        self.depth = 0
+
+    def __enter__(self):
+        self.depth += 1
+        if fcntl is None or self.depth > 1:
+            return self
+        self.fh = open(self.path, "a")
+        fcntl.flock(self.fh.fileno(), fcntl.LOCK_EX)
+        return self
+
+    def __exit__(self, *exc):
+        self.depth -= 1
+        if self.depth == 0 and self.fh is not None:
+            fcntl.flock(self.fh.fileno(), fcntl.LOCK_UN)
+            self.fh.close()
+            self.fh = None
+        return False
+
+
+# ── Module-level helpers ──────────────────────────────────────────────────────
+_stores = {}
+
+def get_store(root=LEDGER_DIR, legacy_file=LEDGER_FILE, genesis=None) -> LedgerStore:
+    """Return an opened store, shared per root directory within this process."""
+    key = str(Path(root).resolve())
+    store = _stores.get(key)
+    if store is None:
+        store = LedgerStore(root, legacy_file=legacy_file, genesis=genesis).open()
+        _stores[key] = store
+    return store
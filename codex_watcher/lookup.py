@@ -0,0 +1,188 @@
+# codex_watcher/lookup.py
+"""
+Read-only stone lookup over HTTP (`codex-watcher api`).
+
+    GET /tip                              {"height": …, "digest": …}
+    GET /stones/<digest>                  {"height": …, "stone": {...}}
+    GET /stones/latest?n=N                the newest N stones, oldest first
+    GET /stones/since/<digest>?limit=N    up to N stones after <digest>
+
+Bodies are assembled from the raw segment records, without re-encoding
+them. Responses are kept in an in-memory LRU. Each ETag is derived from
+the tip digest, so a client revalidating an unchanged query gets a 304.
+A stone looked up by digest never changes, so its ETag is the digest
+itself. The ledger is re-stat'ed at most every REFRESH_INTERVAL seconds,
+so growth (from this node's watcher, codex_chain or a sync) shows up
+without a restart.
+"""
+
+import json
+import threading
+import time
+from collections import OrderedDict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+from codex_watcher.ledger import segment_name
+from codex_watcher.replicate import read_range
+
+API_HOST         = "127.0.0.1"
+API_PORT         = 8766
+CACHE_SIZE       = 4096     # cached responses
+REFRESH_INTERVAL = 0.1      # seconds between ledger stat checks
+LATEST_DEFAULT   = 10
+MAX_STONES       = 1000     # per latest / since response
+TAIL_BLOCK       = 64 * 1024
+
+
+def latest_records(store, n):
+    """The newest `n` raw records, oldest first, read backwards from the end of the ledger."""
+    lines = []
+    segments = store.manifest["segments"]
+    for i in range(len(segments) - 1, -1, -1):
+        need = n - len(lines)
+        if need <= 0:
+            break
+        path = store.root / segments[i]["file"]
+        pos = store._active_size if i == len(segments) - 1 else path.stat().st_size
+        buf = b""
+        with open(path, "rb") as fh:
+            while pos > 0 and buf.count(b"\n") <= need:
+                step = min(TAIL_BLOCK, pos)
+                pos -= step
+                fh.seek(pos)
+                buf = fh.read(step) + buf
+        found = buf.splitlines(keepends=True)
+        if pos > 0:
+            found = found[1:]   # the first line may start before the block
+        lines = found[-need:] + lines
+    return lines
+
+def _records_json(lines):
+    return b"[" + b",".join(line.rstrip(b"\n") for line in lines) + b"]"
+
+
+class LookupService:
+    """Routes lookups to the store and caches rendered responses by (tip, path)."""
+
+    def __init__(self, store, cache_size=CACHE_SIZE, refresh_interval=REFRESH_INTERVAL):
+        self.store = store
+        self.cache_size = cache_size
+        self.refresh_interval = refresh_interval
+        self.cache = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self._checked = 0.0
+        self._lock = threading.Lock()
+
+    def _refresh(self):
+        now = time.monotonic()
+        if now - self._checked >= self.refresh_interval:
+            self.store.refresh()
+            self._checked = now
+
+    def respond(self, path, query):
+        """Return (status, etag, cache-control, body bytes) for a GET of `path`."""
+        with self._lock:
+            self._refresh()
+            tip = self.store.tip["digest"]
+            immutable = path.startswith("/stones/") and path.count("/") == 2 and path != "/stones/latest"
+            key = (None if immutable else tip, path, query)
+            cached = self.cache.get(key)
+            if cached is not None:
+                self.cache.move_to_end(key)
+                self.hits += 1
+                return cached
+            self.misses += 1
+            response = self._render(path, parse_qs(query), tip, immutable)
+            if response[0] == 200:
+                self.cache[key] = response
+                if len(self.cache) > self.cache_size:
+                    self.cache.popitem(last=False)
+            return response
+
+    def _render(self, path, params, tip, immutable):
+        store = self.store
+        height = store.height
+        etag = f'"{tip[:32]}"'
+        revalidate = "no-cache"
+        if path == "/tip":
+            body = json.dumps({"height": height, "digest": tip}).encode("utf-8")
+        elif path == "/stones/latest":
+            n = max(1, min(int(params.get("n", [LATEST_DEFAULT])[-1]), MAX_STONES, height))
+            body = (
+                f'{{"height":{height},"tip":"{tip}","start":{height - n},"stones":'.encode("utf-8")
+                + _records_json(latest_records(store, n)) + b"}"
+            )
+        elif path.startswith("/stones/since/"):
+            limit = max(1, min(int(params.get("limit", [MAX_STONES])[-1]), MAX_STONES))
+            found = read_range(store, path[len("/stones/since/"):], limit)
+            if found is None:
+                return 404, None, revalidate, b'{"error":"unknown digest"}'
+            start, count, data = found
+            body = (
+                f'{{"height":{height},"tip":"{tip}","start":{start},"count":{count},'
+                f'"more":{"true" if start + count < height else "false"},"stones":'.encode("utf-8")
+                + _records_json(data.splitlines()) + b"}"
+            )
+        elif immutable:
+            digest = path[len("/stones/"):]
+            pos = store.index.lookup(digest)
+            if pos is None:
+                return 404, None, revalidate, b'{"error":"unknown digest"}'
+            with open(store.root / segment_name(pos[1]), "rb") as fh:
+                fh.seek(pos[2])
+                record = fh.readline().rstrip(b"\n")
+            body = f'{{"height":{pos[0]},"stone":'.encode("utf-8") + record + b"}"
+            etag = f'"{digest}"'
+            revalidate = "public, max-age=31536000, immutable"
+        else:
+            return 404, None, revalidate, b'{"error":"no such route"}'
+        return 200, etag, revalidate, body
+
+
+def make_handler(service):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+        server_version = "codex-lookup/0.1"
+        # one write per response; unbuffered header/body writes stall on delayed ACKs
+        wbufsize = -1
+        disable_nagle_algorithm = True
+
+        def log_message(self, *args):
+            pass
+
+        def do_GET(self):
+            url = urlsplit(self.path)
+            try:
+                status, etag, cache_control, body = service.respond(url.path, url.query)
+            except ValueError as e:
+                status, etag, cache_control = 400, None, "no-cache"
+                body = json.dumps({"error": str(e)}).encode("utf-8")
+            if etag is not None and self.headers.get("If-None-Match") == etag:
+                status, body = 304, b""
+            self.send_response(status)
+            if etag is not None:
+                self.send_header("ETag", etag)
+            self.send_header("Cache-Control", cache_control)
+            if status != 304:
+                self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+    return Handler
+
+def serve_lookup(store, host=API_HOST, port=API_PORT, cache_size=CACHE_SIZE):
+    """Serve read-only lookups on `store` until interrupted."""
+    service = LookupService(store, cache_size)
+    server = ThreadingHTTPServer((host, port), make_handler(service))
+    server.daemon_threads = True
+    print(f"🌐 serving stone lookups (height {len(store)}) at http://{host}:{server.server_port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        print(f"Cache: {service.hits} hits, {service.misses} misses")
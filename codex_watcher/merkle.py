@@ -0,0 +1,291 @@
+# codex_watcher/merkle.py
+"""
+Merkle mountain range over stone digests.
+
+Leaves are H(0x00 || digest) in chain order; each pair of complete
+subtrees is joined as H(0x01 || left || right), leaving one perfect tree
+("peak") per set bit of the leaf count. The root is the peaks bagged
+right-to-left with H(0x02 || left || right).
+
+Nodes are persisted level by level in LEDGER_DIR/mmr/level_NN.bin as
+fixed 32-byte records, so appending a stone writes O(log n) nodes and
+any node is one seek away.
+
+The proof checkers at the bottom of this module (verify_inclusion,
+verify_consistency) only need hashlib, so a proof can be checked
+without a copy of the ledger.
+"""
+
+import hashlib
+import os
+from pathlib import Path
+
+MMR_DIR_NAME = "mmr"
+NODE_SIZE    = 32
+
+
+# ── Hashing ───────────────────────────────────────────────────────────────────
+def leaf_hash(digest: str) -> bytes:
+    return hashlib.sha256(b"\x00" + digest.encode("utf-8")).digest()
+
+def node_hash(left: bytes, right: bytes) -> bytes:
+    return hashlib.sha256(b"\x01" + left + right).digest()
+
+def bag_peaks(peaks) -> bytes:
+    if not peaks:
+        return hashlib.sha256(b"").digest()
+    acc = peaks[-1]
+    for peak in reversed(peaks[:-1]):
+        acc = hashlib.sha256(b"\x02" + peak + acc).digest()
+    return acc
+
+def peak_positions(size: int):
+    """(level, index) of each peak of an MMR with `size` leaves, left to right."""
+    peaks = []
+    start = 0
+    for level in range(size.bit_length() - 1, -1, -1):
+        if size & (1 << level):
+            peaks.append((level, start >> level))
+            start += 1 << level
+    return peaks
+
+
+# ── Persistent MMR ────────────────────────────────────────────────────────────
+class MerkleLog:
+    """MMR sidecar kept in step with a LedgerStore."""
+
+    def __init__(self, store):
+        self.store = store
+        self.dir = store.root / MMR_DIR_NAME
+        self.size = 0
+        self._loaded = False
+
+    def _level_path(self, level) -> Path:
+        return self.dir / f"level_{level:02d}.bin"
+
+    def _count(self, level) -> int:
+        try:
+            return os.path.getsize(self._level_path(level)) // NODE_SIZE
+        except OSError:
+            return 0
+
+    def node(self, level: int, index: int) -> bytes:
+        with open(self._level_path(level), "rb") as fh:
+            fh.seek(index * NODE_SIZE)
+            data = fh.read(NODE_SIZE)
+        if len(data) != NODE_SIZE:
+            raise IndexError(f"no MMR node at level {level} index {index}")
+        return data
+
+    # ── load / repair ────────────────────────────────────────────────────────
+    def _load(self):
+        """
+        Read level sizes from disk, trimming torn writes and rebuilding
+        missing parents. Call with the store lock held: another process
+        may be extending the same files.
+        """
+        self.dir.mkdir(parents=True, exist_ok=True)
+        size = self._count(0)
+        if size > self.store.height:
+            return self.rebuild()
+        level = 0
+        while True:
+            path = self._level_path(level)
+            want = size >> level
+            have = self._count(level)
+            torn = path.exists() and os.path.getsize(path) != have * NODE_SIZE
+            if torn or have > want:
+                with open(path, "r+b") as fh:
+                    fh.truncate(min(have, want) * NODE_SIZE)
+                have = min(have, want)
+            if have < want:
+                with open(path, "ab") as fh:
+                    for i in range(have, want):
+                        fh.write(node_hash(self.node(level - 1, 2 * i), self.node(level - 1, 2 * i + 1)))
+            if want == 0:
+                break
+            level += 1
+        self.size = size
+        if size and size == self.store.height and self.node(0, size - 1) != leaf_hash(self.store.tip["digest"]):
+            return self.rebuild()
+        self._loaded = True
+        return self
+
+    def sync(self):
+        with self.store._locked():
+            self.store.refresh()
+            # always from the files: another writer may have extended them
+            self._load()
+            if self.size < self.store.height:
+                self._append_digests(s["digest"] for s in self.store.iter_stones(self.size))
+        return self
+
+    def rebuild(self):
+        with self.store._locked():
+            for path in self.dir.glob("level_*.bin"):
+                path.unlink()
+            self.size = 0
+            self._loaded = True
+            self._append_digests(s["digest"] for s in self.store.iter_stones(0))
+        return self
+
+    # ── append ───────────────────────────────────────────────────────────────
+    def _append_digests(self, digests):
+        handles = {}
+        # the rightmost partial node on each level, needed to pair the next one
+        carry = {}
+        try:
+            for digest in digests:
+                node = leaf_hash(digest)
+                level, index = 0, self.size
+                while True:
+                    fh = handles.get(level)
+                    if fh is None:
+                        fh = handles[level] = open(self._level_path(level), "ab")
+                    fh.write(node)
+                    if index % 2 == 0:
+                        carry[level] = node
+                        break
+                    left = carry.pop(level, None)
+                    if left is None:
+                        fh.flush()
+                        left = self.node(level, index - 1)
+                    node = node_hash(left, node)
+                    level, index = level + 1, index // 2
+                self.size += 1
+        finally:
+            for fh in handles.values():
+                fh.close()
+
+    def on_append(self, entries):
+        """Called by the store, under its lock, after new records are fsync'd."""
+        if not self._loaded or not entries:
+            return
+        if self._count(0) != self.size:
+            # another writer extended (or repaired) the level files: continue from disk
+            self._load()
+        first = entries[0][0]
+        if self.size < first:
+            # stones appended by a writer without the MMR attached
+            self._append_digests(s["digest"] for s in self.store.iter_stones(self.size))
+        elif self.size < first + len(entries):
+            self._append_digests(stone["digest"] for _, _, _, stone in entries[self.size - first:])
+
+    # ── proofs ───────────────────────────────────────────────────────────────
+    def peaks(self, size=None):
+        size = self.size if size is None else size
+        return [self.node(level, index) for level, index in peak_positions(size)]
+
+    def root(self, size=None) -> bytes:
+        return bag_peaks(self.peaks(size))
+
+    def _path_up(self, level, index, top):
+        """Sibling hashes from node (level, index) up to level `top`."""
+        path = []
+        while level < top:
+            path.append(self.node(level, index ^ 1).hex())
+            level, index = level + 1, index // 2
+        return path
+
+    def inclusion_proof(self, leaf: int, size=None):
+        size = self.size if size is None else size
+        if not 0 <= leaf < size:
+            raise IndexError(f"leaf {leaf} outside tree of size {size}")
+        positions = peak_positions(size)
+        start = 0
+        for peak_idx, (level, _) in enumerate(positions):
+            if leaf < start + (1 << level):
+                break
+            start += 1 << level
+        return {
+            "leaf_index": leaf,
+            "tree_size": size,
+            "leaf": self.node(0, leaf).hex(),
+            "path": self._path_up(0, leaf, level),
+            "peaks": [p.hex() for i, p in enumerate(self.peaks(size)) if i != peak_idx],
+            "peak_index": peak_idx,
+            "root": self.root(size).hex(),
+        }
+
+    def consistency_proof(self, old_size: int, new_size=None):
+        new_size = self.size if new_size is None else new_size
+        if not 0 < old_size <= new_size <= self.size:
+            raise IndexError(f"need 0 < old_size <= new_size <= {self.size}")
+        new_positions = peak_positions(new_size)
+        paths = []
+        for level, index in peak_positions(old_size):
+            top = next(
+                lvl for lvl, idx in new_positions
+                if lvl >= level and idx == index >> (lvl - level)
+            )
+            paths.append(self._path_up(level, index, top))
+        return {
+            "old_size": old_size,
+            "new_size": new_size,
+            "old_peaks": [p.hex() for p in self.peaks(old_size)],
+            "paths": paths,
+            "new_peaks": [p.hex() for p in self.peaks(new_size)],
+            "old_root": self.root(old_size).hex(),
+            "new_root": self.root(new_size).hex(),
+        }
+
+
+# ── Standalone verification ───────────────────────────────────────────────────
+def _climb(node: bytes, level: int, index: int, path):
+    for sibling in path:
+        sibling = bytes.fromhex(sibling)
+        node = node_hash(sibling, node) if index & 1 else node_hash(node, sibling)
+        level, index = level + 1, index // 2
+    return node, level, index
+
+def verify_inclusion(proof, digest=None, root=None) -> bool:
+    """
+    Check an inclusion proof; optionally pin the stone digest and the
+    expected root. Without `root` the proof is only checked against the
+    root it carries, which shows it is well formed, not that it is genuine.
+    """
+    leaf = bytes.fromhex(proof["leaf"])
+    if digest is not None and leaf != leaf_hash(digest):
+        return False
+    size, index = proof["tree_size"], proof["leaf_index"]
+    positions = peak_positions(size)
+    peak_idx = proof["peak_index"]
+    if not 0 <= index < size or not 0 <= peak_idx < len(positions):
+        return False
+    level, expected_index = positions[peak_idx]
+    if len(proof["path"]) != level:
+        return False
+    peak, _, peak_index = _climb(leaf, 0, index, proof["path"])
+    if peak_index != expected_index:
+        return False
+    peaks = [bytes.fromhex(p) for p in proof["peaks"]]
+    peaks.insert(peak_idx, peak)
+    computed = bag_peaks(peaks)
+    return computed.hex() == (root or proof["root"])
+
+def verify_consistency(proof, old_root=None, new_root=None) -> bool:
+    """
+    Check that the tree of `old_size` is a prefix of the tree of
+    `new_size`. As with verify_inclusion, only roots passed in (not the
+    ones in the proof) anchor it.
+    """
+    if not 0 < proof["old_size"] <= proof["new_size"]:
+        return False
+    old_peaks = [bytes.fromhex(p) for p in proof["old_peaks"]]
+    new_peaks = [bytes.fromhex(p) for p in proof["new_peaks"]]
+    old_positions = peak_positions(proof["old_size"])
+    new_positions = peak_positions(proof["new_size"])
+    if len(old_peaks) != len(old_positions) or len(new_peaks) != len(new_positions):
+        return False
+    # one path per old peak, or zip() below would stop short and skip peaks
+    if len(proof["paths"]) != len(old_positions):
+        return False
+    if bag_peaks(old_peaks).hex() != (old_root or proof["old_root"]):
+        return False
+    for (level, index), peak, path in zip(old_positions, old_peaks, proof["paths"]):
+        node, top, top_index = _climb(peak, level, index, path)
+        if (top, top_index) not in new_positions:
+            return False
+        if new_peaks[new_positions.index((top, top_index))] != node:
+            return False
+    return bag_peaks(new_peaks).hex() == (new_root or proof["new_root"])
@@ -0,0 +1,241 @@
+# codex_watcher/metrics.py
+"""
+Hot-path metrics and an opt-in per-scan profiler for the ingest pipeline.
+
+Stage timings (glob, read, parse, policy, hash, ledger_write, rename and
+the whole scan) go into fixed-bucket histograms. Rejects are counted by
+reason: the part of the message before the first ':', e.g. "digest
+mismatch". Queue depth, inbox backlog and ledger height are gauges.
+Everything renders as Prometheus text, served on a local port
+(serve_metrics) and/or rewritten atomically to a file after every scan,
+for node_exporter's textfile collector.
+
+The profiler wraps each non-empty scan. It either dumps cProfile stats
+(.prof, open with pstats or snakeviz) or samples the scanning thread's
+stack from a background thread and writes collapsed stacks (.folded,
+for flamegraph.pl / speedscope).
+"""
+
+import cProfile
+import sys
+import threading
+import time
+from collections import Counter, defaultdict
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+from codex_watcher.ledger import atomic_write_bytes
+
+BUCKETS         = (0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0)
+METRICS_PORT    = 9464
+SAMPLE_INTERVAL = 0.005   # seconds between stack samples
+PREFIX          = "codex"
+
+GAUGE_HELP = {
+    "queue_depth": "Stones waiting in the stream queue or the current event burst",
+    "inbox_backlog": "Inbox files seen by the last full scan",
+    "ledger_height": "Stones in the ledger",
+    "pending_stones": "Stones parked in the pending pool",
+}
+
+
+class Metrics:
+    """Thread-safe counters, gauges and per-stage histograms."""
+
+    def __init__(self, buckets=BUCKETS):
+        self.buckets = buckets
+        self.lock = threading.Lock()
+        self.stage_buckets = defaultdict(lambda: [0] * len(buckets))
+        self.stage_sum = defaultdict(float)
+        self.stage_count = Counter()
+        self.rejects = Counter()
+        self.counters = Counter()
+        self.gauges = {}
+        self.file = None
+
+    def observe(self, stage, seconds):
+        with self.lock:
+            self._observe(stage, seconds)
+
+    def observe_many(self, timings):
+        with self.lock:
+            for stage, seconds in timings:
+                self._observe(stage, seconds)
+
+    def _observe(self, stage, seconds):
+        self.stage_sum[stage] += seconds
+        self.stage_count[stage] += 1
+        counts = self.stage_buckets[stage]
+        for i, bound in enumerate(self.buckets):
+            if seconds <= bound:
+                counts[i] += 1
+                break
+
+    @contextmanager
+    def timer(self, stage):
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(stage, time.perf_counter() - t0)
+
+    def reject(self, reason):
+        with self.lock:
+            self.rejects[reason.split(":", 1)[0].strip() or "unknown"] += 1
+
+    def inc(self, name, n=1):
+        with self.lock:
+            self.counters[name] += n
+
+    def set_gauge(self, name, value):
+        self.gauges[name] = value
+
+    def render(self):
+        """Prometheus text exposition format."""
+        out = []
+        with self.lock:
+            out.append(f"# HELP {PREFIX}_stage_seconds Time spent per ingest stage")
+            out.append(f"# TYPE {PREFIX}_stage_seconds histogram")
+            for stage in sorted(self.stage_count):
+                cumulative = 0
+                for bound, n in zip(self.buckets, self.stage_buckets[stage]):
+                    cumulative += n
+                    out.append(f'{PREFIX}_stage_seconds_bucket{{stage="{stage}",le="{bound}"}} {cumulative}')
+                out.append(f'{PREFIX}_stage_seconds_bucket{{stage="{stage}",le="+Inf"}} {self.stage_count[stage]}')
+                out.append(f'{PREFIX}_stage_seconds_sum{{stage="{stage}"}} {self.stage_sum[stage]:.6f}')
+                out.append(f'{PREFIX}_stage_seconds_count{{stage="{stage}"}} {self.stage_count[stage]}')
+            out.append(f"# HELP {PREFIX}_rejects_total Rejected stones by reason")
+            out.append(f"# TYPE {PREFIX}_rejects_total counter")
+            for reason, n in sorted(self.rejects.items()):
+                label = reason.replace("\\", "\\\\").replace('"', '\\"')
+                out.append(f'{PREFIX}_rejects_total{{reason="{label}"}} {n}')
+            for name, n in sorted(self.counters.items()):
+                out.append(f"# TYPE {PREFIX}_{name}_total counter")
+                out.append(f"{PREFIX}_{name}_total {n}")
+            for name, value in sorted(self.gauges.items()):
+                if name in GAUGE_HELP:
+                    out.append(f"# HELP {PREFIX}_{name} {GAUGE_HELP[name]}")
+                out.append(f"# TYPE {PREFIX}_{name} gauge")
+                out.append(f"{PREFIX}_{name} {value}")
+        return "\n".join(out) + "\n"
+
+    def flush(self):
+        """Rewrite the metrics file, if one is configured."""
+        if self.file is not None:
+            atomic_write_bytes(self.file, self.render().encode("utf-8"))
+
+
+METRICS = Metrics()
+
+
+# ── Export ────────────────────────────────────────────────────────────────────
+def serve_metrics(port=METRICS_PORT, host="127.0.0.1", metrics=METRICS):
+    """Serve GET /metrics from a daemon thread; returns the server."""
+    class Handler(BaseHTTPRequestHandler):
+        def log_message(self, *args):
+            pass
+
+        def do_GET(self):
+            if self.path.split("?", 1)[0] != "/metrics":
+                self.send_error(404)
+                return
+            body = metrics.render().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="codex-metrics", daemon=True).start()
+    return server
+
+
+# ── Profiling ─────────────────────────────────────────────────────────────────
+class StackSampler:
+    """Samples one thread's stack every `interval` seconds into collapsed-stack counts."""
+
+    def __init__(self, thread_id, interval=SAMPLE_INTERVAL):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="codex-sampler", daemon=True)
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{Path(code.co_filename).name}:{code.co_name}")
+                frame = frame.f_back
+            if stack:
+                self.stacks[";".join(reversed(stack))] += 1
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def dump(self, path):
+        path.write_text("".join(f"{stack} {n}\n" for stack, n in self.stacks.most_common()))
+
+
+class ScanProfiler:
+    """Profiles each scan into `out_dir` with cProfile ("cprofile") or the stack sampler ("sample")."""
+
+    def __init__(self, out_dir, mode="cprofile"):
+        self.out_dir = Path(out_dir)
+        self.mode = mode
+        self.seq = 0
+        self.out_dir.mkdir(parents=True, exist_ok=True)
+
+    @contextmanager
+    def scan(self):
+        self.seq += 1
+        stem = f"scan-{time.strftime('%Y%m%dT%H%M%S')}-{self.seq:05d}"
+        if self.mode == "sample":
+            sampler = StackSampler(threading.get_ident()).start()
+            try:
+                yield
+            finally:
+                sampler.stop()
+                sampler.dump(self.out_dir / f"{stem}.folded")
+        else:
+            profile = cProfile.Profile()
+            profile.enable()
+            try:
+                yield
+            finally:
+                profile.disable()
+                profile.dump_stats(str(self.out_dir / f"{stem}.prof"))
+
+
+PROFILER = None
+
+def configure(port=None, path=None, profile_dir=None, profile_mode="cprofile"):
+    global PROFILER
+    if port:
+        serve_metrics(port)
+    METRICS.file = Path(path) if path else None
+    PROFILER = ScanProfiler(profile_dir, profile_mode) if profile_dir else None
+
+@contextmanager
+def scan(active=True):
+    """Time one scan, profile it if a profiler is configured and the scan has work, then export."""
+    t0 = time.perf_counter()
+    try:
+        if PROFILER is not None and active:
+            with PROFILER.scan():
+                yield
+        else:
+            yield
+    finally:
+        METRICS.observe("scan", time.perf_counter() - t0)
+        METRICS.flush()
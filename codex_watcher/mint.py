@@ -0,0 +1,152 @@
+# codex_watcher/mint.py
+"""
+Bulk minting (`codex-mint --from records.jsonl|csv`).
+
+Each input record carries seed, axis and data, and optionally method,
+metrics, notes, trials and author. Records are read as a stream and
+minted in batches of up to MINT_BATCH stones. A batch is chained in
+memory from one tip read, taken under the ledger lock, and committed
+with a single store.append (one write + fsync) instead of one append per
+stone. With --inbox the chained stones are written as inbox files for
+the watcher to validate instead of going into the ledger directly.
+
+Minted {"canonical", "digest"} pairs are streamed out as JSONL.
+"""
+
+import argparse
+import csv
+import hashlib
+import io
+import json
+import os
+import sys
+import time
+from itertools import islice
+from pathlib import Path
+
+from codex_watcher.stone import Stone
+
+MINT_BATCH  = 10000
+FIELD_ORDER = ("seed", "prev", "axis", "data", "method", "metrics", "notes", "trials", "author")
+REQUIRED    = ("seed", "axis", "data")
+DEFAULTS    = {"method": "python-sha256", "metrics": "n/a", "notes": "", "trials": 1}
+
+
+def build_canonical(record, prev):
+    """The canonical string for `record` chained to `prev`, in make_stone() field order."""
+    missing = [k for k in REQUIRED if record.get(k) in (None, "")]
+    if missing:
+        raise ValueError(f"missing {', '.join(missing)}")
+    values = dict(DEFAULTS)
+    values.update((k, v) for k, v in record.items() if k in FIELD_ORDER and v not in (None, ""))
+    values["prev"] = prev
+    parts = []
+    for key in FIELD_ORDER:
+        if key in values:
+            value = str(values[key])
+            if ";" in value:
+                raise ValueError(f"';' is not allowed in {key}")
+            parts.append(f"{key}={value}")
+    return ";".join(parts)
+
+def chain(records, prev, start=0):
+    """Chain `records` after `prev`; yields Stones. `start` numbers records in error messages."""
+    for i, record in enumerate(records, start + 1):
+        try:
+            canonical = build_canonical(record, prev)
+        except (ValueError, AttributeError) as e:
+            raise ValueError(f"record {i}: {e}") from None
+        prev = hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+        yield Stone(canonical, prev)
+
+def mint_stones(store, records, batch_size=MINT_BATCH):
+    """Mint `records` into `store` in batched appends; yields each Stone once its batch is committed."""
+    it = iter(records)
+    done = 0
+    while True:
+        batch = list(islice(it, batch_size))
+        if not batch:
+            return
+        with store._locked():
+            stones = list(chain(batch, store.tip_digest(), done))
+            store.append(stones)
+        done += len(stones)
+        yield from stones
+
+def mint_inbox(records, tip, inbox_dir, prefix=None):
+    """Chain `records` after `tip` and write each stone as an inbox file; yields the Stones."""
+    inbox_dir = Path(inbox_dir)
+    inbox_dir.mkdir(parents=True, exist_ok=True)
+    prefix = prefix or f"mint-{time.strftime('%Y%m%dT%H%M%S')}"
+    for i, stone in enumerate(chain(records, tip)):
+        name = f"{prefix}-{i:08d}.json"
+        tmp = inbox_dir / f".{name}.part"
+        tmp.write_text(json.dumps(stone.to_dict()), encoding="utf-8")
+        os.replace(tmp, inbox_dir / name)
+        yield stone
+
+def read_records(path):
+    """Stream records from a .csv file or a JSONL file ('-' for JSONL on stdin)."""
+    if str(path) == "-":
+        fh = io.TextIOWrapper(sys.stdin.buffer, encoding="utf-8")
+    else:
+        fh = open(path, encoding="utf-8", newline="")
+    with fh:
+        if str(path).lower().endswith(".csv"):
+            yield from csv.DictReader(fh)
+            return
+        for n, line in enumerate(fh, 1):
+            if line.strip():
+                try:
+                    yield json.loads(line)
+                except ValueError as e:
+                    raise ValueError(f"line {n}: {e}") from None
+
+
+# ── CLI Entrypoint ────────────────────────────────────────────────────────────
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="codex-mint", description="Mint many stones from a JSONL or CSV file"
+    )
+    parser.add_argument("--from", dest="source", required=True,
+                        help="Records file (.jsonl or .csv; '-' for JSONL on stdin)")
+    parser.add_argument("--out", type=Path, help="Write minted pairs here instead of stdout")
+    parser.add_argument("--inbox", action="store_true",
+                        help="Write inbox files for the watcher instead of appending to the ledger")
+    parser.add_argument("--author", help="Author for records that do not name one")
+    parser.add_argument("--batch", type=int, default=MINT_BATCH, help="Stones per ledger commit")
+    args = parser.parse_args(argv)
+
+    from codex_watcher.cli import INBOX_DIR, ledger_store
+    records = read_records(args.source)
+    if args.author:
+        records = (dict(r, author=r.get("author") or args.author) for r in records)
+    store = ledger_store()
+    if args.inbox:
+        stones = mint_inbox(records, store.tip_digest(), INBOX_DIR)
+    else:
+        stones = mint_stones(store, records, args.batch)
+
+    out = open(args.out, "w", encoding="utf-8") if args.out else sys.stdout
+    t0 = time.perf_counter()
+    count = 0
+    tip = None
+    try:
+        for stone in stones:
+            out.write(json.dumps(stone.to_dict(), ensure_ascii=False) + "\n")
+            count += 1
+            tip = stone.digest
+    except (OSError, ValueError) as e:
+        print(f"❌ {e} ({count} stones minted before the error)", file=sys.stderr)
+        raise SystemExit(1)
+    finally:
+        if out is not sys.stdout:
+            out.close()
+    where = f"{INBOX_DIR}/" if args.inbox else f"the ledger (height {len(store)})"
+    print(
+        f"✅ minted {count} stones into {where} in {time.perf_counter() - t0:.2f}s | tip={tip}",
+        file=sys.stderr,
+    )
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,197 @@
+# codex_watcher/policy.py
+"""
+Banned-term policy engine.
+
+The term set is compiled once into a trie-shaped regular expression so a
+canonical string is scanned in a single pass no matter how many terms
+there are. Rules can require whole-word matches and can be scoped to
+individual canonical fields.
+
+Policy files:
+
+  *.json  {"terms": ["password", ...],
+           "rules": [{"term": "ssn", "word": true, "fields": ["notes", "data"]}]}
+  other   one term per line; blank lines and lines starting with # are
+          ignored; a leading "word:" marks a whole-word term, e.g. "word:ssn"
+
+The file is re-read whenever its mtime or size changes. A file that
+fails to load keeps the last good policy in force; if there is none yet,
+PolicyError is raised so the caller can stop instead of rejecting stones.
+"""
+
+import json
+import logging
+import os
+import re
+import time
+from pathlib import Path
+
+from codex_watcher.stone import parse_fields
+
+logger = logging.getLogger(__name__)
+
+# below this many plain substring terms, `term in text` beats a regex
+SMALL_TERM_SET = 16
+
+
+class PolicyError(Exception):
+    pass
+
+
+class Rule:
+    __slots__ = ("term", "word", "fields")
+
+    def __init__(self, term, word=False, fields=None):
+        self.term = term.lower()
+        self.word = bool(word)
+        self.fields = tuple(sorted(fields)) if fields else None
+
+
+def trie_pattern(terms):
+    """Regex source matching any of `terms`, factored as a trie so matching is single-pass."""
+    trie = {}
+    for term in terms:
+        node = trie
+        for ch in term:
+            node = node.setdefault(ch, {})
+        node[""] = True
+
+    def build(node):
+        end = node.get("") is True
+        branches = [re.escape(ch) + build(child) for ch, child in sorted(node.items()) if ch]
+        if not branches:
+            return ""
+        if len(branches) == 1 and not end:
+            return branches[0]
+        body = "(?:" + "|".join(branches) + ")"
+        return body + "?" if end else body
+
+    return build(trie)
+
+
+class CompiledPolicy:
+    """A set of rules grouped by (fields, word) into one regex per group."""
+
+    def __init__(self, rules):
+        self.rules = list(rules)
+        groups = {}
+        for rule in self.rules:
+            if rule.term:
+                groups.setdefault((rule.fields, rule.word), set()).add(rule.term)
+        self.groups = []
+        for (fields, word), terms in groups.items():
+            if not word and len(terms) <= SMALL_TERM_SET:
+                self.groups.append((fields, tuple(sorted(terms))))
+                continue
+            source = trie_pattern(terms)
+            if word:
+                source = r"(?<![0-9a-z_])(?:" + source + r")(?![0-9a-z_])"
+            self.groups.append((fields, re.compile(source)))
+        # scan unscoped groups first, matching the old whole-string loop
+        self.groups.sort(key=lambda g: g[0] is not None)
+
+    def __len__(self):
+        return len(self.rules)
+
+    def scan(self, canonical: str, fields=None):
+        """Return the first banned term found in `canonical`, or None."""
+        low = None
+        for scope, pattern in self.groups:
+            if scope is None:
+                if low is None:
+                    low = canonical.lower()
+                hit = _search(pattern, low)
+                if hit:
+                    return hit
+                continue
+            if fields is None:
+                fields = parse_fields(canonical)
+            for name in scope:
+                value = fields.get(name)
+                if value:
+                    hit = _search(pattern, value.lower())
+                    if hit:
+                        return hit
+        return None
+
+
+def _search(pattern, text):
+    if isinstance(pattern, tuple):
+        for term in pattern:
+            if term in text:
+                return term
+        return None
+    m = pattern.search(text)
+    return m.group(0) if m else None
+
+
+def parse_policy_text(text, suffix=""):
+    rules = []
+    if suffix.lower() == ".json":
+        obj = json.loads(text) if text.strip() else {}
+        for term in obj.get("terms", []):
+            rules.append(Rule(term))
+        for rule in obj.get("rules", []):
+            rules.append(Rule(rule["term"], rule.get("word", False), rule.get("fields")))
+        return rules
+    for line in text.splitlines():
+        line = line.strip()
+        if not line or line.startswith("#"):
+            continue
+        if line.lower().startswith("word:"):
+            rules.append(Rule(line[5:].strip(), word=True))
+        else:
+            rules.append(Rule(line))
+    return rules
+
+
+class PolicyEngine:
+    """
+    Holds the compiled policy for `path`, falling back to `default_terms`
+    when the file does not exist. reload_if_changed() stats the file at most
+    once per `check_interval` seconds.
+    """
+
+    def __init__(self, path, default_terms=(), check_interval=1.0):
+        self.path = Path(path) if path else None
+        self.default_terms = tuple(default_terms)
+        self.check_interval = check_interval
+        self.policy = None
+        self._signature = object()
+        self._checked = 0.0
+
+    def _stat(self):
+        try:
+            st = os.stat(self.path)
+        except (OSError, TypeError):
+            return None
+        return (st.st_mtime_ns, st.st_size)
+
+    def reload_if_changed(self, force=False):
+        now = time.monotonic()
+        if not force and self.policy is not None and now - self._checked < self.check_interval:
+            return self.policy
+        self._checked = now
+        signature = self._stat()
+        if signature == self._signature and self.policy is not None:
+            return self.policy
+        try:
+            if signature is None:
+                rules = [Rule(term) for term in self.default_terms]
+            else:
+                rules = parse_policy_text(self.path.read_text(encoding="utf-8"), self.path.suffix)
+            policy = CompiledPolicy(rules)
+        except (OSError, ValueError, KeyError, TypeError, AttributeError, re.error) as e:
+            if self.policy is None:
+                raise PolicyError(f"cannot load policy {self.path}: {e}") from e
+            # keep enforcing the last good policy while the file is being edited
+            logger.error(f"policy reload failed for {self.path}: {e}")
+            return self.policy
+        self.policy = policy
+        self._signature = signature
+        if signature is not None:
+            logger.info(f"policy loaded from {self.path}: {len(self.policy)} rules")
+        return self.policy
+
+    def scan(self, canonical, fields=None):
+        return self.reload_if_changed().scan(canonical, fields)
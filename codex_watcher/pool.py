@@ -0,0 +1,134 @@
+# codex_watcher/pool.py
+"""
+Reassembly pool for stones that arrive before their parent.
+
+A stone whose `prev` is not yet in the ledger is parked in
+inbox/_pending and recorded here under its `prev` digest. When that
+parent is appended, the waiting children are handed back to the watcher
+so they can cascade into the same batch. Entries older than `ttl`
+seconds are expired and rejected. The pool is persisted as JSON so it
+survives restarts, in a dotfile beside the parked stones (never in the
+inbox itself, where *.json files are taken for stones).
+"""
+
+import json
+import time
+from pathlib import Path
+
+from codex_watcher.ledger import atomic_write_json
+
+
+class PendingPool:
+    def __init__(self, path: Path, pending_dir: Path, inbox_dir: Path, ttl=3600):
+        self.path = Path(path)
+        self.pending_dir = Path(pending_dir)
+        self.inbox_dir = Path(inbox_dir)
+        self.ttl = ttl
+        self.by_prev = {}
+        self.digests = set()
+        self.resolved = 0
+        self.resolve_seconds = 0.0
+        self.resolve_max = 0.0
+        self._dirty = False
+        self.load()
+
+    # ── persistence ──────────────────────────────────────────────────────────
+    def load(self):
+        self.pending_dir.mkdir(parents=True, exist_ok=True)
+        entries = []
+        if self.path.exists():
+            try:
+                entries = json.loads(self.path.read_text(encoding="utf-8"))
+            except ValueError:
+                entries = []
+        self.by_prev, self.digests = {}, set()
+        known = set()
+        for entry in entries:
+            if (self.pending_dir / entry["file"]).exists():
+                self._insert(entry)
+                known.add(entry["file"])
+        # files parked by a run that crashed before saving the pool go back to the inbox
+        for p in self.pending_dir.iterdir():
+            if p.is_file() and p.name not in known and not p.name.startswith("."):
+                p.rename(self.inbox_dir / p.name)
+        self._dirty = len(known) != len(entries)
+        return self
+
+    def save(self):
+        if not self._dirty:
+            return
+        entries = [e for children in self.by_prev.values() for e in children]
+        atomic_write_json(self.path, entries)
+        self._dirty = False
+
+    # ── pool operations ──────────────────────────────────────────────────────
+    def _insert(self, entry):
+        self.by_prev.setdefault(entry["prev"], []).append(entry)
+        self.digests.add(entry["digest"])
+
+    def __len__(self):
+        return len(self.digests)
+
+    def __contains__(self, digest):
+        return digest in self.digests
+
+    def add(self, path: Path, canonical, digest, prev):
+        """Park `path` until a stone with digest `prev` is appended."""
+        target = self.pending_dir / path.name
+        if path != target:
+            path.rename(target)
+        self._insert({
+            "file": path.name,
+            "canonical": canonical,
+            "digest": digest,
+            "prev": prev,
+            "added": time.time(),
+        })
+        self._dirty = True
+
+    def take(self, parent_digest):
+        """Remove and return the entries waiting on `parent_digest`."""
+        children = self.by_prev.pop(parent_digest, [])
+        for entry in children:
+            self.digests.discard(entry["digest"])
+        if children:
+            self._dirty = True
+        return children
+
+    def path_of(self, entry) -> Path:
+        return self.pending_dir / entry["file"]
+
+    def record_resolved(self, entry):
+        waited = max(time.time() - entry["added"], 0.0)
+        self.resolved += 1
+        self.resolve_seconds += waited
+        self.resolve_max = max(self.resolve_max, waited)
+        return waited
+
+    def expire(self, now=None):
+        """Remove and return entries that have waited longer than the TTL."""
+        now = time.time() if now is None else now
+        expired = []
+        for prev in list(self.by_prev):
+            keep = []
+            for entry in self.by_prev[prev]:
+                (expired if now - entry["added"] > self.ttl else keep).append(entry)
+            if keep:
+                self.by_prev[prev] = keep
+            else:
+                del self.by_prev[prev]
+        for entry in expired:
+            self.digests.discard(entry["digest"])
+        if expired:
+            self._dirty = True
+        return expired
+
+    def stats(self):
+        avg = self.resolve_seconds / self.resolved if self.resolved else 0.0
+        return {
+            "pending": len(self),
+            "waiting_parents": len(self.by_prev),
+            "resolved": self.resolved,
+            "resolve_avg_s": round(avg, 3),
+            "resolve_max_s": round(self.resolve_max, 3),
+        }
@@ -0,0 +1,276 @@
+# codex_watcher/query.py
+"""
+SQLite query index over canonical fields, and the `codex-query` CLI.
+
+One row per stone -- height, digest, author, axis, seed, method and the
+record's segment/offset -- in LEDGER_DIR/query.sqlite, with indexes on
+the filterable columns. The database runs in WAL mode, so readers (this
+CLI, the dashboard, ad-hoc sqlite3 sessions) never block the watcher's
+writes and always see a consistent height.
+
+The index is optional: `codex-query --build` creates it, and from then
+on the watcher keeps it current as a store sidecar. A `meta` row holds
+the indexed height and tip; if they no longer match the ledger the next
+sync rebuilds, and a ledger that moved on without the watcher (e.g.
+codex_chain) is caught up with `codex-query --sync`.
+"""
+
+import argparse
+import json
+import sqlite3
+import sys
+from pathlib import Path
+
+from codex_watcher.ledger import LEDGER_DIR, LedgerError, segment_name
+from codex_watcher.stone import Stone
+
+QUERY_DB_NAME = "query.sqlite"
+PAGE_SIZE     = 50
+COLUMNS       = ("author", "axis", "seed", "method")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS stones (
+    height   INTEGER PRIMARY KEY,
+    digest   TEXT NOT NULL UNIQUE,
+    author   TEXT,
+    axis     TEXT,
+    seed     TEXT,
+    method   TEXT,
+    segment  INTEGER NOT NULL,
+    offset   INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS stones_author ON stones(author, height);
+CREATE INDEX IF NOT EXISTS stones_axis   ON stones(axis, height);
+CREATE INDEX IF NOT EXISTS stones_seed   ON stones(seed);
+CREATE INDEX IF NOT EXISTS stones_method ON stones(method, height);
+CREATE TABLE IF NOT EXISTS meta (
+    id     INTEGER PRIMARY KEY CHECK (id = 0),
+    height INTEGER NOT NULL,
+    tip    TEXT
+);
+"""
+
+
+def connect(path, readonly=False):
+    if readonly:
+        conn = sqlite3.connect(f"file:{path}?mode=ro", uri=True, timeout=5)
+    else:
+        # the writer is only used under the store lock, possibly from a worker thread
+        conn = sqlite3.connect(str(path), timeout=30, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.executescript(SCHEMA)
+    conn.row_factory = sqlite3.Row
+    return conn
+
+
+class QueryIndex:
+    """SQLite index sidecar kept in step with a LedgerStore."""
+
+    def __init__(self, store):
+        self.store = store
+        self.path = store.root / QUERY_DB_NAME
+        self.conn = None
+        self.height = 0
+        self.tip = None
+
+    def _load(self):
+        self.conn = connect(self.path)
+        self._read_meta()
+        if self.height > self.store.height or (self.height and not self._tip_holds()):
+            self.rebuild()
+
+    def _read_meta(self):
+        row = self.conn.execute("SELECT height, tip FROM meta WHERE id = 0").fetchone()
+        self.height, self.tip = (row["height"], row["tip"]) if row else (0, None)
+
+    def _tip_holds(self):
+        """Whether the indexed tip is still the record at its stored segment/offset."""
+        row = self.conn.execute(
+            "SELECT segment, offset FROM stones WHERE height = ?", (self.height - 1,)
+        ).fetchone()
+        if row is None:
+            return False
+        try:
+            return self.store.read_at(row["segment"], row["offset"])["digest"] == self.tip
+        except (OSError, ValueError, KeyError, LedgerError):
+            return False
+
+    def sync(self):
+        if self.conn is None:
+            self._load()
+        if self.height < self.store.height:
+            with self.store._locked():
+                self._insert(self.store.iter_positions(self.height))
+        return self
+
+    def rebuild(self):
+        if self.conn is None:
+            self.conn = connect(self.path)
+        with self.conn:
+            self.conn.execute("DELETE FROM stones")
+            self.conn.execute("DELETE FROM meta")
+        self.height, self.tip = 0, None
+        self._insert(self.store.iter_positions(0))
+        return self
+
+    def _insert(self, entries):
+        rows = []
+        for height, seg_start, offset, stone in entries:
+            stone = Stone.of(stone)
+            f = stone.fields
+            rows.append((height, stone.digest, f.get("author"), f.get("axis"),
+                         f.get("seed"), f.get("method"), seg_start, offset))
+        if not rows:
+            return
+        with self.conn:
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO stones VALUES (?, ?, ?, ?, ?, ?, ?, ?)", rows
+            )
+            self.height, self.tip = rows[-1][0] + 1, rows[-1][1]
+            self.conn.execute(
+                "INSERT OR REPLACE INTO meta (id, height, tip) VALUES (0, ?, ?)",
+                (self.height, self.tip),
+            )
+
+    def on_append(self, entries):
+        """Called by the store, under its lock, after new records are fsync'd."""
+        if self.conn is None or not entries:
+            return
+        # codex-query --sync or another writer may have moved the index on meanwhile
+        self._read_meta()
+        first = entries[0][0]
+        if self.height < first:
+            self._insert(self.store.iter_positions(self.height))
+        elif self.height < first + len(entries):
+            self._insert(entries[self.height - first:])
+
+    def close(self):
+        if self.conn is not None:
+            self.conn.close()
+            self.conn = None
+
+
+# ── Queries ───────────────────────────────────────────────────────────────────
+def build_query(author=None, axis=None, method=None, seed_prefix=None, digest=None,
+                min_height=None, max_height=None, after=None, descending=False,
+                limit=PAGE_SIZE, offset=0, count=False):
+    """
+    SQL and parameters for a filtered page of stones. `after` is a keyset
+    cursor (the last height of the previous page) and is cheaper than a
+    large `offset` on deep pages.
+    """
+    where, params = [], []
+    for column, value in (("author", author), ("axis", axis), ("method", method), ("digest", digest)):
+        if value is not None:
+            where.append(f"{column} = ?")
+            params.append(value)
+    if seed_prefix:
+        # a range instead of LIKE so the seed index is used
+        where.append("seed >= ? AND seed < ?")
+        params += [seed_prefix, seed_prefix + "\U0010ffff"]
+    if min_height is not None:
+        where.append("height >= ?")
+        params.append(min_height)
+    if max_height is not None:
+        where.append("height <= ?")
+        params.append(max_height)
+    if after is not None:
+        where.append("height < ?" if descending else "height > ?")
+        params.append(after)
+    clause = f" WHERE {' AND '.join(where)}" if where else ""
+    if count:
+        return f"SELECT COUNT(*) FROM stones{clause}", params
+    order = "DESC" if descending else "ASC"
+    sql = f"SELECT * FROM stones{clause} ORDER BY height {order} LIMIT ? OFFSET ?"
+    return sql, params + [limit, offset]
+
+def read_canonical(root, seg_start, offset):
+    """The canonical string of the record at (segment, offset), read straight from disk."""
+    with open(Path(root) / segment_name(seg_start), "rb") as fh:
+        fh.seek(offset)
+        return json.loads(fh.readline())["canonical"]
+
+
+# ── CLI Entrypoint ────────────────────────────────────────────────────────────
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="codex-query", description="Query stones by canonical fields"
+    )
+    parser.add_argument("--author", help="Exact author")
+    parser.add_argument("--axis", help="Exact axis")
+    parser.add_argument("--method", help="Exact method")
+    parser.add_argument("--seed-prefix", help="Seeds starting with this prefix")
+    parser.add_argument("--digest", help="Exact digest")
+    parser.add_argument("--min-height", type=int, help="Lowest height to include")
+    parser.add_argument("--max-height", type=int, help="Highest height to include")
+    parser.add_argument("--limit", type=int, default=PAGE_SIZE, help="Stones per page")
+    parser.add_argument("--page", type=int, default=1, help="Page number (1-based)")
+    parser.add_argument("--after", type=int, help="Keyset cursor: continue after this height")
+    parser.add_argument("--desc", action="store_true", help="Newest first")
+    parser.add_argument("--count", action="store_true", help="Only print the number of matches")
+    parser.add_argument("--canonical", action="store_true", help="Include canonical strings")
+    parser.add_argument("--json", action="store_true", help="JSON output")
+    parser.add_argument("--ledger", type=Path, default=LEDGER_DIR, help="Ledger directory")
+    parser.add_argument("--build", action="store_true", help="(Re)build the index from the ledger")
+    parser.add_argument("--sync", action="store_true", help="Index stones appended since the last sync")
+    args = parser.parse_args(argv)
+
+    db = args.ledger / QUERY_DB_NAME
+    if args.build or args.sync:
+        from codex_watcher.ledger import get_store
+        store = get_store(args.ledger)
+        index = QueryIndex(store)
+        if args.build:
+            index.rebuild()
+        else:
+            index.sync()
+        print(f"✅ Query index at height {index.height}", file=sys.stderr)
+        index.close()
+        if not any(getattr(args, c) for c in ("author", "axis", "method", "seed_prefix", "digest")):
+            return
+    if not db.exists():
+        raise SystemExit(f"❌ no query index at {db} — run `codex-query --build` first")
+
+    conn = connect(db, readonly=True)
+    filters = dict(
+        author=args.author, axis=args.axis, method=args.method, seed_prefix=args.seed_prefix,
+        digest=args.digest, min_height=args.min_height, max_height=args.max_height,
+    )
+    if args.count:
+        sql, params = build_query(count=True, **filters)
+        print(conn.execute(sql, params).fetchone()[0])
+        return
+    offset = 0 if args.after is not None else (max(args.page, 1) - 1) * args.limit
+    sql, params = build_query(after=args.after, descending=args.desc,
+                              limit=args.limit, offset=offset, **filters)
+    rows = []
+    for r in conn.execute(sql, params):
+        row = {"height": r["height"], "digest": r["digest"]}
+        row.update({c: r[c] for c in COLUMNS})
+        if args.canonical:
+            row["canonical"] = read_canonical(args.ledger, r["segment"], r["offset"])
+        rows.append(row)
+    indexed = conn.execute("SELECT height FROM meta WHERE id = 0").fetchone()
+    conn.close()
+
+    if args.json:
+        print(json.dumps({
+            "indexed_height": indexed[0] if indexed else 0,
+            "count": len(rows),
+            "next_after": rows[-1]["height"] if len(rows) == args.limit else None,
+            "stones": rows,
+        }, indent=2, ensure_ascii=False))
+        return
+    for row in rows:
+        print(
+            f"{row['height']:>8}  {row['digest']}  "
+            f"{row['author'] or '-':<16} {row['axis'] or '-':<16} {row['seed'] or '-'}"
+        )
+        if args.canonical:
+            print(f"          {row['canonical']}")
+    if len(rows) == args.limit:
+        print(f"… more: --after {rows[-1]['height']}", file=sys.stderr)
+
+if __name__ == "__main__":
+    main()
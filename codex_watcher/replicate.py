@@ -0,0 +1,267 @@
+# codex_watcher/replicate.py
+"""
+Ledger replication between nodes by tip-based range sync.
+
+`codex-watcher serve` exposes the local ledger over HTTP:
+
+    GET /ledger/tip                             {"height": …, "digest": …}
+    GET /ledger/range?after=<digest>&limit=N    raw NDJSON records following <digest>
+    GET /ledger/ancestor?locator=<d1>,<d2>,…    the first listed digest this node has
+
+Ranges are sent gzip-compressed when the client accepts it. A range
+request for a digest the node does not have answers 404.
+
+`codex-watcher sync <url>` sends its tip and pulls everything after it in
+large batches. Each batch is checked in one pass (digests and prev links,
+see verify_records) and must continue from the local tip or the previous
+batch. The whole suffix is then appended with a single store.append. If
+the peer does not know the local tip, the chains have diverged: probes of
+local digests (a locator) narrow down the last stone both sides share.
+That common ancestor is reported and nothing is applied. Replicated
+stones are not re-run through the local banned-term policy; they were
+accepted by the node that minted them.
+"""
+
+import gzip
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlencode, urlsplit
+
+from codex_watcher.ledger import LedgerError, decode_record
+from codex_watcher.verify import verify_records
+
+SERVE_HOST    = "127.0.0.1"
+SERVE_PORT    = 8765
+RANGE_LIMIT   = 10000   # max records per range response
+SYNC_BATCH    = 5000    # records requested per range call
+LOCATOR_SIZE  = 64      # digests probed per ancestor round
+GZIP_LEVEL    = 6
+
+
+class SyncError(Exception):
+    pass
+
+
+# ── Serving side ──────────────────────────────────────────────────────────────
+def read_range(store, after=None, limit=RANGE_LIMIT):
+    """
+    Up to `limit` raw records following the stone `after` (from genesis
+    if None). Returns (start height, count, bytes), or None if `after`
+    is not in this ledger.
+    """
+    store.refresh()
+    if after is None:
+        height, seg_start, offset, skip = 0, 0, 0, False
+    else:
+        pos = store.index.lookup(after)
+        if pos is None:
+            return None
+        height, seg_start, offset = pos
+        height, skip = height + 1, True
+    start, lines = height, []
+    segments = store.manifest["segments"]
+    for i, seg in enumerate(segments):
+        if seg["start"] < seg_start:
+            continue
+        end = segments[i + 1]["start"] if i + 1 < len(segments) else store.height
+        with open(store.root / seg["file"], "rb") as fh:
+            if seg["start"] == seg_start:
+                fh.seek(offset)
+                if skip:
+                    fh.readline()
+            while height < end and len(lines) < limit:
+                line = fh.readline()
+                if not line.endswith(b"\n"):
+                    break
+                lines.append(line)
+                height += 1
+        if len(lines) >= limit:
+            break
+    return start, len(lines), b"".join(lines)
+
+def make_handler(store, lock):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+        server_version = "codex-ledger/0.1"
+
+        def log_message(self, *args):
+            pass
+
+        def send(self, code, body, content_type="application/json", headers=()):
+            if len(body) > 1024 and "gzip" in self.headers.get("Accept-Encoding", ""):
+                body = gzip.compress(body, GZIP_LEVEL)
+                headers = list(headers) + [("Content-Encoding", "gzip")]
+            self.send_response(code)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(body)))
+            for key, value in headers:
+                self.send_header(key, value)
+            self.end_headers()
+            self.wfile.write(body)
+
+        def send_json(self, code, obj):
+            self.send(code, json.dumps(obj).encode("utf-8"))
+
+        def do_GET(self):
+            url = urlsplit(self.path)
+            query = {k: v[-1] for k, v in parse_qs(url.query).items()}
+            try:
+                with lock:
+                    store.refresh()
+                    tip = {"height": store.height, "digest": store.tip["digest"]}
+                    if url.path == "/ledger/tip":
+                        return self.send_json(200, tip)
+                    if url.path == "/ledger/range":
+                        limit = min(int(query.get("limit", RANGE_LIMIT)), RANGE_LIMIT)
+                        found = read_range(store, query.get("after"), max(limit, 1))
+                        if found is None:
+                            return self.send_json(404, dict(tip, error="unknown digest"))
+                        start, count, data = found
+                        return self.send(200, data, "application/x-ndjson", [
+                            ("X-Ledger-Start", str(start)),
+                            ("X-Ledger-Count", str(count)),
+                            ("X-Ledger-Height", str(tip["height"])),
+                            ("X-Ledger-Tip", tip["digest"]),
+                        ])
+                    if url.path == "/ledger/ancestor":
+                        for digest in filter(None, query.get("locator", "").split(",")):
+                            height = store.position(digest)
+                            if height is not None:
+                                return self.send_json(200, {"height": height, "digest": digest})
+                        return self.send_json(200, {"height": None, "digest": None})
+                self.send_json(404, {"error": f"no route {url.path}"})
+            except (ValueError, LedgerError) as e:
+                self.send_json(400, {"error": str(e)})
+
+    return Handler
+
+def serve(store, host=SERVE_HOST, port=SERVE_PORT):
+    """Serve `store` for replication until interrupted."""
+    server = ThreadingHTTPServer((host, port), make_handler(store, threading.Lock()))
+    server.daemon_threads = True
+    print(f"🌐 serving ledger (height {len(store)}) at http://{host}:{server.server_port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+# ── Client side ───────────────────────────────────────────────────────────────
+def _get(pool, peer, path, **params):
+    from codex_fetcher.engine import FetchError, fetch
+
+    url = f"{peer.rstrip('/')}{path}"
+    if params:
+        url += "?" + urlencode(params)
+    try:
+        return fetch(pool, url)
+    except FetchError as e:
+        raise SyncError(str(e)) from e
+
+def _json(resp):
+    if resp.status_code != 200:
+        raise SyncError(f"{resp.url}: HTTP {resp.status_code}")
+    return resp.json()
+
+def digests_at(store, heights):
+    """Local digests at `heights` ({height: digest}), read in one pass."""
+    wanted = set(heights)
+    found = {}
+    for height, _, _, stone in store.iter_positions(min(wanted)):
+        if height in wanted:
+            found[height] = stone["digest"]
+            if len(found) == len(wanted):
+                break
+    return found
+
+def locate_ancestor(store, pool, peer):
+    """
+    Height and digest of the newest stone both ledgers share, or
+    (None, None) if not even genesis matches. Each round asks the peer
+    about up to LOCATOR_SIZE local digests spread over the unresolved
+    range, newest first, and narrows the range to the gap between the
+    newest digest it knows and the next one up.
+    """
+    lo, lo_digest = -1, None      # newest height known to be shared
+    hi = store.height - 1         # oldest height known not to be
+    while hi - lo > 1:
+        gap = hi - lo - 1
+        step = max(1, -(-gap // LOCATOR_SIZE))
+        heights = list(range(hi - 1, lo, -step))[:LOCATOR_SIZE]
+        local = digests_at(store, heights)
+        answer = _json(_get(pool, peer, "/ledger/ancestor",
+                            locator=",".join(local[h] for h in heights)))
+        if answer["digest"] is None:
+            hi = heights[-1]
+            continue
+        h = next(h for h in heights if local[h] == answer["digest"])
+        i = heights.index(h)
+        lo, lo_digest = h, answer["digest"]
+        if i:
+            hi = heights[i - 1]
+    return (lo, lo_digest) if lo >= 0 else (None, None)
+
+def sync(store, peer, batch=SYNC_BATCH, max_stones=None, pool=None):
+    """
+    Pull the stones `peer` has after our tip and append them in one commit.
+    Returns a summary dict whose "status" is "up-to-date", "ahead",
+    "synced" or "diverged" (with the common ancestor).
+    """
+    from codex_fetcher.engine import SessionPool
+
+    pool = pool or SessionPool()
+    t0 = time.perf_counter()
+    base = store.tip_digest()
+    remote = _json(_get(pool, peer, "/ledger/tip"))
+    result = {
+        "peer": peer,
+        "local_height": store.height,
+        "remote_height": remote["height"],
+        "pulled": 0,
+    }
+    if remote["digest"] == base:
+        return dict(result, status="up-to-date")
+    if store.contains(remote["digest"]):
+        return dict(result, status="ahead")
+
+    chunks, count, after, remote_height = [], 0, base, remote["height"]
+    while max_stones is None or count < max_stones:
+        limit = batch if max_stones is None else min(batch, max_stones - count)
+        resp = _get(pool, peer, "/ledger/range", after=after, limit=limit)
+        if resp.status_code == 404 and not chunks:
+            height, digest = locate_ancestor(store, pool, peer)
+            return dict(result, status="diverged", ancestor_height=height, ancestor=digest,
+                        local_after=store.height - 1 - (height if height is not None else -1),
+                        remote_after=remote["height"] - 1 - (height if height is not None else -1))
+        if resp.status_code != 200:
+            raise SyncError(f"{resp.url}: HTTP {resp.status_code} while pulling")
+        n, first_prev, last_digest, _, errors = verify_records(resp.content)
+        if not n:
+            break
+        if errors:
+            index, reason = errors[0]
+            start = int(resp.headers["X-Ledger-Start"])
+            raise SyncError(f"peer sent a bad record at height {start + index}: {reason}")
+        if first_prev != after:
+            raise SyncError(f"peer range does not continue from {after} (prev={first_prev})")
+        chunks.append(resp.content)
+        count += n
+        after = last_digest
+        remote_height = int(resp.headers["X-Ledger-Height"])
+        if int(resp.headers["X-Ledger-Start"]) + n >= remote_height:
+            break
+
+    stones = [decode_record(line) for chunk in chunks for line in chunk.splitlines()]
+    with store._locked():
+        if store.tip_digest() != base:
+            raise SyncError("local tip moved while pulling; run sync again")
+        store.append(stones)
+    return dict(
+        result, status="synced", pulled=len(stones), height=store.height,
+        tip=store.tip["digest"], remaining=max(remote_height - store.height, 0),
+        seconds=round(time.perf_counter() - t0, 3),
+    )
@@ -0,0 +1,200 @@
+# codex_watcher/stone.py
+"""
+Typed stone records.
+
+Stone holds a canonical string and its digest in two slots and parses
+the `key=value;...` fields only when first asked, caching the result.
+Field names go through one interned table (FIELD_NAMES), as do the
+values of low-cardinality fields such as author and axis, so a million
+parsed stones share one copy of "author", "CodexWeb" and so on.
+
+Stone also answers stone["canonical"] / stone["digest"] / .get() like
+the plain dicts it replaces, so code written against ledger records
+keeps working.
+
+StoneColumns is an array-backed column store for holding a whole chain
+in memory: digests packed as 32 raw bytes, canonical strings in one
+UTF-8 buffer with an offsets array, and small integer codes for the
+interned fields.
+"""
+
+import sys
+from array import array
+from collections import Counter
+
+FIELD_NAMES = {}   # field name -> its single interned copy
+INTERNED_VALUES = frozenset({"author", "axis", "method", "metrics", "trials"})
+
+
+def field_name(name: str) -> str:
+    interned = FIELD_NAMES.get(name)
+    if interned is None:
+        interned = FIELD_NAMES[name] = sys.intern(name)
+    return interned
+
+def parse_fields(canonical: str):
+    """Split `key=value;...` into a dict with interned keys (and interned low-cardinality values)."""
+    fields = {}
+    for part in canonical.split(";"):
+        key, sep, value = part.partition("=")
+        if not sep:
+            continue
+        key = field_name(key)
+        fields[key] = sys.intern(value) if key in INTERNED_VALUES else value
+    return fields
+
+
+class Stone:
+    """One ledger record: canonical string, digest and lazily parsed fields."""
+
+    __slots__ = ("canonical", "digest", "_fields")
+
+    def __init__(self, canonical: str, digest: str, fields=None):
+        self.canonical = canonical
+        self.digest = digest
+        self._fields = fields
+
+    @classmethod
+    def of(cls, record):
+        """Coerce a {"canonical", "digest"} mapping (or a Stone) into a Stone."""
+        if isinstance(record, cls):
+            return record
+        return cls(record["canonical"], record["digest"])
+
+    @property
+    def fields(self):
+        if self._fields is None:
+            self._fields = parse_fields(self.canonical or "")
+        return self._fields
+
+    def field(self, name, default=None):
+        return self.fields.get(name, default)
+
+    @property
+    def prev(self):
+        return self.fields.get("prev")
+
+    @property
+    def author(self):
+        return self.fields.get("author")
+
+    @property
+    def axis(self):
+        return self.fields.get("axis")
+
+    @property
+    def seed(self):
+        return self.fields.get("seed")
+
+    # ── dict compatibility ───────────────────────────────────────────────────
+    def __getitem__(self, key):
+        if key == "canonical":
+            return self.canonical
+        if key == "digest":
+            return self.digest
+        raise KeyError(key)
+
+    def get(self, key, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def keys(self):
+        return ("canonical", "digest")
+
+    def to_dict(self):
+        return {"canonical": self.canonical, "digest": self.digest}
+
+    def __eq__(self, other):
+        if isinstance(other, (Stone, dict)):
+            return self.canonical == other["canonical"] and self.digest == other["digest"]
+        return NotImplemented
+
+    def __hash__(self):
+        return hash(self.digest)
+
+    def __repr__(self):
+        return f"Stone(digest={self.digest!r})"
+
+
+# ── Column store ──────────────────────────────────────────────────────────────
+COLUMN_FIELDS = ("author", "axis", "method")
+
+
+class StoneColumns:
+    """Append-only in-memory chain, stored column-wise."""
+
+    def __init__(self, stones=(), columns=COLUMN_FIELDS):
+        self._digests = bytearray()
+        self._odd_digests = {}            # index -> digest that is not 64 hex chars
+        self._text = bytearray()
+        self._offsets = array("Q", [0])
+        self._columns = {field_name(c): array("I") for c in columns}
+        self._values = {c: [None] for c in self._columns}   # code 0 = field absent
+        self._codes = {c: {} for c in self._columns}
+        self.extend(stones)
+
+    def append(self, stone):
+        stone = Stone.of(stone)
+        index = len(self)
+        try:
+            raw = bytes.fromhex(stone.digest)
+        except (TypeError, ValueError):
+            raw = b""
+        if len(raw) != 32:
+            self._odd_digests[index] = stone.digest
+            raw = bytes(32)
+        self._digests += raw
+        self._text += stone.canonical.encode("utf-8")
+        self._offsets.append(len(self._text))
+        fields = stone.fields
+        for name, column in self._columns.items():
+            value = fields.get(name)
+            if value is None:
+                column.append(0)
+                continue
+            codes = self._codes[name]
+            code = codes.get(value)
+            if code is None:
+                code = codes[value] = len(self._values[name])
+                self._values[name].append(value)
+            column.append(code)
+
+    def extend(self, stones):
+        for stone in stones:
+            self.append(stone)
+
+    def __len__(self):
+        return len(self._offsets) - 1
+
+    def digest(self, index):
+        odd = self._odd_digests.get(index)
+        if odd is not None:
+            return odd
+        return self._digests[index * 32:(index + 1) * 32].hex()
+
+    def canonical(self, index):
+        return self._text[self._offsets[index]:self._offsets[index + 1]].decode("utf-8")
+
+    def __getitem__(self, index):
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError(index)
+        return Stone(self.canonical(index), self.digest(index))
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self[i]
+
+    def column(self, name):
+        """Values of an interned column in chain order (None where absent)."""
+        values = self._values[name]
+        return [values[code] for code in self._columns[name]]
+
+    def counts(self, name):
+        """Counter of an interned column's values, computed from the codes."""
+        values = self._values[name]
+        codes = Counter(self._columns[name])
+        return Counter({values[code]: n for code, n in codes.items() if code})
@@ -0,0 +1,177 @@
+# codex_watcher/stream.py
+"""
+Fetch → validate pipeline without the inbox round trip.
+
+The fetcher hands each payload to StonePipeline.put(), which wraps it
+in a Payload and blocks once QUEUE_SIZE payloads are waiting, so slow
+validation throttles the mirrors instead of piling up memory. The
+validator drains the queue in batches through the same process_files()
+used for inbox files: a Payload behaves like an inbox Path (name,
+suffix, read_text, rename), and "renaming" it writes the file to its
+destination -- except into _processed/, which is skipped unless audit
+copies are on. Rejected and pending stones therefore still land on
+disk; accepted ones only reach the ledger.
+
+Fetcher state is flushed only after everything a fetch round queued has
+been processed, so a crash re-fetches rather than loses stones. The
+inbox is still swept every `sweep_interval` seconds for manual drops.
+"""
+
+import queue
+import threading
+import time
+from pathlib import Path
+
+import yaml
+
+from codex_fetcher.fetcher import CONFIG_PATH, fetch_all, load_state
+from codex_fetcher.engine import SessionPool
+from codex_watcher.cli import (
+    BATCH_SIZE, MAX_COMMIT_LATENCY, PROCESSED_DIR, WORKERS,
+    ensure_dirs, logger, process_files, process_inbox_once, recover_pending_commit,
+)
+from codex_watcher.metrics import METRICS
+
+QUEUE_SIZE     = 1024
+FETCH_INTERVAL = 60
+SWEEP_INTERVAL = 60
+
+
+class Payload:
+    """A fetched stone held in memory, standing in for an inbox Path."""
+
+    def __init__(self, name, text, audit=False):
+        self.name = name
+        self.text = text
+        self.audit = audit
+
+    @property
+    def suffix(self):
+        return Path(self.name).suffix
+
+    def read_text(self, encoding="utf-8"):
+        return self.text
+
+    def is_file(self):
+        return True
+
+    def rename(self, target):
+        target = Path(target)
+        if self.audit or target.parent != PROCESSED_DIR:
+            target.write_text(self.text, encoding="utf-8")
+        return target
+
+    def __str__(self):
+        # recorded in the commit journal; never resolves to a real inbox file
+        return f"stream:{self.name}"
+
+    def __repr__(self):
+        return f"Payload({self.name!r}, {len(self.text)} chars)"
+
+
+class StonePipeline:
+    """Bounded hand-off from fetcher threads to the single validator loop."""
+
+    def __init__(self, maxsize=QUEUE_SIZE, audit=False):
+        self.queue = queue.Queue(maxsize)
+        self.audit = audit
+        self.arrivals = {}
+        self.blocked = 0.0   # seconds producers spent waiting on a full queue
+
+    def put(self, name, text):
+        payload = Payload(name, text, self.audit)
+        self.arrivals.setdefault(name, time.monotonic())
+        try:
+            self.queue.put_nowait(payload)
+        except queue.Full:
+            t0 = time.monotonic()
+            self.queue.put(payload)
+            self.blocked += time.monotonic() - t0
+
+    def take(self, batch_size, timeout):
+        """Wait up to `timeout` for one payload, then grab what else is ready."""
+        try:
+            items = [self.queue.get(timeout=timeout)]
+        except queue.Empty:
+            return []
+        while len(items) < batch_size:
+            try:
+                items.append(self.queue.get_nowait())
+            except queue.Empty:
+                break
+        return items
+
+    def done(self, items):
+        for item in items:
+            self.arrivals.pop(item.name, None)
+            self.queue.task_done()
+
+
+def fetch_loop(pipeline, mirrors, interval, rounds, finished, stop):
+    """Producer thread: fetch every mirror into the pipeline, `rounds` times (None = forever)."""
+    state = load_state()
+    pool = SessionPool()
+    done_rounds = 0
+    try:
+        while not stop.is_set():
+            t0 = time.monotonic()
+            try:
+                results = fetch_all(mirrors, state, pool, sink=pipeline.put)
+                # only persist "seen" once every queued payload is in the ledger or on disk
+                pipeline.queue.join()
+                state.flush()
+                msg = (
+                    f"🔁 fetch round: {sum(len(v) for v in results.values())} new in "
+                    f"{time.monotonic() - t0:.1f}s | producer blocked {pipeline.blocked:.1f}s total"
+                )
+                print(msg); logger.info(msg)
+            except Exception as e:
+                msg = f"⚠️ fetch round failed: {e}"
+                print(msg); logger.error(msg)
+            done_rounds += 1
+            if rounds and done_rounds >= rounds:
+                break
+            stop.wait(max(interval - (time.monotonic() - t0), 0))
+    finally:
+        pool.close()
+        finished.set()
+
+
+def pipeline_run(mirrors=None, fetch_interval=FETCH_INTERVAL, rounds=None, queue_size=QUEUE_SIZE,
+                 audit=False, sweep_interval=SWEEP_INTERVAL, batch_size=BATCH_SIZE,
+                 max_latency=MAX_COMMIT_LATENCY, workers=WORKERS):
+    """Run the fetcher and the validator in one process, linked by a bounded queue."""
+    ensure_dirs()
+    recover_pending_commit()
+    if mirrors is None:
+        mirrors = yaml.safe_load(Path(CONFIG_PATH).read_text(encoding="utf-8")).get("mirrors", [])
+    pipeline = StonePipeline(queue_size, audit)
+    finished, stop = threading.Event(), threading.Event()
+    producer = threading.Thread(
+        target=fetch_loop,
+        args=(pipeline, mirrors, fetch_interval, rounds, finished, stop),
+        name="codex-fetch",
+        daemon=True,
+    )
+    print(f"🚰 Pipeline: {len(mirrors)} mirrors → queue({queue_size}) → ledger")
+    process_inbox_once(batch_size, max_latency, workers)
+    next_sweep = time.monotonic() + sweep_interval
+    producer.start()
+    try:
+        while not (finished.is_set() and pipeline.queue.empty()):
+            items = pipeline.take(batch_size, timeout=0.5)
+            METRICS.set_gauge("queue_depth", pipeline.queue.qsize())
+            METRICS.set_gauge("producer_blocked_seconds", round(pipeline.blocked, 3))
+            if items:
+                try:
+                    process_files(items, batch_size, max_latency,
+                                  arrivals=pipeline.arrivals, workers=workers)
+                finally:
+                    pipeline.done(items)
+            if time.monotonic() >= next_sweep:
+                process_inbox_once(batch_size, max_latency, workers)
+                next_sweep = time.monotonic() + sweep_interval
+    except KeyboardInterrupt:
+        print("⏹ Pipeline stopped.")
+    finally:
+        stop.set()
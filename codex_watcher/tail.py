@@ -0,0 +1,120 @@
+# codex_watcher/tail.py
+"""
+Read-only incremental reader over the segmented ledger, for consumers
+such as the dashboard that poll for new stones.
+
+LedgerTail remembers which segment it has read up to, the byte offset
+of the last complete record and the (mtime, size) of that segment and
+of the manifest. A poll with nothing new costs two stat() calls; after
+an append only the new bytes are read and parsed. It takes no lock and
+never writes, so it is safe alongside a running watcher: a record still
+being written is left for the next poll.
+"""
+
+import json
+import os
+from pathlib import Path
+
+from codex_watcher.ledger import LEDGER_DIR, MANIFEST_NAME, decode_record
+from codex_watcher.stone import Stone
+
+# canonical fields exposed as columns; absent ones come back as None
+FIELDS = ("seed", "prev", "axis", "author", "timestamp", "delta")
+
+
+def stone_row(height, stone, fields=FIELDS):
+    """Flatten a stone into a row: height, digest and selected canonical fields."""
+    stone = Stone.of(stone)
+    parts = stone.fields
+    row = {"height": height, "digest": stone.digest}
+    for name in fields:
+        row[name] = parts.get(name)
+    return row
+
+
+class LedgerTail:
+    """Follows LEDGER_DIR from a remembered position; see poll()."""
+
+    def __init__(self, root=LEDGER_DIR, fields=FIELDS):
+        self.root = Path(root)
+        self.fields = fields
+        self.reset()
+
+    def reset(self):
+        self.height = 0
+        self.segment = 0          # index into the manifest's segment list
+        self.offset = 0
+        self._manifest_stat = None
+        self._segment_stat = None
+        self._segments = []
+        self._first = None
+
+    def _stat(self, path):
+        try:
+            st = os.stat(path)
+        except OSError:
+            return None
+        return st.st_mtime_ns, st.st_size
+
+    def poll(self):
+        """
+        Return (rows, reset). `rows` are the stones appended since the last
+        poll; `reset` is True when the ledger was replaced or shrank under
+        us, in which case the rows start again from genesis and the caller
+        should drop what it had.
+        """
+        manifest_path = self.root / MANIFEST_NAME
+        manifest_stat = self._stat(manifest_path)
+        if manifest_stat is None:
+            was_empty = self.height == 0
+            self.reset()
+            return [], not was_empty
+        reset = False
+        if manifest_stat != self._manifest_stat:
+            manifest = json.loads(manifest_path.read_text(encoding="utf-8"))
+            segments = [seg["file"] for seg in manifest["segments"]]
+            if self._first is not None and (not segments or segments[0] != self._first
+                                             or len(segments) < len(self._segments)):
+                self.reset()
+                reset = True
+            self._segments = segments
+            self._first = segments[0] if segments else None
+            self._manifest_stat = manifest_stat
+        elif not self._segments:
+            return [], False
+        elif self._segment_stat == self._stat(self.root / self._segments[self.segment]):
+            return [], False
+
+        rows = []
+        while self.segment < len(self._segments):
+            path = self.root / self._segments[self.segment]
+            seg_stat = self._stat(path)
+            size = seg_stat[1] if seg_stat else 0
+            if size < self.offset:
+                # the segment was rewritten: start over
+                self.reset()
+                rows, _ = self.poll()
+                return rows, True
+            if size > self.offset:
+                with open(path, "rb") as fh:
+                    fh.seek(self.offset)
+                    data = fh.read(size - self.offset)
+                pos = 0
+                while True:
+                    nl = data.find(b"\n", pos)
+                    if nl < 0:
+                        break
+                    try:
+                        stone = decode_record(data[pos:nl])
+                    except ValueError:
+                        break
+                    rows.append(stone_row(self.height, stone, self.fields))
+                    self.height += 1
+                    pos = nl + 1
+                self.offset += pos
+            self._segment_stat = seg_stat
+            if self.segment + 1 == len(self._segments):
+                break
+            self.segment += 1
+            self.offset = 0
+        return rows, reset
@@ -0,0 +1,176 @@
+# codex_watcher/verify.py
+"""
+Full-chain verification.
+
+Every stone must hash to its digest and name the previous stone's digest
+as `prev`. The segments are cut into byte-range chunks that are checked
+in parallel; each chunk reports the `prev` of its first record and the
+digest of its last, so continuity across chunk boundaries is checked
+when the results are stitched together in order.
+
+A verified-up-to checkpoint (LEDGER_DIR/VERIFIED.json) lets later runs
+check only the suffix appended since.
+"""
+
+import hashlib
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from codex_watcher.ledger import GENESIS_DIGEST, LedgerError, atomic_write_json
+
+VERIFIED_NAME = "VERIFIED.json"
+CHUNK_BYTES   = 4 * 1024 * 1024
+MAX_ERRORS    = 20
+
+
+def record_prev(canonical: str):
+    for part in canonical.split(";"):
+        if part.startswith("prev="):
+            return part[5:]
+    return None
+
+def verify_chunk(path, start, end, origin=False):
+    """
+    Check the complete records in bytes [start, end) of `path`.
+    Returns (count, first prev, last digest, last record offset, errors)
+    where each error is (index within chunk, reason).
+    """
+    with open(path, "rb") as fh:
+        fh.seek(start)
+        data = fh.read(end - start)
+    return verify_records(data, start, origin)
+
+def verify_records(data, start=0, origin=False):
+    """verify_chunk() over NDJSON records already in memory; offsets are relative to `start`."""
+    count, first_prev, last_digest, last_offset, errors = 0, None, None, None, []
+    sha256 = hashlib.sha256
+    pos = 0
+    while pos < len(data):
+        nl = data.find(b"\n", pos)
+        if nl < 0:
+            break
+        try:
+            rec = json.loads(data[pos:nl])
+            canonical, digest = rec["canonical"], rec["digest"]
+        except (ValueError, KeyError, TypeError) as e:
+            errors.append((count, f"unreadable record: {e}"))
+            canonical, digest = "", None
+        prev = record_prev(canonical)
+        if count == 0:
+            first_prev = prev
+        elif prev != last_digest:
+            errors.append((count, f"broken link: prev={prev}, expected {last_digest}"))
+        genesis = origin and count == 0 and digest == GENESIS_DIGEST
+        if digest is not None and not genesis:
+            computed = sha256(canonical.encode("utf-8")).hexdigest()
+            if computed != digest:
+                errors.append((count, f"digest mismatch: computed {computed}, stored {digest}"))
+        last_digest, last_offset = digest, start + pos
+        count += 1
+        pos = nl + 1
+    return count, first_prev, last_digest, last_offset, errors
+
+
+def _chunk_bounds(path, start, end, chunk_bytes):
+    """Split [start, end) of `path` into newline-aligned byte ranges."""
+    bounds = []
+    with open(path, "rb") as fh:
+        lo = start
+        while lo < end:
+            hi = lo + chunk_bytes
+            if hi >= end:
+                hi = end
+            else:
+                fh.seek(hi)
+                fh.readline()
+                hi = min(fh.tell(), end)
+            bounds.append((lo, hi))
+            lo = hi
+    return bounds
+
+
+def read_verified(store):
+    """Return the verified-up-to checkpoint if it still matches the ledger, else None."""
+    path = store.root / VERIFIED_NAME
+    try:
+        cp = json.loads(path.read_text(encoding="utf-8"))
+        if cp["height"] > store.height:
+            return None
+        if store.read_at(cp["tip_segment"], cp["tip_offset"])["digest"] != cp["digest"]:
+            return None
+    except (OSError, ValueError, KeyError, TypeError, LedgerError):
+        return None
+    return cp
+
+
+def verify_chain(store, workers=None, full=False, chunk_bytes=CHUNK_BYTES):
+    """
+    Verify the chain in `store`, resuming from the verified-up-to checkpoint
+    unless `full`. Returns a dict with counts, timings and the first errors.
+    """
+    t0 = time.perf_counter()
+    store.refresh()
+    workers = workers or os.cpu_count() or 1
+    cp = None if full else read_verified(store)
+    segments = store.manifest["segments"]
+
+    # plan: byte ranges from the checkpoint (or genesis) to the current end
+    jobs = []
+    for i, seg in enumerate(segments):
+        path = store.root / seg["file"]
+        last = i + 1 == len(segments)
+        end = store._active_size if last else path.stat().st_size
+        begin = 0
+        if cp:
+            if seg["start"] < cp["segment"]:
+                continue
+            if seg["start"] == cp["segment"]:
+                begin = cp["offset"]
+        for lo, hi in _chunk_bounds(path, begin, end, chunk_bytes):
+            jobs.append((str(path), lo, hi, seg["start"] == 0 and lo == 0, seg["start"]))
+
+    if workers > 1 and len(jobs) > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(verify_chunk, p, lo, hi, origin) for p, lo, hi, origin, _ in jobs]
+            results = [f.result() for f in futures]
+    else:
+        results = [verify_chunk(p, lo, hi, origin) for p, lo, hi, origin, _ in jobs]
+
+    # stitch: link each chunk's first prev to the previous chunk's last digest
+    height = cp["height"] if cp else 0
+    prev_digest = cp["digest"] if cp else None
+    errors = []
+    tail = (cp["tip_segment"], cp["tip_offset"]) if cp else None
+    for (_, _, _, origin, seg_start), (count, first_prev, last_digest, last_offset, errs) in zip(jobs, results):
+        if count and not origin and first_prev != prev_digest:
+            errors.append((height, f"broken link: prev={first_prev}, expected {prev_digest}"))
+        errors.extend((height + idx, reason) for idx, reason in errs)
+        if count:
+            prev_digest = last_digest
+            tail = (seg_start, last_offset)
+        height += count
+
+    checked = height - (cp["height"] if cp else 0)
+    if not errors and tail is not None:
+        atomic_write_json(store.root / VERIFIED_NAME, {
+            "height": height,
+            "digest": prev_digest,
+            "segment": segments[-1]["start"],
+            "offset": store._active_size,
+            "tip_segment": tail[0],
+            "tip_offset": tail[1],
+            "verified_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        })
+    return {
+        "ok": not errors,
+        "height": height,
+        "checked": checked,
+        "resumed_from": cp["height"] if cp else 0,
+        "chunks": len(jobs),
+        "workers": workers,
+        "seconds": round(time.perf_counter() - t0, 3),
+        "errors": errors[:MAX_ERRORS],
+        "error_count": len(errors),
+    }
@@ -6,65 +6,86 @@ import warnings
 warnings.filterwarnings("ignore", "I don''t know how to infer vegalite type")
 import warnings
 warnings.filterwarnings("ignore", "I don''t know how to infer vegalite type")
-import os
+import threading
 import streamlit as st
 import pandas as pd
 import plotly.express as px
 from streamlit_autorefresh import st_autorefresh
 
+from codex_watcher.aggregates import Aggregates, read_aggregates
+from codex_watcher.tail import LedgerTail
+
 # Auto‐refresh every 5 seconds
 st_autorefresh(interval=5000, key="refresh")
 
 st.set_page_config(page_title="Codex Dashboard", layout="wide")
 st.title("🔮 Codex Web Real-Time Dashboard")
 
-@st.cache_data
-def load_ledger():
-    path = "codex_ledger.json"
-    # if file is missing or empty, return empty DataFrame
-    if not os.path.exists(path) or os.stat(path).st_size == 0:
-        return pd.DataFrame(columns=["timestamp", "delta", "author"])
-    try:
-        # if your ledger is JSON lines, add lines=True
-        return pd.read_json(path)
-    except ValueError:
-        return pd.DataFrame(columns=["timestamp", "delta", "author"])
+@st.cache_resource
+def tail_cache():
+    # fallback for ledgers without the aggregates sidecar: fold new stones in as they arrive
+    return {"tail": LedgerTail(), "agg": Aggregates(), "lock": threading.Lock()}
+
+def load_aggregates():
+    """The watcher-maintained snapshot; its size does not grow with the chain."""
+    snap = read_aggregates()
+    if snap is not None:
+        return snap
+    cache = tail_cache()
+    with cache["lock"]:
+        rows, reset = cache["tail"].poll()
+        if reset:
+            cache["agg"] = Aggregates()
+        for row in rows:
+            cache["agg"].add(row)
+        return cache["agg"].snapshot()
 
-df = load_ledger()
+snap = load_aggregates()
+per_hour = pd.Series(snap["per_hour"], dtype="int64")
 
 # Top-line metrics
 c1, c2, c3, c4 = st.columns(4)
-c1.metric("Total Stones", len(df))
-c2.metric("Average Δ", round(df["delta"].mean(), 2))
-c3.metric("Unique Authors", df["author"].nunique())
-c4.metric("Last Updated", df["timestamp"].max())
+c1.metric("Total Stones", snap["height"])
+c2.metric("Average Δ", round(snap["delta_sum"] / snap["delta_count"], 2) if snap["delta_count"] else "n/a")
+c3.metric("Unique Authors", len(snap["per_author"]))
+c4.metric("Last Updated", snap["last_at"] or "n/a")
 
 # Chain growth over time
 st.subheader("Chain Growth")
-growth = df.groupby("timestamp").size().cumsum().reset_index(name="count")
-st.line_chart(
-    growth.rename(columns={"timestamp": "index"}).set_index("index")["count"]
-)
+if not per_hour.empty:
+    st.line_chart(per_hour.cumsum())
+else:
+    st.write("No timestamped stones yet.")
+if snap.get("undated"):
+    st.caption(f"{snap['undated']} stones without a timestamp are counted but not plotted.")
 
 # Entries per hour histogram
 st.subheader("Entries per Hour")
-if "timestamp" in df.columns:
-    df["hour"] = pd.to_datetime(df["timestamp"], errors="coerce").dt.hour
-    st.bar_chart(df["hour"].value_counts().sort_index())
+if not per_hour.empty:
+    hours = per_hour.groupby(per_hour.index.str[11:13].astype(int)).sum()
+    st.bar_chart(hours.sort_index())
 else:
     st.write("No timestamp data to plot.")
 
 # Author distribution pie chart
 st.subheader("Author Distribution")
-if not df.empty:
-    fig = px.pie(df, names="author", title="Stones by Author")
+if snap["per_author"]:
+    authors = pd.DataFrame(list(snap["per_author"].items()), columns=["author", "stones"])
+    fig = px.pie(authors, names="author", values="stones", title="Stones by Author")
     st.plotly_chart(fig, use_container_width=True)
 else:
     st.write("No stones yet.")
 
+# Axis distribution
+st.subheader("Stones per Axis")
+if snap["per_axis"]:
+    st.bar_chart(pd.Series(snap["per_axis"]).sort_values(ascending=False))
+else:
+    st.write("No stones yet.")
+
 # Latest stones table
 st.subheader("Latest 10 Stones")
-if not df.empty:
-    st.table(df.sort_values("timestamp", ascending=False).head(10))
+if snap["latest"]:
+    st.table(pd.DataFrame(snap["latest"][::-1]))
 else:
     st.write("Ledger is empty.")
@@ -2,13 +2,13 @@
 import hashlib, json
 from pathlib import Path
 
-LEDGER = Path("codex_ledger.json")
+from codex_watcher.ledger import get_store
+
 INBOX  = Path("inbox")
 INBOX.mkdir(exist_ok=True)
 
 # load current tip
-ledger = json.loads(LEDGER.read_text(encoding="utf-8"))
-tip = ledger[-1]["digest"]
+tip = get_store().tip_digest()
 
 # build canonical with author
 canonical = (
@@ -3,14 +3,28 @@ orchestrator.py
 Runs the full Codex cycle:
 1. Fetch new stones from mirrors into inbox/
 2. Run watcher once to validate + append to ledger
+
+With --daemon both steps run in this process as concurrent stages on
+their own intervals, keeping the ledger store, digest index, policy and
+HTTP sessions warm between runs, until SIGINT/SIGTERM.
 """
 
+import argparse
+import os
+import signal
 import subprocess
 import sys
+import threading
+import time
 from pathlib import Path
 
 PROJECT_ROOT = Path(__file__).parent
 
+# ── Daemon settings ───────────────────────────────────────────────────────────
+FETCH_INTERVAL  = 60    # seconds between fetch runs
+WATCH_INTERVAL  = 3     # seconds between inbox scans
+REPORT_INTERVAL = 300   # seconds between stage timing reports
+
 def run_step(module_name: str, label: str):
     """Run a Python module as a subprocess and log outcome."""
     print(f"\n=== {label} ===")
@@ -24,7 +38,115 @@ def run_step(module_name: str, label: str):
         print(f"⚠️ {label} failed with code {result.returncode}")
     return result.returncode
 
+# ── Resident mode ─────────────────────────────────────────────────────────────
+class Stage:
+    """Runs `fn` every `interval` seconds on its own thread and times each run."""
+
+    def __init__(self, name, fn, interval):
+        self.name = name
+        self.fn = fn
+        self.interval = interval
+        self.runs = 0
+        self.failures = 0
+        self.last = 0.0
+        self.total = 0.0
+        self.worst = 0.0
+        self.thread = None
+
+    def loop(self, stop):
+        while not stop.is_set():
+            t0 = time.monotonic()
+            try:
+                self.fn()
+            except Exception as e:
+                self.failures += 1
+                print(f"⚠️ {self.name} failed: {e}")
+            elapsed = time.monotonic() - t0
+            self.runs += 1
+            self.last = elapsed
+            self.total += elapsed
+            self.worst = max(self.worst, elapsed)
+            stop.wait(max(self.interval - elapsed, 0))
+
+    def start(self, stop):
+        self.thread = threading.Thread(target=self.loop, args=(stop,), name=self.name, daemon=True)
+        self.thread.start()
+
+    def report(self):
+        avg = self.total / self.runs if self.runs else 0.0
+        return (
+            f"{self.name}: {self.runs} runs, {self.failures} failed | "
+            f"last {self.last * 1000:.0f}ms, avg {avg * 1000:.0f}ms, max {self.worst * 1000:.0f}ms"
+        )
+
+def run_daemon(fetch_interval=FETCH_INTERVAL, watch_interval=WATCH_INTERVAL,
+               report_interval=REPORT_INTERVAL):
+    """Fetch and validate in-process on independent schedules until signalled."""
+    os.chdir(PROJECT_ROOT)
+    import yaml
+    from codex_fetcher import fetcher
+    from codex_fetcher.engine import SessionPool
+    from codex_watcher import cli
+
+    fetcher.INBOX_DIR.mkdir(exist_ok=True)
+    cli.ensure_dirs()
+    cli.recover_pending_commit()
+    cli.ledger_store()  # open the store and its sidecars once, up front
+    state = fetcher.load_state()
+    pool = SessionPool()
+
+    def fetch_step():
+        cfg = yaml.safe_load(fetcher.CONFIG_PATH.read_text(encoding="utf-8"))
+        try:
+            fetcher.fetch_all(cfg.get("mirrors", []), state, pool)
+        finally:
+            state.flush()
+
+    def watch_step():
+        cli.process_inbox_once()
+
+    stages = [
+        Stage("fetch", fetch_step, fetch_interval),
+        Stage("watch", watch_step, watch_interval),
+    ]
+    stop = threading.Event()
+
+    def on_signal(signum, frame):
+        print(f"\n⏹ {signal.Signals(signum).name} received — finishing current runs")
+        stop.set()
+
+    signal.signal(signal.SIGINT, on_signal)
+    signal.signal(signal.SIGTERM, on_signal)
+
+    print(f"🚀 Orchestrator daemon: fetch every {fetch_interval}s, watch every {watch_interval}s")
+    for stage in stages:
+        stage.start(stop)
+    while not stop.wait(report_interval):
+        for stage in stages:
+            print(f"⏱ {stage.report()}")
+    for stage in stages:
+        stage.thread.join()
+    pool.close()
+    for stage in stages:
+        print(f"⏱ {stage.report()}")
+    print("✅ Orchestrator stopped.")
+
 def main():
+    parser = argparse.ArgumentParser(description="Run the Codex fetch + watch cycle")
+    parser.add_argument(
+        "--daemon",
+        action="store_true",
+        help="Stay resident and run fetch/watch in-process on their own intervals"
+    )
+    parser.add_argument("--fetch-interval", type=float, default=FETCH_INTERVAL)
+    parser.add_argument("--watch-interval", type=float, default=WATCH_INTERVAL)
+    parser.add_argument("--report-interval", type=float, default=REPORT_INTERVAL)
+    args = parser.parse_args()
+
+    if args.daemon:
+        run_daemon(args.fetch_interval, args.watch_interval, args.report_interval)
+        return
+
     # Step 1: Fetch new stones
     run_step("codex_fetcher.fetcher", "Fetcher")
 
@@ -8,6 +8,8 @@ setup(
         "console_scripts": [
             "codex-watcher = codex_watcher.cli:main",
             "codex-fetcher = codex_fetcher.fetcher:main",
+            "codex-query = codex_watcher.query:main",
+            "codex-mint = codex_watcher.mint:main",
         ],
     },
     install_requires=[],
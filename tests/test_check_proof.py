@@ -0,0 +1,73 @@
+import hashlib
+import json
+import sys
+
+import pytest
+
+from codex_watcher.ledger import GENESIS_DIGEST, LedgerStore
+from codex_watcher.merkle import leaf_hash
+
+
+@pytest.fixture
+def mmr(tmp_path):
+    store = LedgerStore(tmp_path / "ledger", legacy_file=None)
+    store.open()
+    prev, stones = GENESIS_DIGEST, []
+    for i in range(12):
+        canonical = f"seed={i};prev={prev};axis=test;data={i};author=tests"
+        prev = hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+        stones.append({"canonical": canonical, "digest": prev})
+    store.append(stones)
+    return store.merkle
+
+@pytest.fixture
+def check(tmp_path, monkeypatch, capsys):
+    """Run `codex-watcher check-proof` on `proof`; returns (exit code, output)."""
+    monkeypatch.chdir(tmp_path)
+    from codex_watcher import cli
+
+    def run(proof, *flags):
+        path = tmp_path / "proof.json"
+        path.write_text(json.dumps(proof), encoding="utf-8")
+        monkeypatch.setattr(sys, "argv", ["codex-watcher", "check-proof", str(path), *flags])
+        try:
+            cli.main()
+            code = 0
+        except SystemExit as e:
+            code = e.code
+        return code, capsys.readouterr().out
+    return run
+
+def forged_inclusion(proof, digest):
+    """`proof` moved onto `digest`, with the root it carries recomputed to match."""
+    forged = dict(proof, digest=digest, leaf=leaf_hash(digest).hex(), path=[], peaks=[])
+    forged.update(leaf_index=0, tree_size=1, peak_index=0, root=leaf_hash(digest).hex())
+    return forged
+
+
+def test_inclusion_with_trusted_root(mmr, check):
+    proof = mmr.inclusion_proof(7)
+    code, out = check(proof, "--root", mmr.root().hex())
+    assert code == 0 and "✅ valid" in out
+
+def test_forged_inclusion_without_root_is_not_valid(mmr, check):
+    forged = forged_inclusion(mmr.inclusion_proof(7), "f" * 64)
+    code, out = check(forged)
+    assert code == 2
+    assert "✅" not in out and "unanchored" in out
+
+def test_forged_inclusion_against_trusted_root(mmr, check):
+    forged = forged_inclusion(mmr.inclusion_proof(7), "f" * 64)
+    code, out = check(forged, "--root", mmr.root().hex())
+    assert code == 1 and "❌ invalid" in out
+
+def test_consistency_needs_both_roots(mmr, check):
+    proof = mmr.consistency_proof(5, 13)
+    code, out = check(proof, "--root", mmr.root(13).hex())
+    assert code == 2 and "--old-root" in out
+    code, out = check(proof, "--root", mmr.root(13).hex(), "--old-root", mmr.root(5).hex())
+    assert code == 0 and "✅ valid" in out
+
+def test_consistency_without_roots_is_unanchored(mmr, check):
+    code, out = check(mmr.consistency_proof(4, 13))
+    assert code == 2 and "✅" not in out
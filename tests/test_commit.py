@@ -0,0 +1,116 @@
+import hashlib
+import json
+from pathlib import Path
+
+import pytest
+
+from codex_watcher.ledger import GENESIS_DIGEST
+from codex_watcher.verify import verify_chain
+
+
+@pytest.fixture
+def cli(tmp_path, monkeypatch):
+    """codex_watcher.cli working in an empty directory, with fresh singletons."""
+    monkeypatch.chdir(tmp_path)
+    from codex_watcher import cli, ledger
+    monkeypatch.setattr(cli, "_store", None)
+    monkeypatch.setattr(cli, "_pool", None)
+    monkeypatch.setattr(ledger, "_stores", {})
+    cli.ensure_dirs()
+    return cli
+
+def drop_stones(cli, n, prev=GENESIS_DIGEST):
+    """Write `n` chained stones into the inbox; returns their digests."""
+    digests = []
+    for i in range(n):
+        canonical = f"seed={i};prev={prev};axis=test;data={i};author=tests"
+        prev = hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+        (cli.INBOX_DIR / f"stone-{i:03d}.json").write_text(
+            json.dumps({"canonical": canonical, "digest": prev}), encoding="utf-8"
+        )
+        digests.append(prev)
+    return digests
+
+def assert_committed_once(cli, digests):
+    store = cli.ledger_store()
+    assert [s["digest"] for s in store.iter_stones(1)] == digests
+    assert verify_chain(store, full=True)["ok"]
+    assert sorted(p.name for p in cli.PROCESSED_DIR.iterdir()) == [
+        f"stone-{i:03d}.json" for i in range(len(digests))
+    ]
+    assert not any(cli.REJECTED_DIR.iterdir())
+    assert not cli.COMMIT_JOURNAL.exists()
+
+
+class FailingSidecar:
+    def __init__(self):
+        self.armed = True
+
+    def on_append(self, entries):
+        if self.armed:
+            self.armed = False
+            raise OSError("sidecar write failed")
+
+
+def test_failed_sidecar_aborts_scan_and_recovers(cli):
+    digests = drop_stones(cli, 7)
+    store = cli.ledger_store()
+    store.sidecars.append(FailingSidecar())
+    with pytest.raises(OSError):
+        cli.process_inbox_once(batch_size=3, max_latency=60)
+    # the first batch reached the ledger, nothing was appended twice or rejected
+    assert len(store) == 4
+    assert cli.COMMIT_JOURNAL.exists()
+    assert not any(cli.REJECTED_DIR.iterdir())
+    cli.process_inbox_once(batch_size=3, max_latency=60)
+    assert_committed_once(cli, digests)
+
+def test_failed_rename_aborts_scan_and_recovers(cli, monkeypatch):
+    digests = drop_stones(cli, 7)
+    rename = Path.rename
+    failed = []
+
+    def flaky_rename(self, target):
+        if self.name == "stone-001.json" and not failed:
+            failed.append(self)
+            raise OSError("rename failed")
+        return rename(self, target)
+
+    monkeypatch.setattr(Path, "rename", flaky_rename)
+    with pytest.raises(OSError):
+        cli.process_inbox_once(batch_size=3, max_latency=60)
+    assert len(cli.ledger_store()) == 4
+    cli.process_inbox_once(batch_size=3, max_latency=60)
+    assert_committed_once(cli, digests)
+
+def test_torn_journal_leaves_files_for_the_next_scan(cli):
+    digests = drop_stones(cli, 3)
+    cli.COMMIT_JOURNAL.write_text('{"base_height": 1, "entr', encoding="utf-8")
+    cli.process_inbox_once(batch_size=2, max_latency=60)
+    assert_committed_once(cli, digests)
+
+def test_pending_pool_state_stays_out_of_the_inbox(cli):
+    digests = drop_stones(cli, 3)
+    (cli.INBOX_DIR / "stone-001.json").unlink()     # stone 2 now waits for its parent
+    cli.process_inbox_once()
+    assert cli.POOL_FILE.exists()
+    assert not any(p.suffix == ".json" for p in cli.INBOX_DIR.iterdir() if p.is_file())
+    assert (cli.PENDING_DIR / "stone-002.json").exists()
+    cli._pool = None                                # a restart reloads the pool
+    assert digests[2] in cli.pending_pool()
+    assert (cli.PENDING_DIR / "stone-002.json").exists()
+
+def test_unloadable_policy_leaves_the_inbox_alone(cli, monkeypatch):
+    policy = Path("policy.json")
+    policy.write_text('{"terms": ["secret"', encoding="utf-8")
+    monkeypatch.setattr(cli, "POLICY_FILE", policy)
+    monkeypatch.setattr(cli, "_policies", {})
+    digests = drop_stones(cli, 3)
+    assert cli.process_inbox_once() == 0
+    assert len(list(cli.INBOX_DIR.glob("*.json"))) == 3
+    assert not any(cli.REJECTED_DIR.iterdir())
+    with pytest.raises(cli.PolicyError):
+        cli.prepare_file(cli.INBOX_DIR / "stone-000.json", policy)
+    policy.write_text('{"terms": ["secret"]}', encoding="utf-8")
+    assert cli.process_inbox_once() == 3
+    assert_committed_once(cli, digests)
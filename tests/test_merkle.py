@@ -0,0 +1,116 @@
+import copy
+import hashlib
+
+import pytest
+
+from codex_watcher.ledger import GENESIS_STONE, LedgerStore
+from codex_watcher.merkle import bag_peaks, leaf_hash, verify_consistency, verify_inclusion
+
+
+def make_chain(n, prev=GENESIS_STONE["digest"]):
+    stones = []
+    for i in range(n):
+        canonical = f"seed={i};prev={prev};axis=test;data={i};author=tests"
+        prev = hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+        stones.append({"canonical": canonical, "digest": prev})
+    return stones
+
+@pytest.fixture
+def store(tmp_path):
+    store = LedgerStore(tmp_path / "ledger", legacy_file=None)
+    store.open()
+    store.merkle
+    store.append(make_chain(20))
+    return store
+
+def flip(hex_hash):
+    return ("0" if hex_hash[0] != "0" else "1") + hex_hash[1:]
+
+
+# ── Inclusion ─────────────────────────────────────────────────────────────────
+def test_inclusion_round_trip(store):
+    mmr = store.merkle
+    digests = [s["digest"] for s in store.iter_stones(0)]
+    for size in (1, 2, 3, 7, 8, 13, 21):
+        for leaf in range(size):
+            proof = mmr.inclusion_proof(leaf, size)
+            assert verify_inclusion(proof, digest=digests[leaf], root=mmr.root(size).hex())
+
+def test_inclusion_rejects_wrong_digest(store):
+    proof = store.merkle.inclusion_proof(5)
+    assert not verify_inclusion(proof, digest=GENESIS_STONE["digest"])
+
+def test_inclusion_rejects_tampered_path(store):
+    proof = store.merkle.inclusion_proof(5)
+    proof["path"][0] = flip(proof["path"][0])
+    assert not verify_inclusion(proof)
+
+def test_inclusion_rejects_tampered_peak(store):
+    proof = store.merkle.inclusion_proof(20)
+    assert proof["peaks"]
+    proof["peaks"][0] = flip(proof["peaks"][0])
+    assert not verify_inclusion(proof)
+
+def test_inclusion_rejects_truncated_path(store):
+    proof = store.merkle.inclusion_proof(5)
+    proof["path"].pop()
+    assert not verify_inclusion(proof)
+
+def test_inclusion_rejects_wrong_root(store):
+    mmr = store.merkle
+    proof = mmr.inclusion_proof(5)
+    assert not verify_inclusion(proof, root=mmr.root(20).hex())
+
+def test_inclusion_rejects_out_of_range_leaf(store):
+    proof = store.merkle.inclusion_proof(5)
+    proof["leaf_index"] = proof["tree_size"]
+    assert not verify_inclusion(proof)
+
+
+# ── Consistency ───────────────────────────────────────────────────────────────
+def test_consistency_round_trip(store):
+    mmr = store.merkle
+    for new_size in range(1, 22):
+        for old_size in range(1, new_size + 1):
+            proof = mmr.consistency_proof(old_size, new_size)
+            assert verify_consistency(
+                proof, old_root=mmr.root(old_size).hex(), new_root=mmr.root(new_size).hex()
+            )
+
+def test_consistency_rejects_tampered_path(store):
+    proof = store.merkle.consistency_proof(5, 21)
+    proof["paths"][-1][0] = flip(proof["paths"][-1][0])
+    assert not verify_consistency(proof)
+
+def test_consistency_rejects_tampered_old_peak(store):
+    proof = store.merkle.consistency_proof(5, 21)
+    proof["old_peaks"][0] = flip(proof["old_peaks"][0])
+    assert not verify_consistency(proof)
+
+def test_consistency_rejects_missing_paths(store):
+    mmr = store.merkle
+    proof = mmr.consistency_proof(5, 21)
+    # forged new peaks that do not extend the old tree, bagged into a matching root
+    forged = copy.deepcopy(proof)
+    forged["paths"] = []
+    forged["new_peaks"] = [leaf_hash(f"forged-{i}").hex() for i in range(len(proof["new_peaks"]))]
+    forged["new_root"] = bag_peaks([bytes.fromhex(p) for p in forged["new_peaks"]]).hex()
+    assert not verify_consistency(forged)
+
+def test_consistency_rejects_truncated_paths(store):
+    proof = store.merkle.consistency_proof(7, 21)
+    assert len(proof["paths"]) > 1
+    proof["paths"].pop()
+    assert not verify_consistency(proof)
+
+def test_consistency_rejects_old_size_above_new_size(store):
+    proof = store.merkle.consistency_proof(5, 21)
+    proof["old_size"], proof["new_size"] = proof["new_size"], proof["old_size"]
+    proof["old_peaks"], proof["new_peaks"] = proof["new_peaks"], proof["old_peaks"]
+    proof["old_root"], proof["new_root"] = proof["new_root"], proof["old_root"]
+    assert not verify_consistency(proof)
+
+def test_consistency_rejects_wrong_new_root(store):
+    mmr = store.merkle
+    proof = mmr.consistency_proof(5, 13)
+    assert not verify_consistency(proof, new_root=mmr.root(21).hex())
@@ -0,0 +1,133 @@
+import hashlib
+import json
+
+import pytest
+
+from codex_watcher.aggregates import Aggregates, read_aggregates
+from codex_watcher.ledger import LedgerStore
+from codex_watcher.merkle import MerkleLog
+from codex_watcher.tail import stone_row
+
+
+def grow(store, n):
+    """Append `n` stones chained to the current tip."""
+    prev = store.tip_digest()
+    stones = []
+    for i in range(n):
+        canonical = f"seed={store.height + i};prev={prev};axis=test;data={i};author=tests"
+        prev = hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+        stones.append({"canonical": canonical, "digest": prev})
+    store.append(stones)
+
+@pytest.fixture
+def root(tmp_path):
+    return tmp_path / "ledger"
+
+def open_store(root):
+    store = LedgerStore(root, legacy_file=None)
+    store.open()
+    return store
+
+def fresh_aggregates(store):
+    agg = Aggregates()
+    for height, stone in enumerate(store.iter_stones(0)):
+        agg.add(stone_row(height, stone))
+    return agg
+
+
+def test_sidecars_catch_up_after_another_writer(root):
+    mine = open_store(root)
+    mine.merkle, mine.aggregates
+    grow(mine, 3)
+    other = open_store(root)    # a second process, without sidecars attached
+    grow(other, 5)
+    grow(mine, 2)               # first entry is at height 9, the sidecars are at 4
+    assert mine.height == 11
+    assert mine._merkle.size == 11
+    assert mine._aggregates.agg.height == 11
+    assert mine._aggregates.agg.tip == mine.tip["digest"]
+    rebuilt = MerkleLog(open_store(root)).rebuild()
+    assert mine._merkle.root() == rebuilt.root()
+    snap = read_aggregates(root)
+    assert snap["height"] == 11
+    assert sum(snap["per_author"].values()) == 11
+
+def test_aggregates_reopen_skips_the_digest_index(root):
+    store = open_store(root)
+    store.aggregates
+    grow(store, 10)
+    reopened = open_store(root)
+    agg = reopened.aggregates.agg
+    assert reopened._index is None
+    assert (agg.height, agg.tip) == (11, store.tip["digest"])
+    assert agg.per_author == fresh_aggregates(store).per_author
+
+def test_aggregates_rebuild_when_tip_moved(root):
+    store = open_store(root)
+    store.aggregates
+    grow(store, 4)
+    snap = read_aggregates(root)
+    snap["tip_offset"] = 0      # points at a different stone now
+    (root / "AGGREGATES.json").write_text(json.dumps(snap))
+    reopened = open_store(root).aggregates
+    assert reopened.agg.height == 5
+    assert reopened.agg.tip_pos == store._tip_pos
+
+def test_query_index_catches_up_after_another_writer(root):
+    mine = open_store(root)
+    mine.query_index
+    grow(mine, 3)
+    other = open_store(root)
+    grow(other, 5)
+    grow(mine, 2)
+    index = mine._query_index
+    assert (index.height, index.tip) == (11, mine.tip["digest"])
+    heights = [r["height"] for r in index.conn.execute("SELECT height FROM stones ORDER BY height")]
+    assert heights == list(range(11))
+
+def test_query_index_follows_an_external_sync(root):
+    mine = open_store(root)
+    mine.query_index
+    other = open_store(root)
+    grow(other, 4)
+    other.query_index           # like codex-query --sync: indexes heights 1-4 itself
+    grow(mine, 2)
+    index = mine._query_index
+    assert index.height == 7
+    assert index.conn.execute("SELECT COUNT(*) FROM stones").fetchone()[0] == 7
+
+def test_merkle_sync_reads_levels_written_by_another_writer(root):
+    mine = open_store(root)
+    mine.merkle
+    grow(mine, 3)
+    other = open_store(root)
+    other.merkle                # e.g. codex-mint: extends the same level files
+    grow(other, 5)
+    mmr = mine.merkle           # sync picks the new leaves up from disk
+    assert mmr.size == mmr._count(0) == 9
+    assert mmr.root() == MerkleLog(open_store(root)).rebuild().root()
+
+def test_merkle_appends_after_another_writer_with_the_mmr(root):
+    mine = open_store(root)
+    mine.merkle
+    grow(mine, 3)
+    other = open_store(root)
+    other.merkle                # both processes extend the same level files
+    grow(other, 5)
+    grow(mine, 2)
+    mmr = mine._merkle
+    assert mmr.size == mmr._count(0) == 11
+    assert mmr.root() == MerkleLog(open_store(root)).rebuild().root()
+
+def test_undated_stones_stay_out_of_the_hourly_series(root):
+    store = open_store(root)
+    grow(store, 3)              # test stones carry no timestamp
+    first, later = Aggregates(), Aggregates()
+    rows = [stone_row(height, stone) for height, stone in enumerate(store.iter_stones(0))]
+    rows.append(dict(rows[-1], height=4, timestamp="2024-05-01T12:30:00Z"))
+    for row in rows:
+        first.add(row, now=0)
+        later.add(row, now=86400 * 365)
+    assert first.per_hour == later.per_hour == {"2024-05-01T12:00": 1}
+    assert first.undated == 4
+    assert Aggregates.from_snapshot(first.snapshot()).undated == 4